@@ -46,6 +46,9 @@ def create_app(config_class=Config):
     login_manager.init_app(app)
     csrf.init_app(app)
     
+    from services import CacheService
+    CacheService.init_app(app)
+    
     # Configurar login
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Por favor, faça login para acessar esta página.'
@@ -76,6 +79,13 @@ def create_app(config_class=Config):
             app.logger.warning(f"Erro ao criar tabelas: {e}")
             db.session.rollback()
         
+        # Alterações de esquema em tabelas já existentes (idempotentes)
+        from migrations import aplicar_migracoes
+        falhas = aplicar_migracoes()
+        if falhas:
+            app.logger.warning(f"Migrações com erro: {', '.join(falhas)}")
+            db.session.rollback()
+        
         # Criar admin se necessário
         if User.query.count() == 0:
             admin_password = os.getenv('ADMIN_PASSWORD', 'admin123')
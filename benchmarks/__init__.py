@@ -0,0 +1 @@
+"""Micro-benchmarks de desempenho (executar a partir da raiz do projeto)"""
@@ -0,0 +1,109 @@
+"""
+Benchmark das buscas no catálogo: varredura linear (antes) x índice (depois)
+
+Uso:
+    python -m benchmarks.bench_catalogo
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+from services.catalogo_index import CatalogoIndex, MAPA_MUSCULOS
+from utils.exercise_utils import remover_acentos
+
+CATALOGO_PATH = Path("storage/exercises-ptbr-full-translation.json")
+
+CONSULTAS_FUZZY = ["supno reto", "rosca diret", "agachamnto", "leg press 45 graus"]
+
+DIGITACAO = "rosca direta"
+
+CONSULTAS = [
+    {"termo": "supino"},
+    {"termo": "rosca"},
+    {"termo": "agachamento"},
+    {"termo": "xyz inexistente"},
+    {"musculo": "Bíceps"},
+    {"termo": "rosca", "musculo": "Bíceps"},
+]
+
+
+def buscar_linear(catalogo, termo=None, musculo=None, limite=500):
+    """Reprodução da busca antiga: normaliza e gera hash a cada chamada"""
+    resultados = []
+    termo_normalizado = remover_acentos(termo.lower()) if termo else None
+    for ex in catalogo:
+        nome = ex.get('name', '')
+        primary_muscles = ex.get('primaryMuscles', [])
+        musculo_original = primary_muscles[0] if primary_muscles else "Não especificado"
+        nome_normalizado = remover_acentos(nome.lower())
+        musculo_exibicao = dict(MAPA_MUSCULOS).get(musculo_original.lower(), musculo_original.title())
+        if termo and termo_normalizado not in nome_normalizado:
+            continue
+        if musculo and musculo_exibicao != musculo:
+            continue
+        resultados.append({
+            "id": int(hashlib.md5(nome.encode()).hexdigest()[:8], 16),
+            "nome": nome,
+            "musculo": musculo_exibicao,
+        })
+        if len(resultados) >= limite:
+            break
+    return resultados
+
+
+def buscar_indexado(indice, termo=None, musculo=None, limite=500):
+    """Busca nova sobre o índice pré-calculado"""
+    return [indice.entradas[i] for i in indice.filtrar(termo, musculo, limite=limite)]
+
+
+def medir(funcao, repeticoes):
+    """Retorna o tempo médio por chamada em microssegundos"""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+def main():
+    with open(CATALOGO_PATH, 'r', encoding='utf-8') as f:
+        catalogo = json.load(f)
+
+    inicio = time.perf_counter()
+    indice = CatalogoIndex(catalogo)
+    construcao_ms = (time.perf_counter() - inicio) * 1000
+
+    print(f"Catálogo: {len(catalogo)} exercícios | construção do índice: {construcao_ms:.1f} ms")
+    print(f"{'consulta':<40} {'antes (µs)':>12} {'depois (µs)':>12} {'ganho':>8}")
+
+    for consulta in CONSULTAS:
+        antes = buscar_linear(catalogo, **consulta)
+        depois = buscar_indexado(indice, **consulta)
+        assert [r['nome'] for r in antes] == [r['nome'] for r in depois], consulta
+
+        t_antes = medir(lambda: buscar_linear(catalogo, **consulta), 20)
+        t_depois = medir(lambda: buscar_indexado(indice, **consulta), 2000)
+        rotulo = ", ".join(f"{k}={v}" for k, v in consulta.items())
+        print(f"{rotulo:<40} {t_antes:>12.1f} {t_depois:>12.1f} {t_antes / t_depois:>7.0f}x")
+
+    print()
+    print(f"{'busca aproximada (top 10)':<40} {'µs':>12}  melhor resultado")
+    for termo in CONSULTAS_FUZZY:
+        t_fuzzy = medir(lambda: indice.buscar_fuzzy(termo, 10), 2000)
+        melhor = indice.buscar_fuzzy(termo, 1)
+        nome = indice.entradas[melhor[0][0]]['nome'] if melhor else '-'
+        print(f"{termo:<40} {t_fuzzy:>12.1f}  {nome}")
+
+    print()
+    print(f"{'typeahead por tecla':<40} {'novo (µs)':>12} {'refinado':>12}")
+    for tamanho in range(2, len(DIGITACAO) + 1):
+        prefixo = DIGITACAO[:tamanho]
+        anteriores = indice.buscar_prefixo(prefixo[:-1])
+        t_novo = medir(lambda: indice.buscar_prefixo(prefixo), 2000)
+        t_refinado = medir(lambda: indice.refinar_prefixo(prefixo, anteriores), 2000)
+        print(f"{prefixo!r:<40} {t_novo:>12.1f} {t_refinado:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark de carga do catálogo por worker: json.load x binário via mmap
+
+Cada modo roda num processo novo (como um worker do gunicorn) e mede o
+tempo até o índice ficar pronto e a memória adicional do processo. A
+memória privada é a que não pode ser compartilhada entre workers.
+
+Uso:
+    python -m services.catalogo_binario      # gera o .bin
+    python -m benchmarks.bench_catalogo_carga
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+JSON_PATH = Path("storage/exercises-ptbr-full-translation.json")
+BIN_PATH = JSON_PATH.with_suffix('.bin')
+
+
+def ler_memoria_kb():
+    """Retorna (RSS, memória privada) do processo atual em KB (Linux)"""
+    campos = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for linha in f:
+                partes = linha.split()
+                if len(partes) >= 2 and partes[1].isdigit():
+                    campos[partes[0].rstrip(':')] = int(partes[1])
+    except OSError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss, rss
+    return campos.get('Rss', 0), campos.get('Private_Clean', 0) + campos.get('Private_Dirty', 0)
+
+
+def medir_worker(modo):
+    """Executado no processo filho: carrega o catálogo e imprime as medidas"""
+    from services.catalogo_service import CatalogoService
+
+    if modo == 'json':
+        CatalogoService._catalogo_bin_path = Path('/dev/null/inexistente.bin')
+
+    rss_antes, privada_antes = ler_memoria_kb()
+    inicio = time.perf_counter()
+    indice = CatalogoService.get_indice()
+    # Uma busca para tocar as páginas usadas de fato
+    CatalogoService.buscar_exercicios(termo="rosca")
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    rss_depois, privada_depois = ler_memoria_kb()
+
+    print(len(indice), f"{duracao_ms:.1f}", rss_depois - rss_antes, privada_depois - privada_antes)
+
+
+def main():
+    if not BIN_PATH.exists():
+        print(f"{BIN_PATH} não encontrado; gere com: python -m services.catalogo_binario")
+        sys.exit(1)
+
+    print(f"{'modo':<8} {'exercícios':>10} {'carga (ms)':>12} {'+RSS (KB)':>12} {'+privada (KB)':>14}")
+    for modo in ('json', 'bin'):
+        amostras = []
+        for _ in range(5):
+            saida = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_catalogo_carga', '--worker', modo],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            amostras.append(saida)
+        amostras.sort(key=lambda s: float(s[1]))
+        qtd, duracao, rss, privada = amostras[len(amostras) // 2]
+        print(f"{modo:<8} {qtd:>10} {duracao:>12} {rss:>12} {privada:>14}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == '--worker':
+        medir_worker(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,154 @@
+"""
+Benchmark de EstatisticaService.calcular_por_treino com histórico crescente
+
+Compara a agregação em Python (antes: materializa cada série como objeto
+ORM e soma em loops por treino) com o agregado agrupado em SQL (depois),
+para um usuário sintético com até 100 mil séries. Mede tempo (melhor de 3)
+e pico de memória alocada (tracemalloc) sem passar pelo cache.
+
+Uso:
+    python -m benchmarks.bench_estatisticas
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+_BANCO = os.path.join(tempfile.mkdtemp(prefix="fitlog-bench-"), "bench.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite:///{_BANCO}"
+
+from app import app  # noqa: E402
+from models import db, User, Treino, Musculo, Exercicio, VersaoGlobal, RegistroTreino, HistoricoTreino  # noqa: E402
+from services.estatistica_service import _calcular_por_treino  # noqa: E402
+
+TAMANHOS = [10_000, 50_000, 100_000]
+SERIES_POR_REGISTRO = 4
+TREINOS = "ABC"
+EXERCICIOS_POR_TREINO = 5
+REPETICOES = 3
+
+# O pico de memória do agregado em SQL não pode crescer com o histórico
+FATOR_MAXIMO_MEMORIA = 2
+
+
+def criar_usuario():
+    """Usuário com 3 treinos e 5 exercícios por treino, ainda sem registros"""
+    user = User(username="bench", email="bench@fitlog.com")
+    user.set_password("bench")
+    musculo = Musculo(nome="bench", nome_exibicao="Bench")
+    db.session.add_all([user, musculo])
+    db.session.commit()
+
+    versao = VersaoGlobal(numero_versao=1, descricao="Bench", data_inicio=date(2020, 1, 1), user_id=user.id)
+    db.session.add(versao)
+    exercicios = []
+    for codigo in TREINOS:
+        treino = Treino(codigo=codigo, nome=f"Treino {codigo}", descricao="Bench", user_id=user.id)
+        db.session.add(treino)
+        db.session.flush()
+        for i in range(EXERCICIOS_POR_TREINO):
+            exercicio = Exercicio(nome=f"Exercício {codigo}{i}", musculo_id=musculo.id,
+                                  treino_id=treino.id, user_id=user.id)
+            db.session.add(exercicio)
+            exercicios.append(exercicio)
+    db.session.commit()
+    # Apenas ids: o benchmark descarta a identity map entre as medições
+    return user.id, versao.id, [(e.id, e.treino_id) for e in exercicios]
+
+
+def crescer_historico(user_id, versao_id, exercicios, total_series):
+    """Insere registros (4 séries cada) até o usuário ter `total_series` séries"""
+    atual = HistoricoTreino.query.count()
+    inicio = RegistroTreino.query.count()
+    novos = (total_series - atual) // SERIES_POR_REGISTRO
+
+    registros = []
+    for n in range(inicio, inicio + novos):
+        exercicio_id, treino_id = exercicios[n % len(exercicios)]
+        registros.append({
+            "id": n + 1, "treino_id": treino_id, "versao_id": versao_id,
+            "periodo": "Janeiro/2024", "semana": n // len(exercicios) + 1,
+            "exercicio_id": exercicio_id, "data_registro": datetime(2024, 1, 1), "user_id": user_id,
+        })
+    series = [
+        {"registro_id": r["id"], "carga": 20 + ordem * 5, "repeticoes": 10, "ordem": ordem}
+        for r in registros for ordem in range(1, SERIES_POR_REGISTRO + 1)
+    ]
+    db.session.execute(db.insert(RegistroTreino), registros)
+    db.session.execute(db.insert(HistoricoTreino), series)
+    db.session.commit()
+
+
+def calcular_em_python(user_id):
+    """Reprodução do cálculo antigo: carrega tudo e agrega em loops por treino"""
+    treinos = Treino.query.filter_by(user_id=user_id).order_by(Treino.codigo).all()
+    exercicios = Exercicio.query.filter_by(user_id=user_id).all()
+    registros = RegistroTreino.query.filter_by(user_id=user_id).all()
+    series_por_registro = {}
+    for s in HistoricoTreino.query.join(RegistroTreino).filter(RegistroTreino.user_id == user_id):
+        series_por_registro.setdefault(s.registro_id, []).append(s)
+
+    treino_stats = {}
+    for t in treinos:
+        exercicios_treino = [e for e in exercicios if e.treino_id == t.id]
+        registros_treino = [r for r in registros if r.treino_id == t.id]
+        volume_total = 0
+        total_series = 0
+        for r in registros_treino:
+            for s in series_por_registro.get(r.id, ()):
+                volume_total += float(s.carga) * s.repeticoes
+                total_series += 1
+        treino_stats[t.id] = {
+            "codigo": t.codigo, "nome": t.nome, "descricao": t.descricao,
+            "qtd_exercicios": len(exercicios_treino), "qtd_registros": len(registros_treino),
+            "volume_total": volume_total, "total_series": total_series,
+        }
+    return treino_stats
+
+
+def medir(funcao, user_id):
+    """Retorna (resultado, melhor tempo em ms, pico de memória em KB)"""
+    melhor = float("inf")
+    for _ in range(REPETICOES):
+        db.session.expunge_all()
+        inicio = time.perf_counter()
+        resultado = funcao(user_id)
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    funcao(user_id)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, melhor * 1000, pico / 1024
+
+
+def main():
+    # O cálculo novo é medido sem o cache (função original sob o decorator)
+    calcular_em_sql = _calcular_por_treino.__wrapped__
+
+    with app.app_context():
+        db.create_all()
+        user_id, versao_id, exercicios = criar_usuario()
+
+        print(f"{'séries':>8} | {'python ms':>10} {'python KB':>10} | {'sql ms':>8} {'sql KB':>8}")
+        memoria_sql = []
+        for total in TAMANHOS:
+            crescer_historico(user_id, versao_id, exercicios, total)
+            antes, t_antes, m_antes = medir(calcular_em_python, user_id)
+            depois, t_depois, m_depois = medir(calcular_em_sql, user_id)
+            assert antes == depois, "Resultados divergentes entre Python e SQL"
+            print(f"{total:>8} | {t_antes:>10.1f} {m_antes:>10.0f} | {t_depois:>8.1f} {m_depois:>8.0f}")
+            memoria_sql.append(m_depois)
+
+        assert memoria_sql[-1] <= memoria_sql[0] * FATOR_MAXIMO_MEMORIA, \
+            "Memória do agregado em SQL cresceu com o histórico"
+
+        db.session.remove()
+    os.remove(_BANCO)
+
+
+if __name__ == "__main__":
+    main()
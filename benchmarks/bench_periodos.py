@@ -0,0 +1,80 @@
+"""
+Benchmark da interpretação de períodos
+
+Gera períodos com todas as grafias de MESES, separadores e anos variados, e
+compara a conversão antiga (re.match a cada chamada, retorno em texto) com
+utils.periodo: chamada a chamada (memoizada) e em lote (periodos_para_datas),
+além da ordenação de milhares de períodos.
+
+Uso:
+    python -m benchmarks.bench_periodos
+"""
+
+import re
+import time
+from datetime import datetime
+
+from utils.periodo import MESES, interpretar_periodo, periodo_para_data, periodos_para_datas, ordenar_periodos
+
+TOTAL = 100_000
+ANOS = range(2015, 2027)
+SEPARADORES = ["/", "-", " "]
+REPETICOES = 3
+
+
+def gerar_periodos():
+    """Períodos sintéticos cobrindo todas as grafias de MESES"""
+    variacoes = [
+        f"{nome.capitalize()}{sep}{ano}"
+        for nome in MESES for sep in SEPARADORES for ano in ANOS
+    ]
+    return [variacoes[i % len(variacoes)] for i in range(TOTAL)]
+
+
+def converter_antigo(periodo_str):
+    """Reprodução da conversão anterior (padrões recompilados/buscados a cada chamada)"""
+    periodo_limpo = periodo_str.strip().lower()
+    padrao1 = re.match(r'([a-zA-Zçãõáéíóú]+)[/\-\s]+(\d{2,4})', periodo_limpo)
+    if padrao1:
+        ano = padrao1.group(2)
+        if len(ano) == 2:
+            ano = f"20{ano}" if int(ano) <= 50 else f"19{ano}"
+        mes_num = MESES.get(padrao1.group(1).lower())
+        if mes_num:
+            return f"{ano}-{mes_num:02d}-01"
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def medir(funcao):
+    """Melhor tempo em ms"""
+    melhor = float("inf")
+    for _ in range(REPETICOES):
+        interpretar_periodo.cache_clear()
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+
+def main():
+    periodos = gerar_periodos()
+
+    # Todas as grafias precisam ser reconhecidas e coincidir com a conversão antiga
+    datas = periodos_para_datas(periodos)
+    assert all(datas), "Período não reconhecido"
+    assert [d.isoformat() for d in datas[:1000]] == [converter_antigo(p) for p in periodos[:1000]]
+
+    resultados = [
+        ("antigo (texto)", medir(lambda: [converter_antigo(p) for p in periodos])),
+        ("memoizado", medir(lambda: [periodo_para_data(p) for p in periodos])),
+        ("lote", medir(lambda: periodos_para_datas(periodos))),
+        ("ordenação antiga", medir(lambda: sorted(periodos, key=converter_antigo))),
+        ("ordenação em lote", medir(lambda: ordenar_periodos(periodos))),
+    ]
+    print(f"{TOTAL} períodos ({len(set(periodos))} distintos)")
+    for nome, ms in resultados:
+        print(f"{nome:>18}: {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
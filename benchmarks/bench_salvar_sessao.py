@@ -0,0 +1,112 @@
+"""
+Benchmark da gravação de uma sessão de treino (RegistroService.salvar_registros)
+
+Compara a gravação anterior (um flush por exercício e uma série por vez) com
+a inserção em lote (RegistroRepository.inserir_em_lote) para sessões de 5, 15
+e 30 exercícios. Cada medição regrava a mesma sessão, como ao corrigir um
+treino já salvo, e reporta a mediana da latência.
+
+Uso:
+    python -m benchmarks.bench_salvar_sessao
+"""
+
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, datetime
+
+_BANCO = os.path.join(tempfile.mkdtemp(prefix="fitlog-bench-"), "bench.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite:///{_BANCO}"
+
+from app import app  # noqa: E402
+from models import db, User, Treino, Musculo, Exercicio, VersaoGlobal, RegistroTreino, HistoricoTreino  # noqa: E402
+from services.registro_service import RegistroService  # noqa: E402
+from services.resumo_service import ResumoService  # noqa: E402
+from services.cache_invalidacao import marcar_usuario_alterado  # noqa: E402
+from utils.date_utils import calcular_data_sessao  # noqa: E402
+
+TAMANHOS = [5, 15, 30]
+SERIES = 4
+GRAVACOES = 30
+
+
+def criar_usuario():
+    """Usuário com um treino de 30 exercícios"""
+    user = User(username="bench", email="bench@fitlog.com")
+    user.set_password("bench")
+    musculo = Musculo(nome="bench", nome_exibicao="Bench")
+    db.session.add_all([user, musculo])
+    db.session.commit()
+
+    versao = VersaoGlobal(numero_versao=1, descricao="Bench", data_inicio=date(2024, 1, 1), user_id=user.id)
+    treino = Treino(codigo="A", nome="Treino A", descricao="Bench", user_id=user.id)
+    db.session.add_all([versao, treino])
+    db.session.commit()
+    exercicios = [Exercicio(nome=f"Exercício {i}", musculo_id=musculo.id, treino_id=treino.id, user_id=user.id)
+                  for i in range(max(TAMANHOS))]
+    db.session.add_all(exercicios)
+    db.session.commit()
+    return user.id, treino.id, versao.id, [e.id for e in exercicios]
+
+
+def salvar_antigo(treino_id, versao_id, periodo, semana, dados_exercicios, user_id):
+    """Reprodução da gravação anterior: add + flush por exercício, séries uma a uma"""
+    removidos = ResumoService.agregar_sessao(treino_id, versao_id, periodo, semana, user_id)
+    registros_antigos = RegistroTreino.query.filter_by(
+        treino_id=treino_id, periodo=periodo, semana=semana, versao_id=versao_id, user_id=user_id
+    )
+    HistoricoTreino.query.filter(
+        HistoricoTreino.registro_id.in_(registros_antigos.with_entities(RegistroTreino.id))
+    ).delete(synchronize_session=False)
+    registros_antigos.delete(synchronize_session=False)
+
+    data_sessao = calcular_data_sessao(periodo, semana)
+    for ex_id, dados in dados_exercicios.items():
+        registro = RegistroTreino(
+            treino_id=treino_id, versao_id=versao_id, periodo=periodo, semana=semana,
+            exercicio_id=ex_id, data_registro=datetime.now(), data_sessao=data_sessao, user_id=user_id
+        )
+        db.session.add(registro)
+        db.session.flush()
+        for i in range(dados['num_series']):
+            db.session.add(HistoricoTreino(registro_id=registro.id, carga=dados['carga'],
+                                           repeticoes=dados['repeticoes'], ordem=i + 1))
+
+    ResumoService.aplicar_delta(user_id, treino_id, periodo, semana,
+                                removidos, ResumoService.agregar_dados(dados_exercicios))
+    marcar_usuario_alterado(user_id)
+    db.session.commit()
+    return True
+
+
+def medir(funcao, user_id, treino_id, versao_id, exercicio_ids, semana):
+    """Mediana da latência em ms de GRAVACOES regravações da mesma sessão"""
+    tempos = []
+    for n in range(GRAVACOES):
+        dados = {ex_id: {"carga": 40 + n % 5, "repeticoes": 10, "num_series": SERIES}
+                 for ex_id in exercicio_ids}
+        inicio = time.perf_counter()
+        assert funcao(treino_id, versao_id, "Janeiro/2024", semana, dados, user_id=user_id)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main():
+    with app.app_context():
+        db.create_all()
+        user_id, treino_id, versao_id, exercicio_ids = criar_usuario()
+
+        print(f"{'exercícios':>10} | {'antes ms':>9} | {'depois ms':>9}")
+        for semana, tamanho in enumerate(TAMANHOS, start=1):
+            ids = exercicio_ids[:tamanho]
+            antes = medir(salvar_antigo, user_id, treino_id, versao_id, ids, semana)
+            depois = medir(RegistroService.salvar_registros, user_id, treino_id, versao_id, ids, semana)
+            print(f"{tamanho:>10} | {antes:>9.2f} | {depois:>9.2f}")
+
+        db.session.remove()
+    os.remove(_BANCO)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark de EstatisticaService.preparar_dados_tabela com histórico crescente
+
+Gera de 1 a 5 anos de histórico semanal (4 semanas por mês, 30 exercícios
+por semana) e compara a implementação antiga (contagem por semana com
+varredura completa e ordenação via list.index) com a atual (passada única).
+O tempo por registro da atual deve ficar constante (escala linear).
+
+Uso:
+    python -m benchmarks.bench_tabela
+"""
+
+import gc
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from services.estatistica_service import EstatisticaService
+
+MESES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+         "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+ANOS = [1, 2, 3, 4, 5]
+SEMANAS_POR_MES = 4
+EXERCICIOS = 30
+SERIES = 3
+REPETICOES = 5
+
+# A implementação atual não pode piorar mais que isso por registro entre 1 e 5 anos
+FATOR_MAXIMO_POR_REGISTRO = 2
+
+
+def gerar_historico(anos):
+    """Registros sintéticos semanais, com séries já carregadas"""
+    exercicios = [SimpleNamespace(id=i) for i in range(1, EXERCICIOS + 1)]
+    registros = []
+    for ano in range(2020, 2020 + anos):
+        for mes in MESES:
+            for semana in range(1, SEMANAS_POR_MES + 1):
+                for ex in exercicios:
+                    registros.append(SimpleNamespace(
+                        id=len(registros) + 1, exercicio_id=ex.id, periodo=f"{mes}/{ano}",
+                        semana=semana, treino_id=1, versao_id=1, data_registro=datetime(ano, 1, 1),
+                        series=[SimpleNamespace(carga=40 + i, repeticoes=10) for i in range(SERIES)],
+                    ))
+    return exercicios, registros
+
+
+def preparar_antigo(exercicios, registros, semanas_filtro, request_args):
+    """Reprodução da implementação anterior (quadrática no histórico)"""
+    registros_por_exercicio = {}
+    for ex in exercicios:
+        registros_por_exercicio[ex.id] = {}
+    for r in registros:
+        if r.exercicio_id in registros_por_exercicio:
+            key = f"{r.periodo}_{r.semana}"
+            registros_por_exercicio[r.exercicio_id][key] = {
+                'id': r.id,
+                'series': [{'carga': float(s.carga), 'repeticoes': s.repeticoes} for s in r.series],
+                'periodo': r.periodo, 'semana': r.semana, 'treino_id': r.treino_id,
+                'versao_id': r.versao_id,
+                'data_registro': r.data_registro.isoformat() if r.data_registro else None,
+            }
+    semanas_set = set()
+    for r in registros:
+        semanas_set.add((r.periodo, r.semana, f"{r.periodo}_{r.semana}"))
+    semanas = [{"periodo": p, "semana": s, "key": k} for p, s, k in semanas_set]
+    semanas.sort(key=lambda x: (MESES.index(x["periodo"]) if x["periodo"] in MESES else 999, x["semana"]))
+    semanas_filtradas = semanas[-3:] if semanas_filtro == "ultimas3" else semanas
+    periodos_disponiveis = []
+    for periodo in set(s[0] for s in semanas_set):
+        semanas_periodo = sorted([s[1] for s in semanas_set if s[0] == periodo])
+        registros_por_semana = {}
+        for semana in semanas_periodo:
+            registros_por_semana[semana] = sum(1 for r in registros if r.periodo == periodo and r.semana == semana)
+        periodos_disponiveis.append({"periodo": periodo, "semanas": semanas_periodo,
+                                     "registros_por_semana": registros_por_semana})
+    periodos_disponiveis.sort(key=lambda x: MESES.index(x["periodo"]) if x["periodo"] in MESES else 999)
+    return {'semanas': semanas_filtradas, 'registros_por_exercicio': registros_por_exercicio,
+            'semanas_selecionadas_lista': [], 'periodos_disponiveis': periodos_disponiveis}
+
+
+def medir(funcao, exercicios, registros):
+    """Melhor tempo em ms (sem coletas do GC no meio da medição)"""
+    melhor = float("inf")
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(REPETICOES):
+            inicio = time.perf_counter()
+            funcao(exercicios, registros, "todas", {})
+            melhor = min(melhor, time.perf_counter() - inicio)
+    finally:
+        gc.enable()
+    return melhor * 1000
+
+
+def main():
+    print(f"{'anos':>4} {'registros':>9} | {'antes ms':>9} | {'depois ms':>9} {'µs/registro':>11}")
+    por_registro = []
+    for anos in ANOS:
+        exercicios, registros = gerar_historico(anos)
+        antes = medir(preparar_antigo, exercicios, registros)
+        depois = medir(EstatisticaService.preparar_dados_tabela, exercicios, registros)
+        por_registro.append(depois * 1000 / len(registros))
+        print(f"{anos:>4} {len(registros):>9} | {antes:>9.1f} | {depois:>9.1f} {por_registro[-1]:>11.2f}")
+
+    assert por_registro[-1] <= por_registro[0] * FATOR_MAXIMO_POR_REGISTRO, \
+        "preparar_dados_tabela deixou de escalar linearmente"
+
+
+if __name__ == "__main__":
+    main()
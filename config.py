@@ -25,5 +25,37 @@ class Config:
     DEBUG = os.getenv('FLASK_DEBUG', 'True') == 'True'
     TESTING = False
     
+    # Configurações de cache ("memory" por worker ou "sqlite" compartilhado no host)
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', 'instance/cache.sqlite3')
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    
+    # Séries idênticas gravadas como uma linha "N × reps @ carga" (historico_treino.quantidade)
+    SERIES_COMPACTAS = os.getenv('SERIES_COMPACTAS', 'False') == 'True'
+    
+    # Aviso no log quando uma requisição passa deste número de consultas SQL (0 desliga)
+    SQL_CONSULTAS_ALERTA = int(os.getenv('SQL_CONSULTAS_ALERTA', 50))
+    
+    # Métricas (/metrics): "memory" por worker ou "sqlite" somando todos os workers do host
+    METRICAS_BACKEND = os.getenv('METRICAS_BACKEND', 'memory')
+    METRICAS_SQLITE_PATH = os.getenv('METRICAS_SQLITE_PATH', 'instance/metricas.sqlite3')
+    METRICAS_INTERVALO = float(os.getenv('METRICAS_INTERVALO', 5))
+    METRICAS_TOKEN = os.getenv('METRICAS_TOKEN', '')
+    
+    # Perfilamento sob demanda (?__profile=1, só administradores); os perfis ficam em /admin/perfis
+    PERFILADOR_HABILITADO = os.getenv('PERFILADOR_HABILITADO', 'False') == 'True'
+    PERFILADOR_DIR = os.getenv('PERFILADOR_DIR', 'logs/perfis')
+    PERFILADOR_MAX_ARQUIVOS = int(os.getenv('PERFILADOR_MAX_ARQUIVOS', 20))
+    
+    # Requisições acima deste tempo (s) vão, com os planos das consultas, para um JSONL (0 desliga)
+    REQUISICOES_LENTAS_LIMITE = float(os.getenv('REQUISICOES_LENTAS_LIMITE', 0))
+    REQUISICOES_LENTAS_ARQUIVO = os.getenv('REQUISICOES_LENTAS_ARQUIVO', 'logs/requisicoes_lentas.jsonl')
+    REQUISICOES_LENTAS_MAX_BYTES = int(os.getenv('REQUISICOES_LENTAS_MAX_BYTES', 10485760))
+    REQUISICOES_LENTAS_BACKUPS = int(os.getenv('REQUISICOES_LENTAS_BACKUPS', 5))
+    REQUISICOES_LENTAS_EXPLAIN = int(os.getenv('REQUISICOES_LENTAS_EXPLAIN', 3))
+    # EXPLAIN (ANALYZE, BUFFERS) no PostgreSQL: reexecuta as consultas SELECT escolhidas
+    REQUISICOES_LENTAS_ANALYZE = os.getenv('REQUISICOES_LENTAS_ANALYZE', 'False') == 'True'
+    
     # Configurações de logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
\ No newline at end of file
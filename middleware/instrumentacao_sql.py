@@ -0,0 +1,119 @@
+"""
+Instrumentação de SQL por requisição
+
+Ouve before/after_cursor_execute de todos os engines do SQLAlchemy e soma,
+na requisição corrente (flask.g.consultas_sql), o número de consultas, o
+tempo total em SQL e a consulta mais lenta. Ao fim da requisição os números
+vão para o cabeçalho Server-Timing, para a linha de log do LoggingMiddleware
+(via environ) e, acima de SQL_CONSULTAS_ALERTA consultas, para um aviso no
+log com o endpoint (padrões N+1).
+
+Com guardar_consultas() a requisição também guarda cada consulta (texto,
+parâmetros e duração), usado pelo registro de requisições lentas.
+"""
+
+import time
+import logging
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Chave do environ WSGI lida pelo LoggingMiddleware
+CHAVE_ENVIRON = 'fitlog.consultas_sql'
+
+# Consultas guardadas por requisição; além disso só a contagem e os tempos
+MAX_CONSULTAS_GUARDADAS = 500
+
+_INICIOS = 'fitlog_inicio_consultas'
+
+class EstatisticasSQL:
+    """Consultas de uma requisição: quantidade, tempo total e a mais lenta"""
+
+    __slots__ = ('inicio', 'quantidade', 'tempo_total', 'mais_lenta', 'tempo_mais_lenta', 'consultas')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.quantidade = 0
+        self.tempo_total = 0.0
+        self.mais_lenta = None
+        self.tempo_mais_lenta = 0.0
+        self.consultas = None
+
+    def guardar_consultas(self):
+        """Passa a guardar (statement, parâmetros, duração) de cada consulta"""
+        if self.consultas is None:
+            self.consultas = []
+
+    def registrar(self, statement, duracao, parametros=None):
+        self.quantidade += 1
+        self.tempo_total += duracao
+        if self.mais_lenta is None or duracao > self.tempo_mais_lenta:
+            self.mais_lenta = statement
+            self.tempo_mais_lenta = duracao
+        if self.consultas is not None and len(self.consultas) < MAX_CONSULTAS_GUARDADAS:
+            self.consultas.append((statement, parametros, duracao))
+
+    def server_timing(self):
+        """Valor do cabeçalho Server-Timing (durações em ms)"""
+        total = time.perf_counter() - self.inicio
+        return (f'app;dur={total * 1000:.1f}, '
+                f'sql;desc="{self.quantidade} consultas";dur={self.tempo_total * 1000:.1f}, '
+                f'sql-max;desc="consulta mais lenta";dur={self.tempo_mais_lenta * 1000:.1f}')
+
+    def resumo(self):
+        """Trecho para a linha de log da requisição"""
+        return f"SQL: {self.quantidade} consultas em {self.tempo_total:.3f}s"
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_INICIOS, []).append(time.perf_counter())
+
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get(_INICIOS)
+    if not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    if has_app_context():
+        estatisticas = g.get('consultas_sql')
+        if estatisticas is not None:
+            # executemany: parâmetros de várias linhas, não servem para EXPLAIN
+            estatisticas.registrar(statement, duracao, None if executemany else parameters)
+
+def _erro_na_consulta(contexto):
+    inicios = contexto.connection.info.get(_INICIOS) if contexto.connection is not None else None
+    if inicios:
+        inicios.pop()
+
+def _iniciar_requisicao():
+    g.consultas_sql = EstatisticasSQL()
+
+def _finalizar_requisicao(app):
+    def finalizar(response):
+        estatisticas = g.get('consultas_sql')
+        if estatisticas is None:
+            return response
+
+        request.environ[CHAVE_ENVIRON] = estatisticas
+        response.headers.add('Server-Timing', estatisticas.server_timing())
+
+        limite = app.config.get('SQL_CONSULTAS_ALERTA')
+        if limite and estatisticas.quantidade > limite:
+            logger.warning(
+                f"{request.endpoint or request.path}: {estatisticas.quantidade} consultas "
+                f"(limite {limite}) em {estatisticas.tempo_total:.3f}s; mais lenta "
+                f"({estatisticas.tempo_mais_lenta:.3f}s): {estatisticas.mais_lenta[:200]}"
+            )
+        return response
+    return finalizar
+
+def setup_instrumentacao_sql(app):
+    """Registra os ouvintes do SQLAlchemy (idempotente) e os hooks da requisição"""
+    for nome, ouvinte in (('before_cursor_execute', _antes_da_consulta),
+                          ('after_cursor_execute', _depois_da_consulta),
+                          ('handle_error', _erro_na_consulta)):
+        if not event.contains(Engine, nome, ouvinte):
+            event.listen(Engine, nome, ouvinte)
+
+    app.before_request(_iniciar_requisicao)
+    app.after_request(_finalizar_requisicao(app))
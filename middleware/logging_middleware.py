@@ -3,32 +3,60 @@
 import time
 from flask import request, g
 import logging
+from .instrumentacao_sql import CHAVE_ENVIRON, setup_instrumentacao_sql
+from . import metricas
+from .perfilador import setup_perfilador
+from .requisicoes_lentas import setup_requisicoes_lentas
 
 logger = logging.getLogger(__name__)
 
 class LoggingMiddleware:
-    """Middleware que loga todas as requisições"""
+    """Middleware que loga todas as requisições e alimenta as métricas"""
     
     def __init__(self, app):
         self.app = app
     
     def __call__(self, environ, start_response):
         start_time = time.time()
+        em_andamento = [True]
+        metricas.REGISTRO.somar_gauge('fitlog_http_requisicoes_em_andamento', 1)
+        
+        def finalizar():
+            if em_andamento:
+                em_andamento.clear()
+                metricas.REGISTRO.somar_gauge('fitlog_http_requisicoes_em_andamento', -1)
         
         def custom_start_response(status, headers, exc_info=None):
             # Calcular tempo de resposta
             duration = time.time() - start_time
             
-            # Logar requisição
+            # start_response pode ser chamado de novo com exc_info; conta uma vez
+            if em_andamento:
+                finalizar()
+                metricas.registrar_requisicao(
+                    environ.get(metricas.CHAVE_ENDPOINT, 'desconhecido'),
+                    environ.get('REQUEST_METHOD'), status, duration
+                )
+            
+            # Logar requisição (com as consultas SQL, se instrumentadas)
+            consultas = environ.get(CHAVE_ENVIRON)
             logger.info(
                 f"Request: {environ.get('REQUEST_METHOD')} {environ.get('PATH_INFO')} - "
                 f"Status: {status} - Duration: {duration:.3f}s"
+                + (f" - {consultas.resumo()}" if consultas is not None else "")
             )
             
             return start_response(status, headers, exc_info)
         
-        return self.app(environ, custom_start_response)
+        try:
+            return self.app(environ, custom_start_response)
+        finally:
+            finalizar()
 
 def setup_middleware(app):
     """Configura middlewares da aplicação"""
+    setup_instrumentacao_sql(app)
+    metricas.setup_metricas(app)
+    setup_perfilador(app)
+    setup_requisicoes_lentas(app)
     app.wsgi_app = LoggingMiddleware(app.wsgi_app)
\ No newline at end of file
@@ -0,0 +1,310 @@
+"""
+Métricas da aplicação no formato de texto do Prometheus
+
+O LoggingMiddleware registra cada requisição em REGISTRO: contador e
+histograma de latência por endpoint, método e classe de status, e as
+requisições em andamento. Consultas SQL por endpoint vêm da instrumentação
+de SQL. Pool de conexões e acertos do cache são lidos do processo a cada
+gravação/exportação.
+
+Com vários workers, cada um grava periodicamente (METRICAS_INTERVALO) o
+próprio estado num arquivo SQLite compartilhado (METRICAS_BACKEND="sqlite"),
+e a exportação soma os estados de todos os workers: qualquer worker que
+atenda /metrics devolve os totais. Contadores de workers encerrados continuam
+somando; gauges só contam para workers vivos.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+# Chave do environ WSGI com o endpoint da requisição (lida pelo LoggingMiddleware)
+CHAVE_ENDPOINT = 'fitlog.endpoint'
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DESCRICOES = {
+    'fitlog_http_requisicoes_total': ('counter', 'Requisições HTTP atendidas'),
+    'fitlog_http_duracao_segundos': ('histogram', 'Latência das requisições HTTP'),
+    'fitlog_http_requisicoes_em_andamento': ('gauge', 'Requisições HTTP em andamento'),
+    'fitlog_sql_consultas_total': ('counter', 'Consultas SQL executadas por endpoint'),
+    'fitlog_sql_segundos_total': ('counter', 'Tempo gasto em SQL por endpoint'),
+    'fitlog_db_pool_conexoes': ('gauge', 'Conexões do pool do SQLAlchemy por estado'),
+    'fitlog_cache_operacoes_total': ('counter', 'Leituras do cache por resultado'),
+    'fitlog_cache_hit_ratio': ('gauge', 'Fração das leituras do cache com acerto'),
+}
+
+def _chave(nome, rotulos):
+    return (nome, tuple(sorted(rotulos.items())))
+
+class RegistroMetricas:
+    """Contadores, histogramas e gauges do processo, com rótulos"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._histogramas = {}
+        self._gauges = {}
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = _chave(nome, rotulos)
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def definir_contador(self, nome, valor, **rotulos):
+        """Contador mantido fora do registro (ex.: acertos do cache)"""
+        with self._lock:
+            self._contadores[_chave(nome, rotulos)] = valor
+
+    def observar(self, nome, valor, **rotulos):
+        chave = _chave(nome, rotulos)
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                # Contagem por bucket (não acumulada), soma e total
+                histograma = self._histogramas[chave] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    histograma[0][i] += 1
+                    break
+            histograma[1] += valor
+            histograma[2] += 1
+
+    def somar_gauge(self, nome, delta, **rotulos):
+        chave = _chave(nome, rotulos)
+        with self._lock:
+            self._gauges[chave] = self._gauges.get(chave, 0) + delta
+
+    def definir_gauge(self, nome, valor, **rotulos):
+        with self._lock:
+            self._gauges[_chave(nome, rotulos)] = valor
+
+    def snapshot(self):
+        """Estado atual serializável em JSON"""
+        with self._lock:
+            return {
+                'buckets': list(self.buckets),
+                'contadores': [[n, list(map(list, r)), v] for (n, r), v in self._contadores.items()],
+                'histogramas': [[n, list(map(list, r)), list(h[0]), h[1], h[2]]
+                                for (n, r), h in self._histogramas.items()],
+                'gauges': [[n, list(map(list, r)), v] for (n, r), v in self._gauges.items()],
+            }
+
+def combinar(snapshots, gauges_de=None):
+    """
+    Soma os estados de vários workers
+
+    Args:
+        snapshots: Estados gerados por RegistroMetricas.snapshot
+        gauges_de: Índices dos estados cujos gauges entram na soma (padrão: todos)
+    """
+    contadores, histogramas, gauges = {}, {}, {}
+    buckets = None
+    for i, estado in enumerate(snapshots):
+        buckets = buckets or estado['buckets']
+        for nome, rotulos, valor in estado['contadores']:
+            chave = (nome, tuple(map(tuple, rotulos)))
+            contadores[chave] = contadores.get(chave, 0) + valor
+        for nome, rotulos, contagens, soma, total in estado['histogramas']:
+            chave = (nome, tuple(map(tuple, rotulos)))
+            atual = histogramas.setdefault(chave, [[0] * len(contagens), 0.0, 0])
+            atual[0] = [a + b for a, b in zip(atual[0], contagens)]
+            atual[1] += soma
+            atual[2] += total
+        if gauges_de is None or i in gauges_de:
+            for nome, rotulos, valor in estado['gauges']:
+                chave = (nome, tuple(map(tuple, rotulos)))
+                gauges[chave] = gauges.get(chave, 0) + valor
+
+    return {
+        'buckets': buckets or list(BUCKETS),
+        'contadores': [[n, list(map(list, r)), v] for (n, r), v in contadores.items()],
+        'histogramas': [[n, list(map(list, r)), h[0], h[1], h[2]] for (n, r), h in histogramas.items()],
+        'gauges': [[n, list(map(list, r)), v] for (n, r), v in gauges.items()],
+    }
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _formatar_rotulos(rotulos, extra=()):
+    pares = list(rotulos) + list(extra)
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in pares) + '}'
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+def exportar_texto(estado):
+    """Estado (snapshot ou combinação) no formato de texto do Prometheus"""
+    por_nome = {}
+    for nome, rotulos, valor in estado['contadores'] + estado['gauges']:
+        por_nome.setdefault(nome, []).append((rotulos, valor))
+    for nome, rotulos, contagens, soma, total in estado['histogramas']:
+        por_nome.setdefault(nome, []).append((rotulos, (contagens, soma, total)))
+
+    linhas = []
+    for nome in sorted(por_nome):
+        tipo, descricao = DESCRICOES.get(nome, ('untyped', nome))
+        linhas.append(f'# HELP {nome} {descricao}')
+        linhas.append(f'# TYPE {nome} {tipo}')
+        for rotulos, valor in sorted(por_nome[nome], key=lambda item: item[0]):
+            if tipo != 'histogram':
+                linhas.append(f'{nome}{_formatar_rotulos(rotulos)} {_numero(valor)}')
+                continue
+            contagens, soma, total = valor
+            acumulado = 0
+            for limite, contagem in zip(estado['buckets'], contagens):
+                acumulado += contagem
+                linhas.append(f'{nome}_bucket{_formatar_rotulos(rotulos, [("le", _numero(float(limite)))])} {acumulado}')
+            linhas.append(f'{nome}_bucket{_formatar_rotulos(rotulos, [("le", "+Inf")])} {total}')
+            linhas.append(f'{nome}_sum{_formatar_rotulos(rotulos)} {_numero(float(soma))}')
+            linhas.append(f'{nome}_count{_formatar_rotulos(rotulos)} {total}')
+    return '\n'.join(linhas) + '\n'
+
+def _processo_vivo(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+class ArmazemMetricas:
+    """Estados dos workers num arquivo SQLite compartilhado (um registro por pid)"""
+
+    def __init__(self, caminho, intervalo=5.0, relogio=time.monotonic):
+        self.caminho = str(caminho)
+        self.intervalo = intervalo
+        self._relogio = relogio
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._ultima_gravacao = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+        self._conexao().execute(
+            """CREATE TABLE IF NOT EXISTS metricas_workers (
+                pid INTEGER PRIMARY KEY,
+                atualizado_em REAL NOT NULL,
+                estado TEXT NOT NULL
+            )"""
+        )
+
+    def _conexao(self):
+        """Uma conexão por thread e por processo (seguro após fork)"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None or self._local.pid != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=10, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+    def gravar(self, estado, pid=None):
+        self._conexao().execute(
+            "INSERT OR REPLACE INTO metricas_workers (pid, atualizado_em, estado) VALUES (?, ?, ?)",
+            (pid or os.getpid(), time.time(), json.dumps(estado))
+        )
+
+    def vencido(self):
+        """True (uma vez por intervalo) quando é hora de gravar o estado do processo"""
+        agora = self._relogio()
+        with self._lock:
+            if self._ultima_gravacao is not None and agora - self._ultima_gravacao < self.intervalo:
+                return False
+            self._ultima_gravacao = agora
+            return True
+
+    def carregar(self):
+        """Soma dos estados gravados (gauges apenas de workers vivos)"""
+        linhas = self._conexao().execute("SELECT pid, estado FROM metricas_workers ORDER BY pid").fetchall()
+        estados = [json.loads(estado) for _, estado in linhas]
+        vivos = {i for i, (pid, _) in enumerate(linhas) if _processo_vivo(pid)}
+        return combinar(estados, gauges_de=vivos)
+
+REGISTRO = RegistroMetricas()
+
+_armazem = None
+
+def get_armazem():
+    return _armazem
+
+def registrar_requisicao(endpoint, metodo, status, duracao):
+    """Chamado pelo LoggingMiddleware ao fim de cada requisição"""
+    classe = f"{str(status)[:1]}xx"
+    REGISTRO.incrementar('fitlog_http_requisicoes_total', endpoint=endpoint, metodo=metodo, status=classe)
+    REGISTRO.observar('fitlog_http_duracao_segundos', duracao, endpoint=endpoint, status=classe)
+    if _armazem is not None and _armazem.vencido():
+        try:
+            coletar_estado_do_processo()
+            _armazem.gravar(REGISTRO.snapshot())
+        except Exception as e:
+            logger.warning(f"Erro ao gravar métricas compartilhadas: {e}")
+
+def coletar_estado_do_processo():
+    """Atualiza gauges do pool de conexões e contadores do cache deste processo"""
+    from models import db
+    from services import CacheService
+
+    try:
+        pool = db.engine.pool
+        for estado, leitura in (('tamanho', 'size'), ('em_uso', 'checkedout'),
+                                ('livres', 'checkedin'), ('overflow', 'overflow')):
+            metodo = getattr(pool, leitura, None)
+            if callable(metodo):
+                REGISTRO.definir_gauge('fitlog_db_pool_conexoes', metodo(), estado=estado)
+    except Exception as e:
+        logger.debug(f"Pool de conexões indisponível para métricas: {e}")
+
+    stats = CacheService.stats()
+    REGISTRO.definir_contador('fitlog_cache_operacoes_total', stats.get('hits', 0), resultado='hit')
+    REGISTRO.definir_contador('fitlog_cache_operacoes_total', stats.get('misses', 0), resultado='miss')
+
+def exportar():
+    """Texto do /metrics: totais de todos os workers quando há armazém compartilhado"""
+    coletar_estado_do_processo()
+    if _armazem is not None:
+        _armazem.gravar(REGISTRO.snapshot())
+        estado = _armazem.carregar()
+    else:
+        estado = REGISTRO.snapshot()
+
+    leituras = {dict(r).get('resultado'): v for n, r, v in estado['contadores']
+                if n == 'fitlog_cache_operacoes_total'}
+    total = leituras.get('hit', 0) + leituras.get('miss', 0)
+    estado['gauges'].append(['fitlog_cache_hit_ratio', [], leituras.get('hit', 0) / total if total else 0.0])
+    return exportar_texto(estado)
+
+def _marcar_endpoint(response):
+    consultas = g.get('consultas_sql')
+    endpoint = request.endpoint or 'desconhecido'
+    request.environ[CHAVE_ENDPOINT] = endpoint
+    if consultas is not None:
+        REGISTRO.incrementar('fitlog_sql_consultas_total', consultas.quantidade, endpoint=endpoint)
+        REGISTRO.incrementar('fitlog_sql_segundos_total', consultas.tempo_total, endpoint=endpoint)
+    return response
+
+def setup_metricas(app):
+    """Configura o armazém compartilhado (METRICAS_BACKEND) e o hook de endpoint"""
+    global _armazem
+    tipo = (app.config.get('METRICAS_BACKEND') or 'memory').lower()
+    if tipo == 'sqlite':
+        _armazem = ArmazemMetricas(
+            app.config.get('METRICAS_SQLITE_PATH', 'instance/metricas.sqlite3'),
+            intervalo=app.config.get('METRICAS_INTERVALO', 5)
+        )
+    else:
+        if tipo != 'memory':
+            logger.warning(f"METRICAS_BACKEND desconhecido: {tipo}. Usando memória.")
+        _armazem = None
+    app.after_request(_marcar_endpoint)
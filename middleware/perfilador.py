@@ -0,0 +1,142 @@
+"""
+Perfilamento sob demanda de requisições (somente administradores)
+
+Com PERFILADOR_HABILITADO, um administrador logado pode perfilar uma
+requisição com ?__profile=1 ou o cabeçalho X-Fitlog-Profile: 1. A requisição
+roda sob cProfile e as estatísticas (formato pstats) vão para PERFILADOR_DIR,
+um buffer circular em disco com no máximo PERFILADOR_MAX_ARQUIVOS perfis
+(os mais antigos são apagados). Cada perfil tem um .json ao lado com
+endpoint, caminho, usuário e duração, listados em /admin/perfis.
+
+Desabilitado, os hooks nem são registrados: não há custo por requisição.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import time
+from datetime import datetime
+from flask import g, request
+from flask_login import current_user
+
+logger = logging.getLogger(__name__)
+
+PARAMETRO = '__profile'
+CABECALHO = 'X-Fitlog-Profile'
+
+_NOME_VALIDO = re.compile(r'^[\w.\-]+\.prof$')
+
+_config = {'habilitado': False, 'diretorio': 'logs/perfis', 'max_arquivos': 20}
+
+def _solicitado():
+    return request.args.get(PARAMETRO) == '1' or request.headers.get(CABECALHO) == '1'
+
+def _iniciar():
+    if not _solicitado() or not (current_user.is_authenticated and current_user.is_admin):
+        return
+    g.perfilador = cProfile.Profile()
+    g.perfilador_inicio = time.perf_counter()
+    g.perfilador.enable()
+
+def _finalizar(response):
+    perfilador = g.pop('perfilador', None)
+    if perfilador is None:
+        return response
+    perfilador.disable()
+    duracao = time.perf_counter() - g.pop('perfilador_inicio')
+    try:
+        nome = gravar_perfil(perfilador, {
+            'endpoint': request.endpoint,
+            'metodo': request.method,
+            'caminho': request.full_path.rstrip('?'),
+            'status': response.status_code,
+            'user_id': current_user.id,
+            'duracao': round(duracao, 4),
+            'criado_em': datetime.now().isoformat(timespec='seconds'),
+        })
+        response.headers['X-Fitlog-Profile'] = nome
+    except Exception as e:
+        logger.error(f"Erro ao gravar perfil de {request.path}: {e}")
+    return response
+
+def _descartar(erro=None):
+    # Exceção antes do after_request: não deixa o perfilador ligado
+    perfilador = g.pop('perfilador', None)
+    if perfilador is not None:
+        perfilador.disable()
+
+def gravar_perfil(perfilador, metadados):
+    """
+    Grava o perfil e seus metadados e apaga os excedentes mais antigos
+
+    Returns:
+        str: Nome do arquivo .prof gravado
+    """
+    diretorio = _config['diretorio']
+    os.makedirs(diretorio, exist_ok=True)
+    endpoint = re.sub(r'[^\w.\-]', '_', metadados.get('endpoint') or 'desconhecido')
+    nome = f"{datetime.now():%Y%m%d-%H%M%S-%f}_{os.getpid()}_{endpoint}.prof"
+
+    perfilador.dump_stats(os.path.join(diretorio, nome))
+    with open(os.path.join(diretorio, nome[:-5] + '.json'), 'w', encoding='utf-8') as f:
+        json.dump(dict(metadados, arquivo=nome), f, ensure_ascii=False)
+
+    perfis = sorted(p for p in os.listdir(diretorio) if _NOME_VALIDO.match(p))
+    for antigo in perfis[:-_config['max_arquivos']]:
+        for extensao in ('.prof', '.json'):
+            try:
+                os.remove(os.path.join(diretorio, antigo[:-5] + extensao))
+            except OSError:
+                pass
+    logger.info(f"Perfil gravado: {nome} ({metadados.get('duracao')}s)")
+    return nome
+
+def listar_perfis():
+    """Metadados dos perfis gravados, do mais recente ao mais antigo"""
+    diretorio = _config['diretorio']
+    if not os.path.isdir(diretorio):
+        return []
+    perfis = []
+    for nome in sorted((p for p in os.listdir(diretorio) if _NOME_VALIDO.match(p)), reverse=True):
+        try:
+            with open(os.path.join(diretorio, nome[:-5] + '.json'), encoding='utf-8') as f:
+                perfis.append(json.load(f))
+        except (OSError, ValueError):
+            perfis.append({'arquivo': nome})
+    return perfis
+
+def caminho_perfil(nome):
+    """Caminho de um perfil gravado, ou None se o nome for inválido ou não existir"""
+    if not _NOME_VALIDO.match(nome or ''):
+        return None
+    caminho = os.path.join(_config['diretorio'], nome)
+    return caminho if os.path.isfile(caminho) else None
+
+def resumo_perfil(nome, ordenar='cumulative', linhas=40):
+    """Relatório de texto do pstats (as `linhas` funções mais caras)"""
+    caminho = caminho_perfil(nome)
+    if caminho is None:
+        return None
+    saida = io.StringIO()
+    pstats.Stats(caminho, stream=saida).strip_dirs().sort_stats(ordenar).print_stats(linhas)
+    return saida.getvalue()
+
+def perfilador_habilitado():
+    return _config['habilitado']
+
+def setup_perfilador(app):
+    """Lê PERFILADOR_* do Config e, se habilitado, registra os hooks da requisição"""
+    _config.update(
+        habilitado=bool(app.config.get('PERFILADOR_HABILITADO')),
+        diretorio=app.config.get('PERFILADOR_DIR', 'logs/perfis'),
+        max_arquivos=int(app.config.get('PERFILADOR_MAX_ARQUIVOS', 20)),
+    )
+    if not _config['habilitado']:
+        return
+    app.before_request(_iniciar)
+    app.after_request(_finalizar)
+    app.teardown_request(_descartar)
@@ -0,0 +1,139 @@
+"""
+Registro de requisições lentas com os planos das consultas
+
+Com REQUISICOES_LENTAS_LIMITE (segundos) maior que zero, cada requisição
+guarda suas consultas SQL (instrumentacao_sql). As que passam do limite
+vão, uma por linha, para o JSONL rotativo REQUISICOES_LENTAS_ARQUIVO com:
+
+- endpoint, método, caminho, argumentos da URL e usuário;
+- todas as consultas com as durações (sem os parâmetros, que podem conter
+  dados pessoais);
+- o plano (EXPLAIN) das REQUISICOES_LENTAS_EXPLAIN consultas SELECT mais
+  lentas: EXPLAIN QUERY PLAN no SQLite; EXPLAIN no PostgreSQL, ou
+  EXPLAIN (ANALYZE, BUFFERS) com REQUISICOES_LENTAS_ANALYZE (reexecuta a
+  consulta, dentro de uma transação desfeita).
+
+utils/relatorio_indices.py resume o arquivo por índice.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from flask import g, request
+from flask_login import current_user
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# Logger só das linhas JSONL (não propaga para o fitlog.log)
+registro = logging.getLogger('fitlog.requisicoes_lentas')
+registro.propagate = False
+
+_config = {'limite': 0.0, 'explain': 3, 'analyze': False}
+
+def _iniciar():
+    if not _config['limite']:
+        return
+    estatisticas = g.get('consultas_sql')
+    if estatisticas is not None:
+        estatisticas.guardar_consultas()
+
+def _finalizar(response):
+    estatisticas = g.get('consultas_sql')
+    if not _config['limite'] or estatisticas is None or estatisticas.consultas is None:
+        return response
+    duracao = time.perf_counter() - estatisticas.inicio
+    if duracao < _config['limite']:
+        return response
+    try:
+        registro.info(json.dumps(montar_registro(estatisticas, response, duracao),
+                                 ensure_ascii=False, default=str))
+    except Exception as e:
+        logger.error(f"Erro ao registrar requisição lenta {request.path}: {e}")
+    return response
+
+def montar_registro(estatisticas, response, duracao):
+    """Dicionário gravado para uma requisição lenta"""
+    return {
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'endpoint': request.endpoint,
+        'metodo': request.method,
+        'caminho': request.path,
+        'args': request.args.to_dict(flat=False),
+        'view_args': request.view_args or {},
+        'user_id': current_user.id if current_user.is_authenticated else None,
+        'status': response.status_code,
+        'duracao': round(duracao, 4),
+        'sql': {
+            'quantidade': estatisticas.quantidade,
+            'tempo_total': round(estatisticas.tempo_total, 4),
+            'consultas': [{'sql': sql, 'duracao': round(tempo, 5)}
+                          for sql, _, tempo in estatisticas.consultas],
+        },
+        'planos': planos_das_mais_lentas(estatisticas),
+    }
+
+def planos_das_mais_lentas(estatisticas):
+    """EXPLAIN das consultas SELECT mais lentas (uma por texto de consulta)"""
+    mais_lentas = {}
+    for sql, parametros, tempo in estatisticas.consultas:
+        if parametros is None or sql.lstrip()[:6].upper() != 'SELECT':
+            continue
+        if sql not in mais_lentas or tempo > mais_lentas[sql][1]:
+            mais_lentas[sql] = (parametros, tempo)
+    escolhidas = sorted(mais_lentas.items(), key=lambda item: item[1][1], reverse=True)[:_config['explain']]
+    if not escolhidas:
+        return []
+
+    # As consultas do EXPLAIN não entram na contagem da requisição
+    g.consultas_sql = None
+    try:
+        with db.engine.connect() as conn:
+            return [{'sql': sql, 'duracao': round(tempo, 5), 'plano': _explicar(conn, sql, parametros)}
+                    for sql, (parametros, tempo) in escolhidas]
+    finally:
+        g.consultas_sql = estatisticas
+
+def _explicar(conn, sql, parametros):
+    dialeto = conn.dialect.name
+    if dialeto == 'sqlite':
+        prefixo = 'EXPLAIN QUERY PLAN '
+    elif dialeto == 'postgresql':
+        prefixo = 'EXPLAIN (ANALYZE, BUFFERS) ' if _config['analyze'] else 'EXPLAIN '
+    else:
+        return None
+    try:
+        linhas = conn.exec_driver_sql(prefixo + sql, parametros).fetchall()
+        return [str(linha[-1]) for linha in linhas]
+    except Exception as e:
+        return [f"erro: {e}"]
+    finally:
+        conn.rollback()
+
+def abrir_arquivo(caminho, max_bytes=10485760, backups=5):
+    """Direciona o registro para um JSONL rotativo; devolve o handler"""
+    handler = RotatingFileHandler(caminho, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    registro.addHandler(handler)
+    registro.setLevel(logging.INFO)
+    return handler
+
+def setup_requisicoes_lentas(app):
+    """Lê REQUISICOES_LENTAS_* do Config e, se habilitado, abre o arquivo e registra os hooks"""
+    _config.update(
+        limite=float(app.config.get('REQUISICOES_LENTAS_LIMITE') or 0),
+        explain=int(app.config.get('REQUISICOES_LENTAS_EXPLAIN', 3)),
+        analyze=bool(app.config.get('REQUISICOES_LENTAS_ANALYZE')),
+    )
+    if not _config['limite']:
+        return
+    if not registro.handlers:
+        abrir_arquivo(app.config.get('REQUISICOES_LENTAS_ARQUIVO', 'logs/requisicoes_lentas.jsonl'),
+                      int(app.config.get('REQUISICOES_LENTAS_MAX_BYTES', 10485760)),
+                      int(app.config.get('REQUISICOES_LENTAS_BACKUPS', 5)))
+
+    # Depois do before_request da instrumentação, que cria g.consultas_sql
+    app.before_request(_iniciar)
+    app.after_request(_finalizar)
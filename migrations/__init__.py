@@ -0,0 +1,30 @@
+"""
+Migrações de esquema do FitLog
+
+O projeto cria as tabelas com db.create_all(), que não altera tabelas já
+existentes. Cada migração aqui é idempotente (verifica o esquema antes de
+alterar) e é aplicada na inicialização da aplicação, depois do create_all.
+Também podem ser executadas manualmente:
+    python -m migrations
+"""
+
+import logging
+from . import m001_data_sessao, m002_series_compactas
+
+logger = logging.getLogger(__name__)
+
+MIGRACOES = [
+    ('001_data_sessao', m001_data_sessao.aplicar),
+    ('002_series_compactas', m002_series_compactas.aplicar),
+]
+
+def aplicar_migracoes():
+    """Aplica todas as migrações em ordem; retorna os nomes das que falharam"""
+    falhas = []
+    for nome, aplicar in MIGRACOES:
+        try:
+            aplicar()
+        except Exception as e:
+            logger.error(f"Erro na migração {nome}: {e}", exc_info=True)
+            falhas.append(nome)
+    return falhas
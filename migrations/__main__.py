@@ -0,0 +1,9 @@
+import sys
+from app import app
+from . import aplicar_migracoes
+
+with app.app_context():
+    falhas = aplicar_migracoes()
+if falhas:
+    sys.exit(f"Migrações com erro: {', '.join(falhas)} (veja logs/fitlog.log)")
+print("Migrações aplicadas")
@@ -0,0 +1,65 @@
+"""
+Coluna data_sessao em registros_treino e resumo_semanal
+
+Adiciona a data normalizada da sessão (primeiro dia do mês do período mais
+semana - 1 semanas), cria os índices (user_id, data_sessao) e preenche as
+linhas existentes a partir do texto do período. Períodos sem mês/ano
+reconhecíveis ficam com NULL e vão para o fim das ordenações.
+"""
+
+import logging
+from models import db, RegistroTreino, ResumoSemanal
+from services import CacheService
+from utils.date_utils import calcular_data_sessao
+
+logger = logging.getLogger(__name__)
+
+MODELOS = (RegistroTreino, ResumoSemanal)
+
+def _adicionar_coluna(modelo):
+    tabela = modelo.__table__
+    colunas = {c['name'] for c in db.inspect(db.engine).get_columns(tabela.name)}
+    if 'data_sessao' not in colunas:
+        with db.engine.begin() as conexao:
+            conexao.execute(db.text(f"ALTER TABLE {tabela.name} ADD COLUMN data_sessao DATE"))
+        logger.info(f"Coluna data_sessao adicionada em {tabela.name}")
+    
+    for indice in tabela.indexes:
+        if 'data_sessao' in indice.columns:
+            indice.create(bind=db.engine, checkfirst=True)
+
+def preencher(modelo):
+    """
+    Preenche data_sessao onde está vazia (uma atualização por semana distinta)
+    
+    Returns:
+        int: Número de linhas atualizadas
+    """
+    semanas = db.session.query(modelo.periodo, modelo.semana)\
+        .filter(modelo.data_sessao.is_(None)).distinct().all()
+    
+    total = 0
+    for periodo, semana in semanas:
+        data_sessao = calcular_data_sessao(periodo, semana)
+        if data_sessao is None:
+            continue
+        total += modelo.query.filter(
+            modelo.periodo == periodo,
+            modelo.semana == semana,
+            modelo.data_sessao.is_(None)
+        ).update({modelo.data_sessao: data_sessao}, synchronize_session=False)
+    db.session.commit()
+    return total
+
+def aplicar():
+    preenchidas = 0
+    for modelo in MODELOS:
+        _adicionar_coluna(modelo)
+        total = preencher(modelo)
+        if total:
+            logger.info(f"data_sessao preenchida em {total} linhas de {modelo.__tablename__}")
+        preenchidas += total
+    
+    # Resultados memoizados antes do backfill podem estar fora de ordem
+    if preenchidas:
+        CacheService.clear()
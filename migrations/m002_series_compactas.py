@@ -0,0 +1,110 @@
+"""
+Coluna quantidade em historico_treino (séries compactas)
+
+Uma linha de histórico passa a poder representar várias séries idênticas
+("séries × repetições @ carga"): quantidade séries a partir de ordem. A
+migração automática só adiciona a coluna (DEFAULT 1, ou seja, o formato
+atual). A conversão dos dados existentes é opcional e reversível:
+    python -m migrations.m002_series_compactas --compactar
+    python -m migrations.m002_series_compactas --expandir
+
+Compactar junta as séries de cada registro cujas linhas têm todas a mesma
+carga e repetições na linha de menor id; volume, número de séries e cargas
+médias não mudam, então o resumo semanal continua válido.
+"""
+
+import logging
+from models import db, HistoricoTreino
+from services import CacheService
+
+logger = logging.getLogger(__name__)
+
+LOTE = 500
+
+def _adicionar_coluna():
+    tabela = HistoricoTreino.__table__.name
+    colunas = {c['name'] for c in db.inspect(db.engine).get_columns(tabela)}
+    if 'quantidade' not in colunas:
+        with db.engine.begin() as conexao:
+            conexao.execute(db.text(
+                f"ALTER TABLE {tabela} ADD COLUMN quantidade INTEGER NOT NULL DEFAULT 1"
+            ))
+        logger.info(f"Coluna quantidade adicionada em {tabela}")
+
+def compactar():
+    """
+    Junta as séries idênticas de cada registro em uma linha
+
+    Returns:
+        int: Número de registros compactados
+    """
+    candidatos = db.session.query(
+        HistoricoTreino.registro_id,
+        db.func.min(HistoricoTreino.id),
+        db.func.sum(HistoricoTreino.quantidade)
+    ).group_by(HistoricoTreino.registro_id).having(
+        db.func.count(HistoricoTreino.id) > 1,
+        db.func.min(HistoricoTreino.carga) == db.func.max(HistoricoTreino.carga),
+        db.func.min(HistoricoTreino.repeticoes) == db.func.max(HistoricoTreino.repeticoes)
+    ).all()
+
+    for i in range(0, len(candidatos), LOTE):
+        lote = candidatos[i:i + LOTE]
+        db.session.execute(
+            db.update(HistoricoTreino),
+            [{'id': manter, 'ordem': 1, 'quantidade': quantidade} for _, manter, quantidade in lote]
+        )
+        HistoricoTreino.query.filter(
+            HistoricoTreino.registro_id.in_([registro_id for registro_id, _, _ in lote]),
+            HistoricoTreino.id.notin_([manter for _, manter, _ in lote])
+        ).delete(synchronize_session=False)
+    db.session.commit()
+
+    if candidatos:
+        CacheService.clear()
+    logger.info(f"Séries compactadas em {len(candidatos)} registros")
+    return len(candidatos)
+
+def expandir():
+    """
+    Desfaz a compactação: uma linha por série
+
+    Returns:
+        int: Número de linhas compactas expandidas
+    """
+    compactas = HistoricoTreino.query.filter(HistoricoTreino.quantidade > 1)\
+        .order_by(HistoricoTreino.id).all()
+
+    novas = [{
+        'registro_id': linha.registro_id,
+        'carga': serie.carga,
+        'repeticoes': serie.repeticoes,
+        'ordem': serie.ordem,
+        'quantidade': 1
+    } for linha in compactas for serie in linha.expandir()[1:]]
+
+    for linha in compactas:
+        linha.quantidade = 1
+    for i in range(0, len(novas), LOTE):
+        db.session.execute(db.insert(HistoricoTreino), novas[i:i + LOTE])
+    db.session.commit()
+
+    if compactas:
+        CacheService.clear()
+    logger.info(f"{len(compactas)} linhas de séries expandidas")
+    return len(compactas)
+
+def aplicar():
+    _adicionar_coluna()
+
+if __name__ == "__main__":
+    import sys
+    from app import app
+
+    opcoes = {'--compactar': compactar, '--expandir': expandir}
+    if len(sys.argv) != 2 or sys.argv[1] not in opcoes:
+        sys.exit("Uso: python -m migrations.m002_series_compactas [--compactar|--expandir]")
+
+    with app.app_context():
+        total = opcoes[sys.argv[1]]()
+    print(f"{total} {'registros compactados' if sys.argv[1] == '--compactar' else 'linhas expandidas'}")
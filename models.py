@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from collections import namedtuple
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -48,6 +49,7 @@ class Treino(db.Model):
     exercicios = db.relationship('Exercicio', backref='treino_ref', lazy=True, cascade='all, delete-orphan')
     versoes = db.relationship('TreinoVersao', backref='treino_ref', lazy=True, cascade='all, delete-orphan')
     registros = db.relationship('RegistroTreino', backref='treino_ref', lazy=True, cascade='all, delete-orphan')
+    resumos = db.relationship('ResumoSemanal', lazy=True, cascade='all, delete-orphan')
     
     __table_args__ = (
         db.UniqueConstraint('user_id', 'codigo', name='unique_treino_por_usuario'),
@@ -75,6 +77,7 @@ class Exercicio(db.Model):
     
     versoes = db.relationship('VersaoExercicio', backref='exercicio_ref', lazy=True, cascade='all, delete-orphan')
     registros = db.relationship('RegistroTreino', backref='exercicio_ref', lazy=True, cascade='all, delete-orphan')
+    resumos = db.relationship('ResumoSemanal', lazy=True, cascade='all, delete-orphan')
     
     __table_args__ = (
         db.Index('idx_exercicio_user', 'user_id'),
@@ -140,10 +143,13 @@ class RegistroTreino(db.Model):
     semana = db.Column(db.Integer, nullable=False)
     exercicio_id = db.Column(db.Integer, db.ForeignKey('exercicios.id'), nullable=False)
     data_registro = db.Column(db.DateTime, nullable=False)
+    data_sessao = db.Column(db.Date)  # período + semana normalizados (utils.date_utils.calcular_data_sessao)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now)
     
-    series = db.relationship('HistoricoTreino', backref='registro_ref', lazy='dynamic', cascade='all, delete-orphan')
+    # Linhas gravadas (uma linha pode representar várias séries idênticas)
+    series_gravadas = db.relationship('HistoricoTreino', backref='registro_ref', cascade='all, delete-orphan',
+                                      order_by='HistoricoTreino.ordem')
     
     __table_args__ = (
         db.Index('idx_registro_user_data', 'user_id', 'data_registro'),
@@ -151,7 +157,16 @@ class RegistroTreino(db.Model):
         db.Index('idx_registro_exercicio', 'exercicio_id'),
         db.Index('idx_registro_versao', 'versao_id'),  # NOVO ÍNDICE
         db.Index('idx_registro_periodo_semana', 'periodo', 'semana'),  # NOVO ÍNDICE
+        db.Index('idx_registro_user_sessao', 'user_id', 'data_sessao'),
     )
+    
+    @property
+    def series(self):
+        """Séries individuais, com as linhas compactas expandidas"""
+        return [serie for linha in self.series_gravadas for serie in linha.expandir()]
+
+# Série individual obtida ao expandir uma linha compacta de historico_treino
+Serie = namedtuple('Serie', 'carga repeticoes ordem')
 
 class HistoricoTreino(db.Model):
     __tablename__ = 'historico_treino'
@@ -160,8 +175,39 @@ class HistoricoTreino(db.Model):
     carga = db.Column(db.Numeric(5,1), nullable=False)
     repeticoes = db.Column(db.Integer, nullable=False)
     ordem = db.Column(db.Integer, default=0)
+    quantidade = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # séries idênticas a partir de ordem
     
     __table_args__ = (
         db.Index('idx_historico_registro', 'registro_id'),
         db.Index('idx_historico_carga', 'carga'),  # NOVO ÍNDICE
-    )
\ No newline at end of file
+    )
+    
+    def expandir(self):
+        """Séries individuais desta linha (ela mesma quando não é compacta)"""
+        quantidade = self.quantidade or 1
+        if quantidade == 1:
+            return [self]
+        return [Serie(self.carga, self.repeticoes, (self.ordem or 1) + i) for i in range(quantidade)]
+
+class ResumoSemanal(db.Model):
+    """Agregado por (usuário, treino, exercício, período, semana), mantido por RegistroService"""
+    __tablename__ = 'resumo_semanal'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    treino_id = db.Column(db.Integer, db.ForeignKey('treinos.id', ondelete='CASCADE'), nullable=False)
+    exercicio_id = db.Column(db.Integer, db.ForeignKey('exercicios.id', ondelete='CASCADE'), nullable=False)
+    periodo = db.Column(db.String(50), nullable=False)
+    semana = db.Column(db.Integer, nullable=False)
+    data_sessao = db.Column(db.Date)
+    qtd_registros = db.Column(db.Integer, nullable=False, default=0)
+    total_series = db.Column(db.Integer, nullable=False, default=0)
+    volume_total = db.Column(db.Numeric(14,1), nullable=False, default=0)
+    soma_cargas = db.Column(db.Numeric(12,1), nullable=False, default=0)  # carga média = soma_cargas / total_series
+    soma_repeticoes = db.Column(db.Integer, nullable=False, default=0)
+    carga_maxima = db.Column(db.Numeric(5,1))
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'treino_id', 'exercicio_id', 'periodo', 'semana', name='unique_resumo_semanal'),
+        db.Index('idx_resumo_exercicio', 'exercicio_id'),
+        db.Index('idx_resumo_user_sessao', 'user_id', 'data_sessao'),
+    )
@@ -69,13 +69,14 @@ class ExercicioRepository(BaseRepository):
                 .limit(limite).all()
             
             resultado = []
-            for serie in series:
-                resultado.append({
-                    'carga': float(serie.carga),
-                    'repeticoes': serie.repeticoes
-                })
+            for linha in series:
+                for serie in linha.expandir():
+                    resultado.append({
+                        'carga': float(serie.carga),
+                        'repeticoes': serie.repeticoes
+                    })
             
-            return resultado
+            return resultado[:limite]
         except Exception as e:
             logger.error(f"Erro ao buscar últimas séries {exercicio_id}: {e}")
             return []
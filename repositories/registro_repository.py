@@ -1,14 +1,32 @@
 """Repositório para operações com registros de treino"""
 
-from models import RegistroTreino, HistoricoTreino
-from sqlalchemy.orm import joinedload
-from sqlalchemy import func
+from models import db, RegistroTreino, HistoricoTreino
+from flask import current_app
+from sqlalchemy.orm import selectinload
+from sqlalchemy import func, insert
 from .base_repository import BaseRepository
 import logging
 from datetime import datetime
+from utils.date_utils import calcular_data_sessao
 
 logger = logging.getLogger(__name__)
 
+def linhas_de_series(carga, repeticoes, num_series, compactas=None):
+    """
+    Linhas de historico_treino para num_series séries iguais
+    
+    Na forma compacta (SERIES_COMPACTAS) vira uma única linha
+    "séries × repetições @ carga", com quantidade=num_series.
+    """
+    if compactas is None:
+        compactas = current_app.config.get('SERIES_COMPACTAS', False)
+    if not num_series:
+        return []
+    if compactas:
+        return [{'carga': carga, 'repeticoes': repeticoes, 'ordem': 1, 'quantidade': num_series}]
+    return [{'carga': carga, 'repeticoes': repeticoes, 'ordem': ordem, 'quantidade': 1}
+            for ordem in range(1, num_series + 1)]
+
 class RegistroRepository(BaseRepository):
     """Repositório para gerenciar registros de treino"""
     
@@ -21,7 +39,7 @@ class RegistroRepository(BaseRepository):
             query = self.model_class.query
             
             if load_series:
-                query = query.options(joinedload(RegistroTreino.series))
+                query = query.options(selectinload(RegistroTreino.series_gravadas))
             
             query = self.filter_by_user(query, user_id)
             
@@ -50,7 +68,7 @@ class RegistroRepository(BaseRepository):
                 periodo=periodo,
                 semana=semana,
                 versao_id=versao_id
-            ).options(joinedload(RegistroTreino.series))
+            ).options(selectinload(RegistroTreino.series_gravadas))
             
             query = self.filter_by_user(query, user_id)
             return query.all()
@@ -58,64 +76,74 @@ class RegistroRepository(BaseRepository):
             logger.error(f"Erro ao buscar sessão: {e}")
             return []
     
-    def salvar_sessao(self, treino_id, versao_id, periodo, semana, dados_exercicios, user_id=None):
-        """Salva uma sessão completa de treino"""
-        try:
-            user_id = user_id or self.get_current_user_id()
-            if not user_id:
-                return False
-            
-            # Remover registros antigos da mesma sessão
-            self.model_class.query.filter_by(
-                treino_id=treino_id,
-                periodo=periodo,
-                semana=semana,
-                versao_id=versao_id,
-                user_id=user_id
-            ).delete()
-            
-            # Criar novos registros
-            for ex_id, dados in dados_exercicios.items():
-                if dados['carga'] and dados['repeticoes']:
-                    registro = RegistroTreino(
-                        treino_id=treino_id,
-                        versao_id=versao_id,
-                        periodo=periodo,
-                        semana=semana,
-                        exercicio_id=ex_id,
-                        data_registro=dados.get('data_registro', datetime.now()),
-                        user_id=user_id
-                    )
-                    db.session.add(registro)
-                    db.session.flush()
-                    
-                    for i in range(dados['num_series']):
-                        serie = HistoricoTreino(
-                            registro_id=registro.id,
-                            carga=dados['carga'],
-                            repeticoes=dados['repeticoes'],
-                            ordem=i+1
-                        )
-                        db.session.add(serie)
-            
-            db.session.commit()
-            return True
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Erro ao salvar sessão: {e}")
-            return False
+    @staticmethod
+    def inserir_em_lote(treino_id, versao_id, periodo, semana, dados_exercicios, user_id):
+        """
+        Insere os registros de uma sessão e todas as suas séries em lote
+        
+        Uma instrução INSERT de várias linhas para os registros (ids via
+        RETURNING, associados pelo exercício, que é único na sessão) e um
+        executemany para as séries. Sem RETURNING em lote (SQLite < 3.35),
+        insere os registros um a um e usa o id gerado por cada INSERT: não
+        reserva ids a partir do maior existente, pois nada garante que a
+        transação de escrita já esteja aberta (na primeira gravação de uma
+        sessão não há remoção antes). Com SERIES_COMPACTAS, grava uma única
+        linha de série por registro (ver linhas_de_series). Não faz commit.
+        
+        Returns:
+            int: Número de registros inseridos
+        """
+        agora = datetime.now()
+        data_sessao = calcular_data_sessao(periodo, semana)
+        itens = [(int(ex_id), dados) for ex_id, dados in dados_exercicios.items()
+                 if dados['carga'] and dados['repeticoes']]
+        if not itens:
+            return 0
+        
+        registros = [{
+            'treino_id': treino_id,
+            'versao_id': versao_id,
+            'periodo': periodo,
+            'semana': semana,
+            'exercicio_id': ex_id,
+            'data_registro': dados.get('data_registro', agora),
+            'data_sessao': data_sessao,
+            'user_id': user_id,
+            'created_at': agora
+        } for ex_id, dados in itens]
+        
+        if db.engine.dialect.insert_executemany_returning:
+            ids = dict(db.session.execute(
+                insert(RegistroTreino).returning(RegistroTreino.exercicio_id, RegistroTreino.id),
+                registros
+            ).all())
+        else:
+            # Tabela, não a entidade: o INSERT do ORM com parâmetros segue o caminho em lote
+            ids = {registro['exercicio_id']: db.session.execute(insert(RegistroTreino.__table__), registro)
+                   .inserted_primary_key[0] for registro in registros}
+        
+        series = [dict(linha, registro_id=ids[ex_id])
+                  for ex_id, dados in itens
+                  for linha in linhas_de_series(dados['carga'], dados['repeticoes'], dados['num_series'])]
+        if series:
+            db.session.execute(insert(HistoricoTreino), series)
+        
+        return len(registros)
     
     def get_periodos_distintos(self, user_id=None):
         """Retorna lista de períodos distintos"""
         try:
             query = db.session.query(
                 self.model_class.periodo
-            ).distinct()
+            )
             
             query = self.filter_by_user(query, user_id)
             
-            resultados = query.all()
-            return sorted([r[0] for r in resultados], reverse=True)
+            # Mais recente primeiro, pela data normalizada (a ordem do texto é alfabética)
+            sessao = func.max(RegistroTreino.data_sessao)
+            resultados = query.group_by(self.model_class.periodo)\
+                .order_by(sessao.is_(None), sessao.desc()).all()
+            return [r[0] for r in resultados]
         except Exception as e:
             logger.error(f"Erro ao buscar períodos distintos: {e}")
             return []
@@ -126,19 +154,23 @@ class RegistroRepository(BaseRepository):
             query = db.session.query(
                 RegistroTreino.periodo,
                 RegistroTreino.semana,
-                func.sum(HistoricoTreino.carga * HistoricoTreino.repeticoes).label('volume_total'),
-                func.avg(HistoricoTreino.carga).label('carga_media')
-            ).join(HistoricoTreino)
+                func.sum(HistoricoTreino.carga * HistoricoTreino.repeticoes * HistoricoTreino.quantidade).label('volume_total'),
+                (func.sum(HistoricoTreino.carga * HistoricoTreino.quantidade)
+                 / func.sum(HistoricoTreino.quantidade)).label('carga_media')
+            )
             
-            query = self.filter_by_user(query, user_id)
+            # Antes do join: filter_by se aplica à última entidade juntada
+            query = self.filter_by_user(query, user_id).join(HistoricoTreino)
             
             if treino_id:
                 query = query.filter(RegistroTreino.treino_id == treino_id)
             
+            # Uma linha por semana, mesmo com data_sessao ainda nula em parte dela
+            sessao = func.min(RegistroTreino.data_sessao)
             return query.group_by(
                 RegistroTreino.periodo, RegistroTreino.semana
             ).order_by(
-                RegistroTreino.periodo, RegistroTreino.semana
+                sessao.is_(None), sessao, RegistroTreino.periodo, RegistroTreino.semana
             ).all()
         except Exception as e:
             logger.error(f"Erro ao buscar agregados por semana: {e}")
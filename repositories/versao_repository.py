@@ -5,7 +5,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import joinedload
 from .base_repository import BaseRepository
 import logging
-from datetime import datetime
+from datetime import datetime, date
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +19,8 @@ class VersaoRepository(BaseRepository):
         """Retorna versão ativa para um período"""
         try:
             if periodo:
-                from utils.date_utils import converter_periodo_para_data
-                data_periodo = converter_periodo_para_data(periodo)
+                from utils.periodo import periodo_para_data
+                data_periodo = periodo_para_data(periodo) or date.today()
                 
                 query = self.model_class.query.filter(
                     self.model_class.data_inicio <= data_periodo,
@@ -8,6 +8,7 @@ from .register_routes import register_bp
 from .stats_routes import stats_bp
 from .version_routes import version_bp
 from .api_routes import api_bp
+from .metricas_routes import metricas_bp
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,8 @@ def register_all_routes(app):
         (register_bp, '/registrar'),
         (stats_bp, '/estatisticas'),
         (version_bp, '/version'),
-        (api_bp, '/api')
+        (api_bp, '/api'),
+        (metricas_bp, '')
     ]
     
     for blueprint, url_prefix in blueprints:
@@ -1,14 +1,17 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file, abort, Response
 from flask_login import login_required, current_user
 from services.treino_service import TreinoService
 from services.exercicio_service import ExercicioService
 from services.musculo_service import MusculoService
 from services.versao_service import VersaoService
 from utils.exercise_utils import buscar_musculo_no_catalogo
+from utils.decorators import admin_required
+from middleware import perfilador
 from models import db, Exercicio, RegistroTreino, HistoricoTreino
 from sqlalchemy.orm import joinedload
 from sqlalchemy import func
 import logging
+import os
 
 admin_bp = Blueprint('admin', __name__)
 logger = logging.getLogger(__name__)
@@ -232,4 +235,34 @@ def api_verificar_treino():
     """API para verificar se código de treino existe"""
     codigo = request.args.get("id", "").upper()
     treino = TreinoService.get_by_codigo(codigo)
-    return jsonify({"existe": treino is not None})
\ No newline at end of file
+    return jsonify({"existe": treino is not None})
+
+@admin_bp.route("/perfis")
+@admin_required
+def perfis():
+    """Perfis de requisições gravados (?__profile=1)"""
+    return render_template("admin/perfis.html",
+                         perfis=perfilador.listar_perfis(),
+                         habilitado=perfilador.perfilador_habilitado(),
+                         parametro=perfilador.PARAMETRO)
+
+@admin_bp.route("/perfis/<nome>")
+@admin_required
+def baixar_perfil(nome):
+    """Download do perfil no formato pstats"""
+    caminho = perfilador.caminho_perfil(nome)
+    if caminho is None:
+        abort(404)
+    return send_file(os.path.abspath(caminho), as_attachment=True, download_name=nome)
+
+@admin_bp.route("/perfis/<nome>/resumo")
+@admin_required
+def resumo_perfil(nome):
+    """Funções mais caras do perfil, em texto"""
+    ordenar = request.args.get("ordenar", "cumulative")
+    if ordenar not in ("cumulative", "tottime", "calls"):
+        ordenar = "cumulative"
+    resumo = perfilador.resumo_perfil(nome, ordenar)
+    if resumo is None:
+        abort(404)
+    return Response(resumo, content_type="text/plain; charset=utf-8")
@@ -1,14 +1,15 @@
 from flask import Blueprint, jsonify, request
-from flask_login import login_required
+from flask_login import login_required, current_user
 from services.treino_service import TreinoService
 from services.exercicio_service import ExercicioService
 from services.versao_service import VersaoService
-from services.registro_service import RegistroService
 from services.estatistica_service import EstatisticaService
-from utils.exercise_utils import buscar_musculo_no_catalogo, remover_acentos
-import json
-import hashlib
-from pathlib import Path
+from services.catalogo_service import CatalogoService
+from services.resumo_service import ResumoService
+from services import CacheService
+from utils.exercise_utils import buscar_musculo_no_catalogo
+from utils.decorators import admin_required
+from utils.paginacao import codificar_cursor, decodificar_cursor, EXERCICIOS_POR_PAGINA
 import logging
 
 api_bp = Blueprint('api', __name__)
@@ -26,27 +27,8 @@ def api_progresso():
     volumes = []
     cargas_medias = []
     
-    # Ordenar por período e semana
-    ordem_meses = {
-        "Janeiro": 1, "Fevereiro": 2, "Março": 3, "Abril": 4,
-        "Maio": 5, "Junho": 6, "Julho": 7, "Agosto": 8,
-        "Setembro": 9, "Outubro": 10, "Novembro": 11, "Dezembro": 12
-    }
-    
-    def extrair_ordenacao(item):
-        periodo = item.periodo
-        mes_nome = periodo.split('/')[0] if '/' in periodo else periodo.split(' ')[0]
-        ano = 2024
-        if '/' in periodo and len(periodo.split('/')) > 1:
-            try:
-                ano = int(periodo.split('/')[1])
-            except:
-                pass
-        return (ano, ordem_meses.get(mes_nome, 0), item.semana)
-    
-    dados_ordenados = sorted(dados, key=extrair_ordenacao)
-    
-    for item in dados_ordenados:
+    # Já vem em ordem cronológica (data_sessao)
+    for item in dados:
         semanas.append(f"{item.periodo} - S{item.semana}")
         volumes.append(float(item.volume_total) if item.volume_total else 0)
         cargas_medias.append(float(item.carga_media) if item.carga_media else 0)
@@ -57,6 +39,55 @@ def api_progresso():
         "cargas_medias": cargas_medias
     })
 
+@api_bp.route("/cache/stats")
+@admin_required
+def api_cache_stats():
+    """Ocupação e acertos do cache (somente administradores)"""
+    return jsonify({
+        "cache": CacheService.stats(),
+        "pagina_estatisticas": EstatisticaService.get_contadores_pagina()
+    })
+
+@api_bp.route("/tabela/exercicios")
+@login_required
+def api_tabela_exercicios():
+    """
+    Próxima página de exercícios da tabela de progresso
+    
+    Aceita os mesmos filtros da tabela (treino, musculo, ordenar, semanas e
+    semana_<periodo>_<semana>) mais cursor e limite.
+    """
+    try:
+        apos = decodificar_cursor(request.args["cursor"]) if request.args.get("cursor") else None
+        if apos is not None and len(apos) != 3:
+            raise ValueError(apos)
+    except ValueError:
+        return jsonify({"error": "Cursor inválido"}), 400
+    limite = max(1, min(request.args.get("limite", EXERCICIOS_POR_PAGINA, type=int), 200))
+    
+    dados = EstatisticaService.montar_tabela(
+        request.args.get("treino", "", type=int),
+        request.args.get("musculo", ""),
+        request.args.get("ordenar", "exercicio"),
+        request.args.get("semanas", "todas"),
+        request.args,
+        apos=apos,
+        limite=limite
+    )
+    proxima_chave = dados['proxima_chave']
+    
+    return jsonify({
+        "semanas": [s["key"] for s in dados['semanas']],
+        "exercicios": [{
+            "id": ex.id,
+            "nome": ex.nome,
+            "treino": ex.treino_ref.codigo if ex.treino_ref else None,
+            "musculo": ex.musculo_ref.nome_exibicao if ex.musculo_ref else None
+        } for ex in dados['exercicios']],
+        "registros_por_exercicio": dados['registros_por_exercicio'],
+        "proximo_cursor": codificar_cursor(proxima_chave) if proxima_chave else None
+    })
+
 @api_bp.route("/buscar-musculo")
 @login_required
 def api_buscar_musculo():
@@ -86,67 +117,13 @@ def api_buscar_exercicios():
     """API para buscar exercícios no catálogo"""
     termo = request.args.get("termo", "").strip()
     
-    # Caminho do catálogo
-    catalogo_path = Path("storage/exercises-ptbr-full-translation.json")
-    
-    termo_normalizado = remover_acentos(termo.lower())
-    
-    if not catalogo_path.exists():
-        logger.error(f"Catálogo não encontrado: {catalogo_path}")
-        return jsonify([])
-    
     try:
-        with open(catalogo_path, 'r', encoding='utf-8') as f:
-            catalogo = json.load(f)
-        
-        resultados = []
-        
-        mapa_musculos = {
-            'abdominais': 'Abdômen',
-            'abductors': 'Abdutores',
-            'adductors': 'Adutores',
-            'biceps': 'Bíceps',
-            'calves': 'Panturrilhas',
-            'chest': 'Peitoral',
-            'forearms': 'Antebraços',
-            'glutes': 'Glúteos',
-            'hamstrings': 'Posterior de Coxa',
-            'lats': 'Dorsal',
-            'lower back': 'Lombar',
-            'middle back': 'Costas',
-            'neck': 'Pescoço',
-            'quadriceps': 'Quadríceps',
-            'shoulders': 'Ombros',
-            'traps': 'Trapézio',
-            'triceps': 'Tríceps'
-        }
-        
-        for ex in catalogo:
-            nome = ex.get('name', '')
-            primary_muscles = ex.get('primaryMuscles', [])
-            musculo_original = primary_muscles[0] if primary_muscles else "Não especificado"
-            
-            nome_normalizado = remover_acentos(nome.lower())
-            musculo_exibicao = mapa_musculos.get(musculo_original.lower(), musculo_original.title())
-            
-            if termo:
-                if termo_normalizado in nome_normalizado:
-                    id_hash = int(hashlib.md5(nome.encode()).hexdigest()[:8], 16)
-                    resultados.append({
-                        "id": id_hash,
-                        "nome": nome,
-                        "musculo": musculo_exibicao
-                    })
-            else:
-                if len(resultados) < 200:
-                    id_hash = int(hashlib.md5(nome.encode()).hexdigest()[:8], 16)
-                    resultados.append({
-                        "id": id_hash,
-                        "nome": nome,
-                        "musculo": musculo_exibicao
-                    })
-        
-        return jsonify(resultados)
+        # Sem termo, os primeiros 200; só id, nome e musculo (sem instruções)
+        return jsonify(CatalogoService.buscar_exercicios(
+            termo=termo if termo else None,
+            limite=None if termo else 200,
+            completos=False
+        ))
         
     except Exception as e:
         logger.error(f"Erro ao buscar catálogo: {e}")
@@ -188,29 +165,8 @@ def api_evolucao_exercicio(exercicio_id):
     if not exercicio:
         return jsonify({"error": "Exercício não encontrado"}), 404
     
-    registros = RegistroService.get_all({'exercicio_id': exercicio_id}, load_series=True)
-    
-    dados = []
-    for r in registros:
-        series_list = []
-        for s in r.series:
-            series_list.append({
-                "carga": float(s.carga),
-                "repeticoes": s.repeticoes
-            })
-        
-        from utils.exercise_utils import calcular_media_series, calcular_volume_total
-        media_carga, media_reps = calcular_media_series(series_list)
-        volume_total = calcular_volume_total(series_list)
-        
-        dados.append({
-            "sessao": f"{r.periodo} - S{r.semana}",
-            "series": series_list,
-            "media_carga": media_carga,
-            "media_reps": media_reps,
-            "volume_total": volume_total,
-            "num_series": len(series_list)
-        })
+    # Agregados semanais do resumo (sem carregar as séries individuais)
+    dados = ResumoService.get_evolucao(exercicio_id)
     
     return jsonify({
         "exercicio": exercicio.nome,
@@ -246,8 +202,6 @@ def api_criar_exercicio():
 @login_required
 def api_catalogo_todos():
     """Retorna todos os exercícios do catálogo"""
-    from services.catalogo_service import CatalogoService
-    
     try:
         # Parâmetro opcional de limite
         limite = request.args.get("limite", 500, type=int)
@@ -260,13 +214,20 @@ def api_catalogo_todos():
 @api_bp.route("/catalogo/buscar")
 @login_required
 def api_catalogo_buscar():
-    """Busca exercícios no catálogo JSON"""
+    """Busca exercícios no catálogo JSON (fuzzy=1 para busca aproximada)"""
     termo = request.args.get("termo", "").strip()
     musculo = request.args.get("musculo", "").strip()
-    
-    from services.catalogo_service import CatalogoService
+    fuzzy = request.args.get("fuzzy", "0") == "1"
     
     try:
+        if fuzzy and termo:
+            limite = request.args.get("limite", 10, type=int)
+            return jsonify(CatalogoService.buscar_fuzzy(
+                termo,
+                musculo=musculo if musculo else None,
+                limite=max(1, min(limite, 100))
+            ))
+        
         resultados = CatalogoService.buscar_exercicios(
             termo=termo if termo else None,
             musculo=musculo if musculo else None
@@ -276,12 +237,27 @@ def api_catalogo_buscar():
         logger.error(f"Erro ao buscar no catálogo: {e}")
         return jsonify([])
 
+@api_bp.route("/catalogo/typeahead")
+@login_required
+def api_catalogo_typeahead():
+    """Sugestões por prefixo para os campos de busca de exercícios"""
+    prefixo = request.args.get("q", "").strip()
+    limite = request.args.get("limite", 10, type=int)
+    
+    try:
+        return jsonify(CatalogoService.typeahead(
+            prefixo,
+            sessao_id=current_user.id,
+            limite=max(1, min(limite, 200))
+        ))
+    except Exception as e:
+        logger.error(f"Erro no typeahead do catálogo: {e}")
+        return jsonify([])
+
 @api_bp.route("/catalogo/musculos")
 @login_required
 def api_catalogo_musculos():
     """Retorna lista de músculos disponíveis no catálogo"""
-    from services.catalogo_service import CatalogoService
-    
     try:
         musculos = CatalogoService.get_musculos_disponiveis()
         return jsonify(musculos)
@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template
 from services.treino_service import TreinoService
-from services.registro_service import RegistroService
+from services.painel_service import PainelService
 
 main_bp = Blueprint('main', __name__)
 
@@ -8,18 +8,14 @@ main_bp = Blueprint('main', __name__)
 def index():
     """Página inicial"""
     treinos = TreinoService.get_all()
-    registros = RegistroService.get_all()
-    
-    total_registros = len(registros)
-    semanas_treinadas = len(set((r.periodo, r.semana) for r in registros))
+    resumo = PainelService.get_resumo()
     
     ultima_semana = "N/A"
-    if registros:
-        ultimo = registros[-1]
-        ultima_semana = f"{ultimo.periodo} - Semana {ultimo.semana}"
+    if resumo.ultimo_periodo is not None:
+        ultima_semana = f"{resumo.ultimo_periodo} - Semana {resumo.ultima_semana}"
     
     return render_template("index.html",
                          treinos=treinos,
-                         total_registros=total_registros,
-                         semanas_treinadas=semanas_treinadas,
+                         total_registros=resumo.total_registros,
+                         semanas_treinadas=resumo.semanas_treinadas,
                          ultima_semana=ultima_semana)
\ No newline at end of file
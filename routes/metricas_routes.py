@@ -0,0 +1,28 @@
+from flask import Blueprint, Response, current_app, request
+import hmac
+import logging
+from middleware import metricas
+from utils.decorators import admin_required
+
+metricas_bp = Blueprint('metricas', __name__)
+logger = logging.getLogger(__name__)
+
+TIPO_CONTEUDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _exportar():
+    return Response(metricas.exportar(), content_type=TIPO_CONTEUDO)
+
+_exportar_para_admin = admin_required(_exportar)
+
+@metricas_bp.route("/metrics")
+def metrics():
+    """
+    Métricas no formato do Prometheus (somente administradores)
+    
+    Coletores podem se autenticar com "Authorization: Bearer <METRICAS_TOKEN>"
+    em vez da sessão de um administrador.
+    """
+    token = current_app.config.get('METRICAS_TOKEN')
+    if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return _exportar()
+    return _exportar_para_admin()
@@ -57,10 +57,10 @@ def registrar_treino():
         
         registros_map = {r.exercicio_id: r for r in registros}
         
-        for ex in exercicios_treino:
-            ultimas = ExercicioService.get_ultimas_series(ex.id, versao_id=versao_global_id, limite=1)
-            if ultimas:
-                historico_series[ex.id] = ultimas
+        # Séries da última sessão de cada exercício (uma consulta para todos)
+        historico_series = ExercicioService.get_ultimas_series_por_exercicio(
+            [ex.id for ex in exercicios_treino], versao_id=versao_global_id
+        )
 
     if request.method == "POST" and "salvar" in request.form:
         dados_exercicios = {}
@@ -92,9 +92,16 @@ def registrar_treino():
                     continue
 
         if dados_exercicios:
-            if RegistroService.salvar_registros(treino, versao_global_id, periodo, int(semana), dados_exercicios):
-                logger.info(f"Treino {treino} - Semana {semana} salvo")
-                flash(f"Treino {treino} - Semana {semana} salvo com sucesso!", "success")
+            # Regravar a sessão altera só os exercícios/séries que mudaram
+            alteracoes = RegistroService.sincronizar_registros(
+                treino, versao_global_id, periodo, int(semana), dados_exercicios
+            )
+            if alteracoes is not None:
+                logger.info(f"Treino {treino} - Semana {semana} salvo ({alteracoes.total} linhas alteradas)")
+                if alteracoes.total:
+                    flash(f"Treino {treino} - Semana {semana} salvo com sucesso!", "success")
+                else:
+                    flash(f"Treino {treino} - Semana {semana} sem alterações.", "info")
                 return redirect(url_for("main.index"))
             else:
                 flash("Erro ao salvar registros!", "danger")
@@ -1,10 +1,9 @@
 from flask import Blueprint, render_template, request
 from flask_login import login_required
 from services.treino_service import TreinoService
-from services.exercicio_service import ExercicioService
 from services.musculo_service import MusculoService
-from services.registro_service import RegistroService
 from services.estatistica_service import EstatisticaService
+from utils.paginacao import codificar_cursor, EXERCICIOS_POR_PAGINA
 import logging
 
 stats_bp = Blueprint('stats', __name__)
@@ -14,15 +13,12 @@ logger = logging.getLogger(__name__)
 @login_required
 def estatisticas():
     """Página de estatísticas"""
-    registros = RegistroService.get_all(load_series=True)
-    exercicios = ExercicioService.get_all()
     treinos = TreinoService.get_all()
     
     musculos_obj = MusculoService.get_all()
     musculos = [m.nome_exibicao for m in musculos_obj]
     
-    musculo_stats = EstatisticaService.calcular_por_musculo()
-    treino_stats = EstatisticaService.calcular_por_treino()
+    musculo_stats, treino_stats = EstatisticaService.get_dados_pagina()
     
     return render_template("stats/estatisticas.html",
                          musculo_stats=musculo_stats,
@@ -33,38 +29,22 @@ def estatisticas():
 @stats_bp.route("/visualizar/tabela")
 @login_required
 def visualizar_tabela():
-    """Tabela de progresso"""
-    treino_selecionado = request.args.get("treino", "")
+    """Tabela de progresso (primeira página de exercícios; as demais via /api/tabela)"""
+    treino_selecionado = request.args.get("treino", "", type=int)
     musculo_selecionado = request.args.get("musculo", "")
     ordenar = request.args.get("ordenar", "exercicio")
     semanas_filtro = request.args.get("semanas", "todas")
     
-    registros = RegistroService.get_all(load_series=True)
-    exercicios = ExercicioService.get_all()
     treinos = TreinoService.get_all()
     musculos_obj = MusculoService.get_all()
     musculos = [m.nome_exibicao for m in musculos_obj]
     
-    # Filtrar exercícios
-    exercicios_filtrados = []
-    for ex in exercicios:
-        if treino_selecionado and ex.treino_id != treino_selecionado:
-            continue
-        if musculo_selecionado:
-            if not ex.musculo_ref or ex.musculo_ref.nome_exibicao != musculo_selecionado:
-                continue
-        exercicios_filtrados.append(ex)
-    
-    # Ordenar
-    if ordenar == "musculo":
-        exercicios_filtrados.sort(key=lambda x: (x.musculo_ref.nome_exibicao if x.musculo_ref else "", x.nome))
-    else:
-        exercicios_filtrados.sort(key=lambda x: (x.treino_id or "", x.nome))
-    
-    # Organizar dados para a tabela
-    dados_tabela = EstatisticaService.preparar_dados_tabela(
-        exercicios_filtrados, registros, semanas_filtro, request.args
+    # Organizar dados para a tabela (filtros e janela de semanas aplicados no banco)
+    dados_tabela = EstatisticaService.montar_tabela(
+        treino_selecionado, musculo_selecionado, ordenar, semanas_filtro, request.args,
+        limite=EXERCICIOS_POR_PAGINA
     )
+    proxima_chave = dados_tabela['proxima_chave']
     
     return render_template("stats/visualizar_tabela.html",
                          treinos=treinos,
@@ -72,9 +52,10 @@ def visualizar_tabela():
                          musculos=musculos,
                          musculo_selecionado=musculo_selecionado,
                          ordenar=ordenar,
-                         exercicios=exercicios_filtrados,
+                         exercicios=dados_tabela['exercicios'],
                          semanas=dados_tabela['semanas'],
                          registros_por_exercicio=dados_tabela['registros_por_exercicio'],
                          semanas_selecionadas=semanas_filtro,
                          semanas_selecionadas_lista=dados_tabela['semanas_selecionadas_lista'],
-                         periodos_disponiveis=dados_tabela['periodos_disponiveis'])
\ No newline at end of file
+                         periodos_disponiveis=dados_tabela['periodos_disponiveis'],
+                         proximo_cursor=codificar_cursor(proxima_chave) if proxima_chave else None)
@@ -24,6 +24,9 @@ def gerenciar_versoes_global():
     treinos = TreinoService.get_all()
     musculos = MusculoService.get_all_nomes()
     
+    # Treinos de todas as versões de uma vez (não uma consulta por versão e treino)
+    treinos_por_versao = VersaoService.get_treinos_por_versao([v.id for v in versoes])
+    
     versoes_formatadas = []
     for v in versoes:
         versoes_formatadas.append({
@@ -34,7 +37,7 @@ def gerenciar_versoes_global():
             "data_fim": v.data_fim.isoformat() if v.data_fim else None,
             "data_inicio_formatada": formatar_data(v.data_inicio.isoformat() if v.data_inicio else None),
             "data_fim_formatada": formatar_data(v.data_fim.isoformat() if v.data_fim else None),
-            "treinos": VersaoService.get_treinos(v.id)
+            "treinos": treinos_por_versao.get(v.id, {})
         })
     
     return render_template("version/gerenciar_versoes_global.html",
@@ -349,40 +352,18 @@ def editar_treino_na_versao(versao_id, treino_codigo):
     
     # GET - mostrar formulário
     # Buscar TODOS os exercícios do catálogo
-    from services.catalogo_service import CatalogoService
-    from models import Exercicio, Musculo
+    from services.catalogo_service import CatalogoService, ExercicioCatalogo
     
     # Pegar exercícios do catálogo
-    catalogo_exercicios = CatalogoService.get_todos_exercicios(limite=500)
-    
-    # Converter para objetos similares aos do banco para o template
-    exercicios_catalogo = []
-    for ex in catalogo_exercicios:
-        # Verificar se já existe no banco
-        exercicio_existente = Exercicio.query.filter_by(
-            user_id=current_user.id,
-            nome=ex['nome']
-        ).first()
-        
-        if exercicio_existente:
-            # Se já existe, usar o do banco
-            exercicios_catalogo.append(exercicio_existente)
-        else:
-            # Criar um objeto temporário com os atributos necessários
-            class TempExercicio:
-                def __init__(self, nome, musculo_nome, ex_id):
-                    self.id = ex_id
-                    self.nome = nome
-                    self.musculo_ref = type('obj', (object,), {'nome_exibicao': musculo_nome})
-                    self.treino_id = None
-                    self.user_id = current_user.id
-            
-            # Usar o ID hash como ID temporário
-            exercicios_catalogo.append(TempExercicio(
-                ex['nome'], 
-                ex['musculo'],
-                ex['id']  # ID hash do catálogo
-            ))
+    catalogo_exercicios = CatalogoService.get_todos_exercicios(limite=500, completos=False)
+    
+    # Os que o usuário já cadastrou vêm do banco (uma consulta para todos);
+    # os demais viram objetos leves com os atributos usados pelo template
+    existentes = ExercicioService.get_por_nomes(ex['nome'] for ex in catalogo_exercicios)
+    exercicios_catalogo = [
+        existentes.get(ex['nome']) or ExercicioCatalogo(ex['id'], ex['nome'], ex['musculo'], current_user.id)
+        for ex in catalogo_exercicios
+    ]
     
     # Exercícios atuais na versão
     exercicios_atuais = [ve.exercicio_id for ve in treino_versao.exercicios]
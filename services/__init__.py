@@ -2,66 +2,162 @@
 
 from flask_login import current_user
 from models import db
+import hashlib
 import logging
-import time
+from datetime import date, datetime
 from functools import wraps
+from .cache_backend import CacheBackend, MemoryCacheBackend, SQLiteCacheBackend, criar_backend
 
 logger = logging.getLogger(__name__)
 
 class CacheService:
-    """Serviço simples de cache em memória"""
+    """
+    Fachada de cache da aplicação
     
-    _cache = {}
-    _ttl = {}
+    Delega para um backend limitado (LRU + TTL) com invalidação por tag e
+    contadores de acerto/erro/remoção. O backend (memória do processo ou
+    SQLite compartilhado entre workers) e os limites vêm do Config
+    (CACHE_BACKEND, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES) via init_app.
+    """
+    
+    _backend = None
+    
+    @classmethod
+    def init_app(cls, app):
+        """Cria o backend configurado na aplicação"""
+        cls._backend = criar_backend(app.config)
+        app.logger.info(f"Cache configurado: {cls._backend.stats()['backend']}")
+        
+        from .cache_invalidacao import registrar_invalidacao_automatica
+        registrar_invalidacao_automatica(db.session)
     
     @classmethod
-    def get(cls, key):
+    def get_backend(cls):
+        """Retorna o backend atual (criado com valores padrão se necessário)"""
+        if cls._backend is None:
+            cls._backend = MemoryCacheBackend()
+        return cls._backend
+    
+    @classmethod
+    def get(cls, key, default=None):
         """Retorna valor do cache se ainda válido"""
-        if key in cls._cache:
-            if time.time() < cls._ttl.get(key, 0):
-                return cls._cache[key]
-            else:
-                cls.invalidate(key)
-        return None
+        return cls.get_backend().get(key, default)
     
     @classmethod
-    def set(cls, key, value, ttl_seconds=300):
-        """Armazena valor no cache com TTL"""
-        cls._cache[key] = value
-        cls._ttl[key] = time.time() + ttl_seconds
+    def set(cls, key, value, ttl_seconds=300, tags=()):
+        """Armazena valor no cache com TTL e tags opcionais"""
+        return cls.get_backend().set(key, value, ttl_seconds, tags)
     
     @classmethod
     def invalidate(cls, key):
         """Remove item do cache"""
-        cls._cache.pop(key, None)
-        cls._ttl.pop(key, None)
+        cls.get_backend().invalidate(key)
+    
+    @classmethod
+    def invalidate_tag(cls, tag):
+        """Remove todos os itens marcados com a tag (ex.: "user:42")"""
+        return cls.get_backend().invalidate_tag(tag)
     
     @classmethod
     def invalidate_pattern(cls, pattern):
         """Remove todos os itens que correspondem ao padrão"""
-        keys_to_remove = [k for k in cls._cache.keys() if pattern in k]
-        for key in keys_to_remove:
-            cls.invalidate(key)
+        return cls.get_backend().invalidate_pattern(pattern)
+    
+    @classmethod
+    def clear(cls):
+        """Esvazia o cache"""
+        cls.get_backend().clear()
+    
+    @classmethod
+    def stats(cls):
+        """Contadores de acerto, erro, remoção e ocupação"""
+        return cls.get_backend().stats()
+
+def tag_usuario(user_id):
+    """Tag de cache que agrupa todos os dados derivados de um usuário"""
+    return f"user:{user_id}"
+
+_AUSENTE = object()
+
+def _normalizar_argumento(valor):
+    """Converte um argumento numa forma hashable e com repr estável"""
+    if valor is None or isinstance(valor, (bool, int, float, str, bytes)):
+        return valor
+    if isinstance(valor, (list, tuple)):
+        return tuple(_normalizar_argumento(v) for v in valor)
+    if isinstance(valor, (set, frozenset)):
+        return ('set',) + tuple(sorted((_normalizar_argumento(v) for v in valor), key=repr))
+    if isinstance(valor, dict):
+        return ('dict',) + tuple(sorted(
+            ((_normalizar_argumento(k), _normalizar_argumento(v)) for k, v in valor.items()),
+            key=repr
+        ))
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    # Modelos do banco são identificados pela tabela e chave primária
+    if hasattr(valor, '__tablename__') and getattr(valor, 'id', None) is not None:
+        return (valor.__tablename__, valor.id)
+    raise TypeError(f"Argumento sem chave de cache estável: {type(valor).__name__}")
+
+def make_cache_key(prefix, args=(), kwargs=None):
+    """
+    Gera uma chave de cache estável para uma chamada
+    
+    O formato é "<prefixo>:<sha1 dos argumentos normalizados>", o mesmo em
+    qualquer processo (ao contrário de str(args), que pode conter endereços).
+    """
+    normalizados = (
+        _normalizar_argumento(tuple(args)),
+        _normalizar_argumento(kwargs or {})
+    )
+    digest = hashlib.sha1(repr(normalizados).encode('utf-8')).hexdigest()
+    return f"{prefix}:{digest}"
 
-def cached(ttl_seconds=300, key_prefix=''):
-    """Decorator para cache de funções"""
+def cached(ttl_seconds=300, key_prefix='', tags=None):
+    """
+    Decorator para cache de funções
+    
+    Args:
+        ttl_seconds: Tempo de vida das entradas
+        key_prefix: Prefixo da chave (padrão: módulo.nome da função)
+        tags: Lista de tags ou função (*args, **kwargs) -> tags
+    """
     def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            # Criar chave única baseada na função e argumentos
-            key = f"{key_prefix}_{f.__name__}_{str(args)}_{str(kwargs)}"
+        prefixo = key_prefix or f"{f.__module__}.{f.__qualname__}"
+        
+        def cache_key(*args, **kwargs):
+            return make_cache_key(prefixo, args, kwargs)
+        
+        def com_origem(*args, **kwargs):
+            """Executa a função e retorna (resultado, veio_do_cache)"""
+            try:
+                key = cache_key(*args, **kwargs)
+            except TypeError as e:
+                logger.debug(f"Cache ignorado para {prefixo}: {e}")
+                return f(*args, **kwargs), False
             
             # Tentar obter do cache
-            cached_result = CacheService.get(key)
-            if cached_result is not None:
+            cached_result = CacheService.get(key, _AUSENTE)
+            if cached_result is not _AUSENTE:
                 logger.debug(f"Cache hit: {key}")
-                return cached_result
+                return cached_result, True
             
             # Executar função e armazenar resultado
             logger.debug(f"Cache miss: {key}")
             result = f(*args, **kwargs)
-            CacheService.set(key, result, ttl_seconds)
-            return result
+            tags_entrada = tags(*args, **kwargs) if callable(tags) else (tags or ())
+            CacheService.set(key, result, ttl_seconds, tags_entrada)
+            return result, False
+        
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            return com_origem(*args, **kwargs)[0]
+        
+        decorated_function.cache_key = cache_key
+        decorated_function.com_origem = com_origem
+        decorated_function.invalidate = lambda *args, **kwargs: CacheService.invalidate(
+            cache_key(*args, **kwargs)
+        )
         return decorated_function
     return decorator
 
@@ -96,6 +192,8 @@ from .musculo_service import MusculoService
 from .versao_service import VersaoService
 from .registro_service import RegistroService
 from .estatistica_service import EstatisticaService
+from .resumo_service import ResumoService
+from .painel_service import PainelService
 
 __all__ = [
     'BaseService',
@@ -105,6 +203,13 @@ __all__ = [
     'VersaoService',
     'RegistroService',
     'EstatisticaService',
+    'ResumoService',
+    'PainelService',
     'CacheService',
-    'cached'
+    'CacheBackend',
+    'MemoryCacheBackend',
+    'SQLiteCacheBackend',
+    'cached',
+    'make_cache_key',
+    'tag_usuario'
 ]
\ No newline at end of file
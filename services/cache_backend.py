@@ -0,0 +1,504 @@
+"""
+Backends de cache da aplicação
+
+- MemoryCacheBackend: LRU em memória do processo, limitado por número de
+  entradas e por bytes, com TTL, expiração proativa e invalidação por tag.
+- SQLiteCacheBackend: mesma interface sobre um arquivo SQLite local,
+  compartilhado por todos os workers do host; uma invalidação feita por um
+  worker vale imediatamente para os demais.
+
+O backend é escolhido pelo Config (CACHE_BACKEND) em criar_backend.
+"""
+
+import abc
+import heapq
+import logging
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_CONTADORES = ('hits', 'misses', 'sets', 'evictions', 'expirations', 'invalidations')
+
+
+def estimar_tamanho(valor):
+    """Tamanho aproximado de um valor em bytes (serializado com pickle)"""
+    try:
+        return len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(valor)
+
+
+class _Entrada:
+    """Valor armazenado com metadados de expiração, tamanho e tags"""
+
+    __slots__ = ('valor', 'expira_em', 'tamanho', 'tags')
+
+    def __init__(self, valor, expira_em, tamanho, tags):
+        self.valor = valor
+        self.expira_em = expira_em
+        self.tamanho = tamanho
+        self.tags = tags
+
+
+class CacheBackend(abc.ABC):
+    """Interface comum dos backends de cache"""
+
+    @abc.abstractmethod
+    def get(self, key, default=None):
+        """Valor da chave, ou default se ausente ou expirada"""
+
+    @abc.abstractmethod
+    def set(self, key, value, ttl_seconds=300, tags=()):
+        """Grava o valor com TTL e tags; retorna se foi armazenado"""
+
+    @abc.abstractmethod
+    def invalidate(self, key):
+        """Remove uma chave"""
+
+    @abc.abstractmethod
+    def invalidate_tag(self, tag):
+        """Remove as chaves com a tag; retorna quantas"""
+
+    @abc.abstractmethod
+    def invalidate_pattern(self, pattern):
+        """Remove as chaves que contêm o padrão; retorna quantas"""
+
+    @abc.abstractmethod
+    def clear(self):
+        """Remove todas as entradas"""
+
+    @abc.abstractmethod
+    def expirar_vencidos(self):
+        """Remove as entradas vencidas; retorna quantas"""
+
+    @abc.abstractmethod
+    def stats(self):
+        """Contadores e ocupação do backend"""
+
+    @staticmethod
+    def _calcular_hit_ratio(contadores):
+        consultas = contadores['hits'] + contadores['misses']
+        return contadores['hits'] / consultas if consultas else 0.0
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Cache LRU/TTL em memória do processo"""
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024, relogio=time.monotonic):
+        """
+        Args:
+            max_entries: Número máximo de entradas
+            max_bytes: Soma máxima dos tamanhos estimados das entradas
+            relogio: Função de tempo (substituível nos testes)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._relogio = relogio
+        self._lock = threading.RLock()
+        self._entradas = OrderedDict()
+        self._por_tag = {}
+        self._expiracoes = []
+        self._bytes = 0
+        self._contadores = dict.fromkeys(_CONTADORES, 0)
+
+    # ------------------------------------------------------------------
+    # Operações
+    # ------------------------------------------------------------------
+
+    def get(self, key, default=None):
+        """Retorna o valor se presente e válido; senão `default`"""
+        with self._lock:
+            self._expirar_vencidos()
+            entrada = self._entradas.get(key)
+            if entrada is None:
+                self._contadores['misses'] += 1
+                return default
+            self._entradas.move_to_end(key)
+            self._contadores['hits'] += 1
+            return entrada.valor
+
+    def set(self, key, value, ttl_seconds=300, tags=()):
+        """
+        Armazena um valor
+
+        Args:
+            key: Chave (string)
+            value: Valor a armazenar
+            ttl_seconds: Tempo de vida em segundos (None = sem expiração)
+            tags: Tags para invalidação em grupo (ex.: "user:42")
+        """
+        tamanho = estimar_tamanho(value)
+        with self._lock:
+            self._remover(key)
+            if tamanho > self.max_bytes:
+                return False
+
+            expira_em = self._relogio() + ttl_seconds if ttl_seconds is not None else None
+            entrada = _Entrada(value, expira_em, tamanho, frozenset(tags or ()))
+            self._entradas[key] = entrada
+            self._bytes += tamanho
+            for tag in entrada.tags:
+                self._por_tag.setdefault(tag, set()).add(key)
+            if expira_em is not None:
+                heapq.heappush(self._expiracoes, (expira_em, key))
+
+            self._contadores['sets'] += 1
+            self._expirar_vencidos()
+            self._aplicar_limites()
+            return True
+
+    def invalidate(self, key):
+        """Remove uma chave"""
+        with self._lock:
+            if self._remover(key):
+                self._contadores['invalidations'] += 1
+
+    def invalidate_tag(self, tag):
+        """Remove todas as chaves marcadas com a tag"""
+        with self._lock:
+            chaves = list(self._por_tag.get(tag, ()))
+            for key in chaves:
+                self._remover(key)
+            self._contadores['invalidations'] += len(chaves)
+            return len(chaves)
+
+    def invalidate_pattern(self, pattern):
+        """Remove as chaves que contêm o padrão (varredura; prefira tags)"""
+        with self._lock:
+            chaves = [k for k in self._entradas if pattern in k]
+            for key in chaves:
+                self._remover(key)
+            self._contadores['invalidations'] += len(chaves)
+            return len(chaves)
+
+    def clear(self):
+        """Remove todas as entradas (os contadores são mantidos)"""
+        with self._lock:
+            self._entradas.clear()
+            self._por_tag.clear()
+            self._expiracoes.clear()
+            self._bytes = 0
+
+    def expirar_vencidos(self):
+        """Remove imediatamente as entradas com TTL vencido"""
+        with self._lock:
+            return self._expirar_vencidos()
+
+    def stats(self):
+        """Contadores e ocupação do cache"""
+        with self._lock:
+            return dict(
+                self._contadores,
+                backend='memory',
+                entries=len(self._entradas),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                hit_ratio=self._calcular_hit_ratio(self._contadores),
+            )
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, key):
+        with self._lock:
+            self._expirar_vencidos()
+            return key in self._entradas
+
+    # ------------------------------------------------------------------
+    # Internos (chamados com o lock adquirido)
+    # ------------------------------------------------------------------
+
+    def _remover(self, key):
+        entrada = self._entradas.pop(key, None)
+        if entrada is None:
+            return False
+        self._bytes -= entrada.tamanho
+        for tag in entrada.tags:
+            chaves = self._por_tag.get(tag)
+            if chaves is not None:
+                chaves.discard(key)
+                if not chaves:
+                    del self._por_tag[tag]
+        return True
+
+    def _expirar_vencidos(self):
+        """Consome o heap de expirações até a primeira entrada ainda válida"""
+        agora = self._relogio()
+        removidas = 0
+        while self._expiracoes and self._expiracoes[0][0] <= agora:
+            expira_em, key = heapq.heappop(self._expiracoes)
+            entrada = self._entradas.get(key)
+            # O heap pode ter itens obsoletos de chaves regravadas ou removidas
+            if entrada is not None and entrada.expira_em == expira_em:
+                self._remover(key)
+                removidas += 1
+        self._contadores['expirations'] += removidas
+
+        # Evita que o heap cresça com itens obsoletos
+        if len(self._expiracoes) > 2 * len(self._entradas) + 64:
+            self._expiracoes = [
+                (e.expira_em, k) for k, e in self._entradas.items() if e.expira_em is not None
+            ]
+            heapq.heapify(self._expiracoes)
+        return removidas
+
+    def _aplicar_limites(self):
+        """Remove as entradas menos usadas até respeitar os limites"""
+        while self._entradas and (
+            len(self._entradas) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._entradas))
+            self._remover(key)
+            self._contadores['evictions'] += 1
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache LRU/TTL compartilhado entre processos num arquivo SQLite
+
+    Os valores são serializados com pickle; o arquivo deve ficar num
+    diretório acessível apenas pela aplicação. Falhas do SQLite nunca
+    propagam: uma leitura com erro conta como miss.
+
+    A ordem LRU é aproximada: um acerto só atualiza `acesso` (uma escrita,
+    que pega o lock do arquivo) quando a última atualização tem mais de
+    1/10 do tempo de vida da entrada, ou INTERVALO_ACESSO segundos nas
+    entradas sem TTL. Os demais acertos são leituras puras.
+    """
+
+    INTERVALO_ACESSO = 60
+
+    _ESQUEMA = (
+        """CREATE TABLE IF NOT EXISTS cache_entradas (
+            chave TEXT PRIMARY KEY,
+            valor BLOB NOT NULL,
+            expira_em REAL,
+            tamanho INTEGER NOT NULL,
+            acesso REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_cache_expira ON cache_entradas (expira_em)",
+        "CREATE INDEX IF NOT EXISTS idx_cache_acesso ON cache_entradas (acesso)",
+        """CREATE TABLE IF NOT EXISTS cache_tags (
+            tag TEXT NOT NULL,
+            chave TEXT NOT NULL,
+            PRIMARY KEY (tag, chave)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_cache_tags_chave ON cache_tags (chave)",
+        """CREATE TRIGGER IF NOT EXISTS cache_entradas_apagar_tags
+            AFTER DELETE ON cache_entradas
+            BEGIN DELETE FROM cache_tags WHERE chave = OLD.chave; END""",
+    )
+
+    def __init__(self, caminho, max_entries=1024, max_bytes=32 * 1024 * 1024, relogio=time.time):
+        """
+        Args:
+            caminho: Arquivo SQLite compartilhado pelos workers
+            max_entries: Número máximo de entradas
+            max_bytes: Soma máxima dos tamanhos serializados
+            relogio: Função de tempo de parede (comum a todos os processos)
+        """
+        self.caminho = str(caminho)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._relogio = relogio
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._contadores = dict.fromkeys(_CONTADORES, 0)
+
+        diretorio = os.path.dirname(os.path.abspath(self.caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        conexao = self._conexao()
+        for comando in self._ESQUEMA:
+            conexao.execute(comando)
+
+    def _conexao(self):
+        """Uma conexão por thread e por processo (seguro após fork)"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None or self._local.pid != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=10, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+    def _contar(self, nome, quantidade=1):
+        with self._lock:
+            self._contadores[nome] += quantidade
+
+    def get(self, key, default=None):
+        agora = self._relogio()
+        try:
+            conexao = self._conexao()
+            linha = conexao.execute(
+                "SELECT valor, expira_em, acesso FROM cache_entradas WHERE chave = ?", (key,)
+            ).fetchone()
+            if linha is None:
+                self._contar('misses')
+                return default
+            if linha[1] is not None and linha[1] <= agora:
+                conexao.execute("DELETE FROM cache_entradas WHERE chave = ?", (key,))
+                self._contar('expirations')
+                self._contar('misses')
+                return default
+            valor, expira_em, acesso = linha
+            intervalo = (expira_em - acesso) / 10 if expira_em is not None else self.INTERVALO_ACESSO
+            if agora - acesso > intervalo:
+                conexao.execute("UPDATE cache_entradas SET acesso = ? WHERE chave = ?", (agora, key))
+            valor = pickle.loads(valor)
+        except Exception as e:
+            logger.warning(f"Erro ao ler cache compartilhado: {e}")
+            self._contar('misses')
+            return default
+        self._contar('hits')
+        return valor
+
+    def set(self, key, value, ttl_seconds=300, tags=()):
+        try:
+            dados = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Valor não serializável para o cache ({key}): {e}")
+            return False
+        if len(dados) > self.max_bytes:
+            self.invalidate(key)
+            return False
+
+        agora = self._relogio()
+        expira_em = agora + ttl_seconds if ttl_seconds is not None else None
+        try:
+            conexao = self._conexao()
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                conexao.execute("DELETE FROM cache_entradas WHERE chave = ?", (key,))
+                conexao.execute(
+                    "INSERT INTO cache_entradas (chave, valor, expira_em, tamanho, acesso) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, dados, expira_em, len(dados), agora)
+                )
+                conexao.executemany(
+                    "INSERT OR IGNORE INTO cache_tags (tag, chave) VALUES (?, ?)",
+                    [(tag, key) for tag in set(tags or ())]
+                )
+                expiradas = self._apagar_vencidos(conexao, agora)
+                removidas = self._aplicar_limites(conexao)
+                conexao.execute("COMMIT")
+            except Exception:
+                conexao.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            logger.warning(f"Erro ao gravar no cache compartilhado: {e}")
+            return False
+
+        self._contar('sets')
+        self._contar('expirations', expiradas)
+        self._contar('evictions', removidas)
+        return True
+
+    def _executar_remocao(self, sql, parametros=()):
+        try:
+            removidas = self._conexao().execute(sql, parametros).rowcount
+        except Exception as e:
+            logger.warning(f"Erro ao invalidar cache compartilhado: {e}")
+            return 0
+        self._contar('invalidations', removidas)
+        return removidas
+
+    def invalidate(self, key):
+        self._executar_remocao("DELETE FROM cache_entradas WHERE chave = ?", (key,))
+
+    def invalidate_tag(self, tag):
+        return self._executar_remocao(
+            "DELETE FROM cache_entradas WHERE chave IN (SELECT chave FROM cache_tags WHERE tag = ?)",
+            (tag,)
+        )
+
+    def invalidate_pattern(self, pattern):
+        return self._executar_remocao(
+            "DELETE FROM cache_entradas WHERE instr(chave, ?) > 0", (pattern,)
+        )
+
+    def clear(self):
+        try:
+            self._conexao().execute("DELETE FROM cache_entradas")
+        except Exception as e:
+            logger.warning(f"Erro ao limpar cache compartilhado: {e}")
+
+    def expirar_vencidos(self):
+        try:
+            removidas = self._apagar_vencidos(self._conexao(), self._relogio())
+        except Exception as e:
+            logger.warning(f"Erro ao expirar cache compartilhado: {e}")
+            return 0
+        self._contar('expirations', removidas)
+        return removidas
+
+    @staticmethod
+    def _apagar_vencidos(conexao, agora):
+        return conexao.execute(
+            "DELETE FROM cache_entradas WHERE expira_em IS NOT NULL AND expira_em <= ?", (agora,)
+        ).rowcount
+
+    def _aplicar_limites(self, conexao):
+        """Remove as entradas com acesso mais antigo até respeitar os limites"""
+        quantidade, total_bytes = conexao.execute(
+            "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM cache_entradas"
+        ).fetchone()
+        removidas = 0
+        if quantidade <= self.max_entries and total_bytes <= self.max_bytes:
+            return removidas
+
+        for chave, tamanho in conexao.execute(
+            "SELECT chave, tamanho FROM cache_entradas ORDER BY acesso"
+        ).fetchall():
+            if quantidade <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            conexao.execute("DELETE FROM cache_entradas WHERE chave = ?", (chave,))
+            quantidade -= 1
+            total_bytes -= tamanho
+            removidas += 1
+        return removidas
+
+    def stats(self):
+        try:
+            quantidade, total_bytes = self._conexao().execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM cache_entradas"
+            ).fetchone()
+        except Exception as e:
+            logger.warning(f"Erro ao consultar cache compartilhado: {e}")
+            quantidade, total_bytes = 0, 0
+        with self._lock:
+            contadores = dict(self._contadores)
+        return dict(
+            contadores,
+            backend='sqlite',
+            entries=quantidade,
+            bytes=total_bytes,
+            max_entries=self.max_entries,
+            max_bytes=self.max_bytes,
+            hit_ratio=self._calcular_hit_ratio(contadores),
+        )
+
+
+def criar_backend(config):
+    """
+    Cria o backend de cache a partir da configuração da aplicação
+
+    CACHE_BACKEND: "memory" (padrão, por processo) ou "sqlite" (compartilhado)
+    """
+    tipo = (config.get('CACHE_BACKEND') or 'memory').lower()
+    limites = dict(
+        max_entries=config.get('CACHE_MAX_ENTRIES', 1024),
+        max_bytes=config.get('CACHE_MAX_BYTES', 32 * 1024 * 1024),
+    )
+    if tipo == 'sqlite':
+        return SQLiteCacheBackend(config.get('CACHE_SQLITE_PATH', 'instance/cache.sqlite3'), **limites)
+    if tipo != 'memory':
+        logger.warning(f"CACHE_BACKEND desconhecido: {tipo}. Usando memória.")
+    return MemoryCacheBackend(**limites)
@@ -0,0 +1,79 @@
+"""
+Invalidação automática do cache por usuário
+
+Escuta a sessão do SQLAlchemy e, a cada commit, invalida a tag de cache
+(tag_usuario) de todos os usuários cujos treinos, exercícios, versões ou
+registros foram alterados na transação. Assim os resultados memoizados
+(estatísticas, progresso) caem exatamente quando os dados do usuário mudam,
+em qualquer ponto do código que faça commit.
+
+Operações em massa (query.delete()/update()) não passam pelo flush; para
+elas é marcado o usuário logado, e quem opera em nome de outro usuário deve
+chamar marcar_usuario_alterado explicitamente.
+"""
+
+import logging
+from itertools import chain
+from sqlalchemy import event
+from models import (db, Treino, Exercicio, VersaoGlobal, TreinoVersao, VersaoExercicio,
+                    RegistroTreino, HistoricoTreino, ResumoSemanal)
+from . import BaseService, CacheService, tag_usuario
+
+logger = logging.getLogger(__name__)
+
+_CHAVE_USUARIOS = 'cache_usuarios_alterados'
+
+MODELOS_DO_USUARIO = (
+    Treino, Exercicio, VersaoGlobal, TreinoVersao, VersaoExercicio,
+    RegistroTreino, HistoricoTreino, ResumoSemanal
+)
+
+def _dono(obj):
+    """Retorna o user_id dono de uma instância (ou None)"""
+    if isinstance(obj, HistoricoTreino):
+        obj = obj.registro_ref
+    elif isinstance(obj, VersaoExercicio):
+        obj = obj.treino_versao_ref
+    if isinstance(obj, TreinoVersao):
+        obj = obj.versao_ref
+    return getattr(obj, 'user_id', None)
+
+def marcar_usuario_alterado(user_id, session=None):
+    """Agenda a invalidação do cache do usuário para o próximo commit"""
+    if user_id:
+        session = session if session is not None else db.session
+        session.info.setdefault(_CHAVE_USUARIOS, set()).add(user_id)
+
+def _antes_do_flush(session, flush_context, instances):
+    with session.no_autoflush:
+        for obj in chain(session.new, session.dirty, session.deleted):
+            if isinstance(obj, MODELOS_DO_USUARIO):
+                marcar_usuario_alterado(_dono(obj), session)
+
+def _ao_executar(estado):
+    if not (estado.is_delete or estado.is_update) or estado.bind_mapper is None:
+        return
+    if issubclass(estado.bind_mapper.class_, MODELOS_DO_USUARIO):
+        marcar_usuario_alterado(BaseService.get_current_user_id(), estado.session)
+
+def _apos_commit(session):
+    for user_id in session.info.pop(_CHAVE_USUARIOS, ()):
+        removidas = CacheService.invalidate_tag(tag_usuario(user_id))
+        logger.debug(f"Cache do usuário {user_id} invalidado ({removidas} entradas)")
+
+def _apos_rollback(session):
+    session.info.pop(_CHAVE_USUARIOS, None)
+
+_OUVINTES = (
+    ('before_flush', _antes_do_flush),
+    ('do_orm_execute', _ao_executar),
+    ('after_commit', _apos_commit),
+    ('after_rollback', _apos_rollback),
+)
+
+def registrar_invalidacao_automatica(session=None):
+    """Registra os ouvintes na sessão (idempotente)"""
+    session = session if session is not None else db.session
+    for nome, ouvinte in _OUVINTES:
+        if not event.contains(session, nome, ouvinte):
+            event.listen(session, nome, ouvinte)
@@ -0,0 +1,197 @@
+"""
+Formato binário compacto do catálogo de exercícios
+
+O JSON original (~900 KB, com instruções e imagens) é convertido num arquivo
+colunar lido via mmap, para que vários workers compartilhem as mesmas páginas:
+
+    cabeçalho | tabela de strings | colunas (uint32) | índice das instruções | instruções
+
+Nomes, músculos, equipamento, nível e força viram IDs numa tabela de strings
+internadas. As instruções ficam numa seção separada e só são decodificadas
+quando alguém as pede.
+
+Uso (gera o .bin ao lado do JSON):
+    python -m services.catalogo_binario [origem.json] [destino.bin]
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+MAGICO = b'FLCATBIN'
+VERSAO = 1
+
+# magico, versao, qtd_exercicios, qtd_strings, offsets das seções
+_CABECALHO = struct.Struct('<8sIII5Q')
+
+# Valor None no JSON (ex.: "force": null)
+NULO = 0xFFFFFFFF
+
+# Colunas na ordem em que são gravadas: (chave no JSON, nome da coluna)
+COLUNAS = (
+    ('name', 'nome'),
+    ('primaryMuscles', 'musculo'),
+    ('equipment', 'equipamento'),
+    ('level', 'nivel'),
+    ('force', 'forca'),
+)
+
+
+def _uint32(valores):
+    """Array uint32 little-endian pronto para gravação"""
+    dados = array('I', valores)
+    if sys.byteorder != 'little':
+        dados.byteswap()
+    return dados.tobytes()
+
+
+def compilar_catalogo(origem, destino):
+    """
+    Converte o catálogo JSON no formato binário colunar
+
+    Args:
+        origem: Caminho do JSON do catálogo
+        destino: Caminho do arquivo .bin gerado
+
+    Returns:
+        int: Número de exercícios gravados
+    """
+    with open(origem, 'r', encoding='utf-8') as f:
+        catalogo = json.load(f)
+
+    strings = []
+    ids_strings = {}
+
+    def internar(valor):
+        if valor is None:
+            return NULO
+        if valor not in ids_strings:
+            ids_strings[valor] = len(strings)
+            strings.append(valor)
+        return ids_strings[valor]
+
+    colunas = {nome: [] for _, nome in COLUNAS}
+    instrucoes = []
+    for ex in catalogo:
+        for chave, nome in COLUNAS:
+            valor = ex.get(chave, '')
+            if chave == 'primaryMuscles':
+                valor = valor[0] if valor else None
+            colunas[nome].append(internar(valor))
+        instrucoes.append(json.dumps(ex.get('instructions', []), ensure_ascii=False).encode('utf-8'))
+
+    strings_utf8 = [s.encode('utf-8') for s in strings]
+    offsets_strings = [0]
+    for s in strings_utf8:
+        offsets_strings.append(offsets_strings[-1] + len(s))
+    offsets_instrucoes = [0]
+    for bloco in instrucoes:
+        offsets_instrucoes.append(offsets_instrucoes[-1] + len(bloco))
+
+    secoes = [
+        _uint32(offsets_strings) + b''.join(strings_utf8),
+        b''.join(_uint32(colunas[nome]) for _, nome in COLUNAS),
+        _uint32(offsets_instrucoes),
+        b''.join(instrucoes),
+    ]
+
+    offsets = []
+    posicao = _CABECALHO.size
+    for secao in secoes:
+        offsets.append(posicao)
+        posicao += len(secao)
+    offsets.append(posicao)
+
+    destino = Path(destino)
+    temporario = destino.with_suffix(destino.suffix + '.tmp')
+    with open(temporario, 'wb') as f:
+        f.write(_CABECALHO.pack(MAGICO, VERSAO, len(catalogo), len(strings), *offsets))
+        for secao in secoes:
+            f.write(secao)
+    temporario.replace(destino)
+    return len(catalogo)
+
+
+class CatalogoBinario:
+    """Leitor do catálogo binário via mmap (páginas compartilhadas entre processos)"""
+
+    def __init__(self, caminho):
+        with open(caminho, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magico, versao, self.qtd, qtd_strings,
+         off_strings, off_colunas, off_indice_instr, off_instr, off_fim) = \
+            _CABECALHO.unpack_from(self._mmap, 0)
+        if magico != MAGICO or versao != VERSAO:
+            raise ValueError(f"Arquivo de catálogo binário inválido: {caminho}")
+        if off_fim != len(self._mmap):
+            raise ValueError(f"Arquivo de catálogo binário truncado: {caminho}")
+
+        buffer = memoryview(self._mmap)
+        self._offsets_strings = self._ler_uint32(buffer, off_strings, qtd_strings + 1)
+        self._base_strings = off_strings + 4 * (qtd_strings + 1)
+        self._strings = [None] * qtd_strings
+
+        self._colunas = {}
+        inicio = off_colunas
+        for _, nome in COLUNAS:
+            self._colunas[nome] = self._ler_uint32(buffer, inicio, self.qtd)
+            inicio += 4 * self.qtd
+
+        self._offsets_instrucoes = self._ler_uint32(buffer, off_indice_instr, self.qtd + 1)
+        self._base_instrucoes = off_instr
+        buffer.release()
+
+    def __len__(self):
+        return self.qtd
+
+    @staticmethod
+    def _ler_uint32(buffer, inicio, quantidade):
+        """Copia uma coluna uint32 do mmap para um array (alguns KB)"""
+        dados = array('I')
+        dados.frombytes(buffer[inicio:inicio + 4 * quantidade])
+        if sys.byteorder != 'little':
+            dados.byteswap()
+        return dados
+
+    def _string(self, string_id):
+        """Decodifica (uma única vez) uma string internada"""
+        if string_id == NULO:
+            return None
+        valor = self._strings[string_id]
+        if valor is None:
+            inicio = self._base_strings + self._offsets_strings[string_id]
+            fim = self._base_strings + self._offsets_strings[string_id + 1]
+            valor = self._strings[string_id] = self._mmap[inicio:fim].decode('utf-8')
+        return valor
+
+    def get_instrucoes(self, posicao):
+        """Lê as instruções de um exercício sob demanda"""
+        inicio = self._base_instrucoes + self._offsets_instrucoes[posicao]
+        fim = self._base_instrucoes + self._offsets_instrucoes[posicao + 1]
+        return json.loads(self._mmap[inicio:fim].decode('utf-8'))
+
+    def __iter__(self):
+        """Linhas no formato do JSON, sem instruções nem imagens"""
+        colunas = [self._colunas[nome] for _, nome in COLUNAS]
+        for posicao in range(self.qtd):
+            nome, musculo, equipamento, nivel, forca = (
+                self._string(coluna[posicao]) for coluna in colunas
+            )
+            yield {
+                'name': nome,
+                'primaryMuscles': [musculo] if musculo is not None else [],
+                'equipment': equipamento,
+                'level': nivel,
+                'force': forca,
+            }
+
+
+if __name__ == "__main__":
+    origem = Path(sys.argv[1] if len(sys.argv) > 1 else "storage/exercises-ptbr-full-translation.json")
+    destino = Path(sys.argv[2]) if len(sys.argv) > 2 else origem.with_suffix('.bin')
+    total = compilar_catalogo(origem, destino)
+    print(f"{total} exercícios gravados em {destino} ({destino.stat().st_size} bytes)")
@@ -0,0 +1,355 @@
+"""
+Índice em memória do catálogo de exercícios
+
+Construído uma única vez a partir da lista bruta do JSON: nomes normalizados,
+músculo de exibição, IDs hash estáveis e índices de busca por nome,
+músculo, equipamento e nível.
+"""
+
+import hashlib
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import chain
+from utils.exercise_utils import remover_acentos
+
+# Mapeamento de músculos em inglês para português
+MAPA_MUSCULOS = {
+    'abdominais': 'Abdômen',
+    'abductors': 'Abdutores',
+    'adductors': 'Adutores',
+    'biceps': 'Bíceps',
+    'calves': 'Panturrilhas',
+    'chest': 'Peitoral',
+    'forearms': 'Antebraços',
+    'glutes': 'Glúteos',
+    'hamstrings': 'Posterior de Coxa',
+    'lats': 'Dorsal',
+    'lower back': 'Lombar',
+    'middle back': 'Costas',
+    'neck': 'Pescoço',
+    'quadriceps': 'Quadríceps',
+    'shoulders': 'Ombros',
+    'traps': 'Trapézio',
+    'triceps': 'Tríceps'
+}
+
+MUSCULO_NAO_ESPECIFICADO = "Não especificado"
+
+# Separador entre nomes no texto concatenado (nunca aparece em um nome)
+_SEPARADOR = '\n'
+
+# Similaridade mínima para um resultado da busca aproximada
+SCORE_MINIMO_FUZZY = 0.3
+
+
+def normalizar_nome(texto):
+    """Normaliza um nome para comparação (minúsculo e sem acentos)"""
+    return remover_acentos((texto or '').lower().strip())
+
+
+def musculo_exibicao(musculo_original):
+    """Traduz o músculo primário do catálogo para o nome de exibição"""
+    return MAPA_MUSCULOS.get(musculo_original.lower(), musculo_original.title())
+
+
+def gerar_trigramas(texto_normalizado):
+    """Trigramas de cada palavra, com bordas marcadas por espaços"""
+    trigramas = set()
+    for palavra in texto_normalizado.split():
+        marcada = f"  {palavra} "
+        for i in range(len(marcada) - 2):
+            trigramas.add(marcada[i:i + 3])
+    return trigramas
+
+
+def gerar_chaves_prefixo(texto_normalizado):
+    """Sufixos do nome a partir do início de cada palavra ("rosca direta", "direta")"""
+    palavras = texto_normalizado.split()
+    return [' '.join(palavras[i:]) for i in range(len(palavras))]
+
+
+def gerar_id_hash(nome):
+    """ID estável derivado do nome do exercício"""
+    return int(hashlib.md5(nome.encode()).hexdigest()[:8], 16)
+
+
+class CatalogoIndex:
+    """Catálogo pré-indexado: todas as buscas viram consultas a dicionários"""
+
+    def __init__(self, exercicios, carregar_instrucoes=None):
+        """
+        Args:
+            exercicios: Lista de exercícios no formato bruto do JSON
+            carregar_instrucoes: Função posicao -> instruções, usada quando as
+                linhas não trazem "instructions" (catálogo binário)
+        """
+        self._carregar_instrucoes = carregar_instrucoes
+        self.entradas = []
+        self.nomes_normalizados = []
+        self.por_nome = {}
+        self.por_id = {}
+        self.por_musculo = {}
+        self.por_equipamento = {}
+        self.por_nivel = {}
+        self.com_musculo = []
+        self.com_musculo_por_nome = {}
+        self.por_trigrama = {}
+        self.qtd_trigramas = []
+        musculos = set()
+
+        for ex in exercicios:
+            self._adicionar(ex)
+            tem_musculo = bool(ex.get('primaryMuscles'))
+            self.com_musculo.append(tem_musculo)
+            if tem_musculo:
+                musculos.add(self.entradas[-1]['musculo'])
+                self.com_musculo_por_nome.setdefault(self.nomes_normalizados[-1], len(self.entradas) - 1)
+
+        self.ordenados_por_nome = sorted(
+            range(len(self.entradas)), key=lambda i: self.entradas[i]['nome']
+        )
+        self.rank_nome = [0] * len(self.entradas)
+        for rank, posicao in enumerate(self.ordenados_por_nome):
+            self.rank_nome[posicao] = rank
+        self.musculos = sorted(musculos)
+        self._comprimentos_nomes = sorted({len(n) for n in self.com_musculo_por_nome if n})
+        self._montar_texto()
+        self._montar_prefixos()
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def _adicionar(self, ex):
+        """Pré-calcula os campos derivados e alimenta os índices"""
+        posicao = len(self.entradas)
+        nome = ex.get('name', '')
+        primary_muscles = ex.get('primaryMuscles', [])
+        musculo_original = primary_muscles[0] if primary_muscles else MUSCULO_NAO_ESPECIFICADO
+        musculo = musculo_exibicao(musculo_original)
+        id_hash = gerar_id_hash(nome)
+
+        entrada = {
+            "id": id_hash,
+            "nome": nome,
+            "musculo": musculo,
+            "musculo_original": musculo_original,
+            "equipment": ex.get('equipment', ''),
+            "level": ex.get('level', ''),
+            "force": ex.get('force', '')
+        }
+        if 'instructions' in ex or self._carregar_instrucoes is None:
+            entrada["instructions"] = ex.get('instructions', [])
+        self.entradas.append(entrada)
+
+        nome_normalizado = normalizar_nome(nome)
+        self.nomes_normalizados.append(nome_normalizado)
+        self.por_nome.setdefault(nome_normalizado, posicao)
+        self.por_id.setdefault(id_hash, posicao)
+        self.por_musculo.setdefault(musculo, []).append(posicao)
+        self.por_equipamento.setdefault(ex.get('equipment') or '', []).append(posicao)
+        self.por_nivel.setdefault(ex.get('level') or '', []).append(posicao)
+
+        trigramas = gerar_trigramas(nome_normalizado)
+        self.qtd_trigramas.append(len(trigramas))
+        for trigrama in trigramas:
+            self.por_trigrama.setdefault(trigrama, []).append(posicao)
+
+    def _montar_texto(self):
+        """Concatena os nomes normalizados para busca de substring em C"""
+        self._texto = _SEPARADOR.join(self.nomes_normalizados)
+        self._inicios = []
+        inicio = 0
+        for nome in self.nomes_normalizados:
+            self._inicios.append(inicio)
+            inicio += len(nome) + len(_SEPARADOR)
+
+    def _montar_prefixos(self):
+        """Array ordenado de chaves (nome e sufixos por palavra) para bisect"""
+        chaves_por_posicao = [gerar_chaves_prefixo(n) for n in self.nomes_normalizados]
+        # Todas as chaves de um nome numa string: "prefixo de alguma chave"
+        # vira uma busca de substring por "\n" + prefixo
+        self._chaves_unidas = ['\n' + '\n'.join(chaves) for chaves in chaves_por_posicao]
+        pares = sorted(
+            (chave, posicao)
+            for posicao, chaves in enumerate(chaves_por_posicao)
+            for chave in chaves
+        )
+        self._chaves_prefixo = [chave for chave, _ in pares]
+        self._posicoes_prefixo = [posicao for _, posicao in pares]
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def posicoes_contendo(self, termo_normalizado):
+        """Posições (em ordem do catálogo) cujo nome contém o termo"""
+        if not termo_normalizado:
+            return list(range(len(self.entradas)))
+        if _SEPARADOR in termo_normalizado:
+            return []
+
+        posicoes = []
+        texto = self._texto
+        inicio = texto.find(termo_normalizado)
+        while inicio != -1:
+            posicao = bisect_right(self._inicios, inicio) - 1
+            posicoes.append(posicao)
+            # Pula para o próximo nome: um nome conta uma única vez
+            proximo = self._inicios[posicao + 1] if posicao + 1 < len(self._inicios) else len(texto)
+            inicio = texto.find(termo_normalizado, proximo)
+        return posicoes
+
+    def filtrar(self, termo=None, musculo=None, equipamento=None, nivel=None, limite=None):
+        """
+        Retorna posições que atendem a todos os filtros, em ordem do catálogo
+
+        Os filtros categóricos são listas de postagem já ordenadas; o termo
+        é resolvido pela busca no texto concatenado.
+        """
+        listas = []
+        if musculo:
+            listas.append(self.por_musculo.get(musculo, []))
+        if equipamento:
+            listas.append(self.por_equipamento.get(equipamento, []))
+        if nivel:
+            listas.append(self.por_nivel.get(nivel, []))
+        if termo:
+            listas.append(self.posicoes_contendo(normalizar_nome(termo)))
+
+        if not listas:
+            candidatos = range(len(self.entradas))
+        else:
+            listas.sort(key=len)
+            candidatos = listas[0]
+            if len(listas) > 1:
+                restantes = [set(lista) for lista in listas[1:]]
+                candidatos = [p for p in candidatos if all(p in s for s in restantes)]
+
+        if limite is not None:
+            return list(candidatos[:limite])
+        return list(candidatos)
+
+    def buscar_fuzzy(self, termo, limite=10, musculo=None, score_minimo=SCORE_MINIMO_FUZZY):
+        """
+        Busca aproximada por trigramas, tolerante a erros de digitação
+
+        A similaridade é o coeficiente de Dice entre os trigramas do termo e
+        do nome; nomes que contêm o termo literalmente ganham bônus. Apenas
+        os `limite` melhores são mantidos num heap limitado.
+
+        Returns:
+            list: Tuplas (posicao, score) em ordem decrescente de score
+        """
+        busca = normalizar_nome(termo)
+        trigramas = gerar_trigramas(busca)
+        if not trigramas or limite <= 0:
+            return []
+
+        comuns = Counter(chain.from_iterable(
+            self.por_trigrama.get(trigrama, ()) for trigrama in trigramas
+        ))
+
+        permitidos = set(self.por_musculo.get(musculo, ())) if musculo else None
+        qtd_busca = len(trigramas)
+        heap = []
+        for posicao, qtd in comuns.items():
+            if permitidos is not None and posicao not in permitidos:
+                continue
+            score = 2.0 * qtd / (qtd_busca + self.qtd_trigramas[posicao])
+            if busca in self.nomes_normalizados[posicao]:
+                score += 1.0
+            if score < score_minimo:
+                continue
+            # Empate: menor posição do catálogo vence
+            item = (score, -posicao)
+            if len(heap) < limite:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        return [(-p, score) for score, p in sorted(heap, reverse=True)]
+
+    def _ordenar_typeahead(self, busca, posicoes):
+        """Nomes que começam com o prefixo primeiro, depois ordem alfabética"""
+        nomes = self.nomes_normalizados
+        rank = self.rank_nome
+        return sorted(posicoes, key=lambda p: (not nomes[p].startswith(busca), rank[p]))
+
+    def buscar_prefixo(self, prefixo_normalizado):
+        """
+        Posições cujo nome (ou alguma palavra do nome) começa com o prefixo
+
+        Duas buscas binárias no array ordenado de chaves delimitam o intervalo.
+        """
+        busca = ' '.join(prefixo_normalizado.split())
+        if not busca:
+            return []
+        inicio = bisect_left(self._chaves_prefixo, busca)
+        fim = bisect_left(self._chaves_prefixo, busca + '\uffff', inicio)
+        return self._ordenar_typeahead(busca, set(self._posicoes_prefixo[inicio:fim]))
+
+    def refinar_prefixo(self, prefixo_normalizado, posicoes_anteriores):
+        """
+        Restringe o resultado de um prefixo mais curto ao novo prefixo
+
+        Válido quando o novo prefixo estende o anterior: o resultado é sempre
+        um subconjunto, então só os candidatos anteriores são verificados.
+        """
+        busca = ' '.join(prefixo_normalizado.split())
+        if not busca:
+            return []
+        marcador = '\n' + busca
+        unidas = self._chaves_unidas
+        posicoes = [p for p in posicoes_anteriores if marcador in unidas[p]]
+        return self._ordenar_typeahead(busca, posicoes)
+
+    def materializar(self, posicao):
+        """Cópia completa da entrada, lendo as instruções sob demanda"""
+        entrada = dict(self.entradas[posicao])
+        if "instructions" not in entrada:
+            entrada["instructions"] = self._carregar_instrucoes(posicao)
+        return entrada
+
+    def get_por_nome(self, nome):
+        """Retorna a entrada com nome normalizado idêntico ou None"""
+        posicao = self.por_nome.get(normalizar_nome(nome))
+        return self.entradas[posicao] if posicao is not None else None
+
+    def get_por_id(self, id_hash):
+        """Retorna a entrada pelo ID hash ou None"""
+        posicao = self.por_id.get(id_hash)
+        return self.entradas[posicao] if posicao is not None else None
+
+    def resolver_musculo(self, nome):
+        """
+        Resolve o músculo de um exercício numa única passada pelos índices
+
+        Prioridade: nome idêntico; primeiro nome do catálogo que contém o
+        termo; primeiro nome do catálogo contido no termo.
+        """
+        busca = normalizar_nome(nome)
+        if not busca:
+            return None
+
+        posicao = self.com_musculo_por_nome.get(busca)
+        if posicao is not None:
+            return self.entradas[posicao]['musculo']
+
+        for posicao in self.posicoes_contendo(busca):
+            if self.com_musculo[posicao]:
+                return self.entradas[posicao]['musculo']
+
+        # Nome do catálogo contido no termo: testa as janelas do termo com
+        # os comprimentos de nome existentes e fica com a primeira do catálogo
+        melhor = None
+        for comprimento in self._comprimentos_nomes:
+            if comprimento > len(busca):
+                break
+            for inicio in range(len(busca) - comprimento + 1):
+                posicao = self.com_musculo_por_nome.get(busca[inicio:inicio + comprimento])
+                if posicao is not None and (melhor is None or posicao < melhor):
+                    melhor = posicao
+        if melhor is not None:
+            return self.entradas[melhor]['musculo']
+        return None
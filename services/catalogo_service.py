@@ -3,105 +3,159 @@ Serviço para gerenciar o catálogo de exercícios do arquivo JSON
 """
 
 import json
-import hashlib
+import threading
+from collections import OrderedDict, namedtuple
 from pathlib import Path
 import logging
-from utils.exercise_utils import remover_acentos
+from .catalogo_index import CatalogoIndex, normalizar_nome
+from .catalogo_binario import CatalogoBinario
 
 logger = logging.getLogger(__name__)
 
+MusculoCatalogo = namedtuple('MusculoCatalogo', 'nome_exibicao')
+
+def _resumir(entrada):
+    """Campos usados pelos seletores de exercício (sem ler as instruções)"""
+    return {"id": entrada["id"], "nome": entrada["nome"], "musculo": entrada["musculo"]}
+
+class ExercicioCatalogo:
+    """
+    Exercício do catálogo ainda não cadastrado pelo usuário, com os atributos
+    de Exercicio usados nos templates (id é o hash do catálogo)
+    """
+    
+    __slots__ = ('id', 'nome', 'musculo_ref', 'treino_id', 'user_id')
+    
+    def __init__(self, ex_id, nome, musculo_nome, user_id=None):
+        self.id = ex_id
+        self.nome = nome
+        self.musculo_ref = MusculoCatalogo(musculo_nome)
+        self.treino_id = None
+        self.user_id = user_id
+
 class CatalogoService:
     """Serviço para acessar o catálogo de exercícios do JSON"""
     
     _catalogo = None
+    _catalogo_mtime = None
+    _indice = None
+    _lock = threading.RLock()
     _catalogo_path = Path("storage/exercises-ptbr-full-translation.json")
+    _catalogo_bin_path = _catalogo_path.with_suffix('.bin')
+    
+    # LRU de prefixos recentes por sessão: {sessao: OrderedDict(prefixo -> posições)}
+    _typeahead_sessoes = OrderedDict()
+    _typeahead_indice = None
+    TYPEAHEAD_PREFIXOS_POR_SESSAO = 8
+    TYPEAHEAD_MAX_SESSOES = 1000
     
     @classmethod
-    def get_catalogo(cls, force_reload=False):
-        """Carrega o catálogo do arquivo JSON (com cache)"""
-        if cls._catalogo is None or force_reload:
+    def _get_mtime(cls):
+        """
+        Retorna (mtime do JSON, mtime do binário) ou None se nenhum existir
+        """
+        mtimes = []
+        for caminho in (cls._catalogo_path, cls._catalogo_bin_path):
             try:
-                if not cls._catalogo_path.exists():
-                    logger.error(f"Arquivo de catálogo não encontrado: {cls._catalogo_path}")
-                    return []
-                
-                with open(cls._catalogo_path, 'r', encoding='utf-8') as f:
-                    cls._catalogo = json.load(f)
-                
-                logger.info(f"Catálogo carregado com {len(cls._catalogo)} exercícios")
-            except Exception as e:
-                logger.error(f"Erro ao carregar catálogo: {e}")
-                return []
+                mtimes.append(caminho.stat().st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes) if any(m is not None for m in mtimes) else None
+    
+    @classmethod
+    def _carregar(cls, mtime):
+        """Abre o binário via mmap se estiver atualizado; senão lê o JSON"""
+        mtime_json, mtime_bin = mtime
+        if mtime_bin is not None and (mtime_json is None or mtime_bin >= mtime_json):
+            try:
+                return CatalogoBinario(cls._catalogo_bin_path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Catálogo binário ignorado: {e}")
+        
+        with open(cls._catalogo_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    @classmethod
+    def get_catalogo(cls, force_reload=False):
+        """
+        Carrega o catálogo (com cache por processo)
+        
+        Usa o arquivo binário compilado (mmap, compartilhado entre workers)
+        quando ele existe e é mais novo que o JSON. O cache é recarregado
+        automaticamente quando o mtime de algum dos arquivos muda.
+        
+        Returns:
+            Sequência de exercícios no formato do JSON
+        """
+        mtime = cls._get_mtime()
+        desatualizado = mtime is not None and mtime != cls._catalogo_mtime
+        
+        if cls._catalogo is None or force_reload or desatualizado:
+            with cls._lock:
+                # Outra thread pode ter recarregado enquanto esperávamos
+                if cls._catalogo is not None and not force_reload and mtime == cls._catalogo_mtime:
+                    return cls._catalogo
+                try:
+                    if mtime is None:
+                        logger.error(f"Arquivo de catálogo não encontrado: {cls._catalogo_path}")
+                        return cls._catalogo or []
+                    
+                    catalogo = cls._carregar(mtime)
+                    
+                    cls._indice = None
+                    cls._catalogo = catalogo
+                    cls._catalogo_mtime = mtime
+                    logger.info(f"Catálogo carregado com {len(catalogo)} exercícios")
+                except Exception as e:
+                    logger.error(f"Erro ao carregar catálogo: {e}")
+                    return cls._catalogo or []
         
         return cls._catalogo
     
     @classmethod
-    def get_todos_exercicios(cls, limite=500):
+    def get_indice(cls, force_reload=False):
+        """Retorna o índice pré-calculado do catálogo (reconstruído a cada recarga)"""
+        catalogo = cls.get_catalogo(force_reload)
+        if cls._indice is None and catalogo:
+            with cls._lock:
+                if cls._indice is None:
+                    cls._indice = CatalogoIndex(
+                        cls._catalogo,
+                        carregar_instrucoes=getattr(cls._catalogo, 'get_instrucoes', None)
+                    )
+                    logger.info(f"Índice do catálogo construído com {len(cls._indice)} exercícios")
+        return cls._indice
+    
+    @classmethod
+    def get_todos_exercicios(cls, limite=500, completos=True):
         """
         Retorna todos os exercícios do catálogo (com paginação opcional)
         
         Args:
             limite: Número máximo de exercícios (padrão 500)
+            completos: False retorna só id, nome e musculo, sem decodificar
+                as instruções de cada exercício
         
         Returns:
             list: Lista com todos os exercícios
         """
-        catalogo = cls.get_catalogo()
-        if not catalogo:
+        indice = cls.get_indice()
+        if not indice:
             return []
         
-        # Mapeamento de músculos em inglês para português
-        mapa_musculos = {
-            'abdominais': 'Abdômen',
-            'abductors': 'Abdutores',
-            'adductors': 'Adutores',
-            'biceps': 'Bíceps',
-            'calves': 'Panturrilhas',
-            'chest': 'Peitoral',
-            'forearms': 'Antebraços',
-            'glutes': 'Glúteos',
-            'hamstrings': 'Posterior de Coxa',
-            'lats': 'Dorsal',
-            'lower back': 'Lombar',
-            'middle back': 'Costas',
-            'neck': 'Pescoço',
-            'quadriceps': 'Quadríceps',
-            'shoulders': 'Ombros',
-            'traps': 'Trapézio',
-            'triceps': 'Tríceps'
-        }
-        
-        resultados = []
-        for ex in catalogo:
-            nome = ex.get('name', '')
-            primary_muscles = ex.get('primaryMuscles', [])
-            musculo_original = primary_muscles[0] if primary_muscles else "Não especificado"
-            
-            musculo_exibicao = mapa_musculos.get(musculo_original.lower(), musculo_original.title())
-            
-            # Gerar ID hash para referência
-            id_hash = int(hashlib.md5(nome.encode()).hexdigest()[:8], 16)
-            
-            resultados.append({
-                "id": id_hash,
-                "nome": nome,
-                "musculo": musculo_exibicao,
-                "musculo_original": musculo_original,
-                "equipment": ex.get('equipment', ''),
-                "level": ex.get('level', ''),
-                "force": ex.get('force', ''),
-                "instructions": ex.get('instructions', [])
-            })
-            
-            if len(resultados) >= limite:
-                break
+        # Os primeiros `limite` do arquivo, ordenados por nome
+        if limite >= len(indice):
+            posicoes = indice.ordenados_por_nome
+        else:
+            posicoes = sorted(range(limite), key=lambda i: indice.entradas[i]['nome'])
         
-        # Ordenar por nome
-        resultados.sort(key=lambda x: x['nome'])
-        return resultados
+        if not completos:
+            return [_resumir(indice.entradas[i]) for i in posicoes]
+        return [indice.materializar(i) for i in posicoes]
     
     @classmethod
-    def buscar_exercicios(cls, termo=None, musculo=None, limite=500):
+    def buscar_exercicios(cls, termo=None, musculo=None, limite=500, equipamento=None, nivel=None,
+                          completos=True):
         """
         Busca exercícios no catálogo por termo e/ou músculo
         Se não houver termo, retorna todos (limitado)
@@ -110,151 +164,150 @@ class CatalogoService:
             termo: Termo para buscar no nome do exercício (opcional)
             musculo: Filtrar por músculo (opcional)
             limite: Número máximo de resultados
+            equipamento: Filtrar por equipamento (opcional)
+            nivel: Filtrar por nível (opcional)
+            completos: False retorna só id, nome e musculo
         
         Returns:
             list: Lista de exercícios encontrados
         """
-        # Se não tiver termo nem músculo, retorna todos
-        if not termo and not musculo:
-            return cls.get_todos_exercicios(limite)
+        # Se não tiver nenhum filtro, retorna todos
+        if not termo and not musculo and not equipamento and not nivel:
+            return cls.get_todos_exercicios(limite, completos)
         
-        catalogo = cls.get_catalogo()
-        if not catalogo:
+        indice = cls.get_indice()
+        if not indice:
             return []
         
-        # Mapeamento de músculos em inglês para português
-        mapa_musculos = {
-            'abdominais': 'Abdômen',
-            'abductors': 'Abdutores',
-            'adductors': 'Adutores',
-            'biceps': 'Bíceps',
-            'calves': 'Panturrilhas',
-            'chest': 'Peitoral',
-            'forearms': 'Antebraços',
-            'glutes': 'Glúteos',
-            'hamstrings': 'Posterior de Coxa',
-            'lats': 'Dorsal',
-            'lower back': 'Lombar',
-            'middle back': 'Costas',
-            'neck': 'Pescoço',
-            'quadriceps': 'Quadríceps',
-            'shoulders': 'Ombros',
-            'traps': 'Trapézio',
-            'triceps': 'Tríceps'
-        }
+        posicoes = indice.filtrar(termo, musculo, equipamento, nivel, limite)
+        if not completos:
+            return [_resumir(indice.entradas[i]) for i in posicoes]
+        return [indice.materializar(i) for i in posicoes]
+    
+    @classmethod
+    def buscar_fuzzy(cls, termo, musculo=None, limite=10):
+        """
+        Busca aproximada (tolerante a erros de digitação) no catálogo
+        
+        Args:
+            termo: Termo digitado pelo usuário
+            musculo: Filtrar por músculo (opcional)
+            limite: Número máximo de resultados
+        
+        Returns:
+            list: Exercícios ordenados por relevância, com o campo "score"
+        """
+        indice = cls.get_indice()
+        if not indice or not termo:
+            return []
         
         resultados = []
-        termo_normalizado = remover_acentos(termo.lower()) if termo else None
+        for posicao, score in indice.buscar_fuzzy(termo, limite, musculo):
+            ex = indice.materializar(posicao)
+            ex["score"] = round(score, 3)
+            resultados.append(ex)
+        return resultados
+    
+    @classmethod
+    def _get_typeahead_cache(cls, indice, sessao_id):
+        """Retorna o LRU de prefixos da sessão (descartado se o índice mudou)"""
+        if cls._typeahead_indice is not indice:
+            cls._typeahead_sessoes.clear()
+            cls._typeahead_indice = indice
         
-        for ex in catalogo:
-            nome = ex.get('name', '')
-            primary_muscles = ex.get('primaryMuscles', [])
-            musculo_original = primary_muscles[0] if primary_muscles else "Não especificado"
-            
-            nome_normalizado = remover_acentos(nome.lower())
-            musculo_exibicao = mapa_musculos.get(musculo_original.lower(), musculo_original.title())
-            
-            # Aplicar filtros
-            if termo and termo_normalizado not in nome_normalizado:
-                continue
-            
-            if musculo and musculo_exibicao != musculo:
-                continue
-            
-            # Gerar ID hash para referência
-            id_hash = int(hashlib.md5(nome.encode()).hexdigest()[:8], 16)
-            
-            resultados.append({
-                "id": id_hash,
-                "nome": nome,
-                "musculo": musculo_exibicao,
-                "musculo_original": musculo_original,
-                "equipment": ex.get('equipment', ''),
-                "level": ex.get('level', ''),
-                "force": ex.get('force', ''),
-                "instructions": ex.get('instructions', [])
-            })
+        cache = cls._typeahead_sessoes.get(sessao_id)
+        if cache is None:
+            cache = cls._typeahead_sessoes[sessao_id] = OrderedDict()
+            while len(cls._typeahead_sessoes) > cls.TYPEAHEAD_MAX_SESSOES:
+                cls._typeahead_sessoes.popitem(last=False)
+        else:
+            cls._typeahead_sessoes.move_to_end(sessao_id)
+        return cache
+    
+    @classmethod
+    def typeahead(cls, prefixo, sessao_id=None, limite=10):
+        """
+        Sugestões por prefixo do nome ou de qualquer palavra do nome
+        
+        Quando o prefixo estende um prefixo recente da mesma sessão, o
+        resultado anterior é apenas refinado em vez de buscar no catálogo todo.
+        
+        Args:
+            prefixo: Texto digitado até agora
+            sessao_id: Identificador da sessão (para o LRU de prefixos)
+            limite: Número máximo de sugestões
+        
+        Returns:
+            list: Exercícios sugeridos (id, nome e musculo)
+        """
+        indice = cls.get_indice()
+        busca = ' '.join(normalizar_nome(prefixo).split())
+        if not indice or not busca:
+            return []
+        
+        with cls._lock:
+            cache = cls._get_typeahead_cache(indice, sessao_id)
+            posicoes = cache.get(busca)
             
-            if len(resultados) >= limite:
-                break
+            if posicoes is not None:
+                cache.move_to_end(busca)
+            else:
+                # Prefixo anterior mais longo que o novo prefixo estende
+                anterior = max(
+                    (p for p in cache if busca.startswith(p)), key=len, default=None
+                )
+                if anterior is not None:
+                    posicoes = indice.refinar_prefixo(busca, cache[anterior])
+                else:
+                    posicoes = indice.buscar_prefixo(busca)
+                
+                cache[busca] = posicoes
+                while len(cache) > cls.TYPEAHEAD_PREFIXOS_POR_SESSAO:
+                    cache.popitem(last=False)
         
-        return resultados
+        return [_resumir(indice.entradas[i]) for i in posicoes[:limite]]
     
     @classmethod
     def get_musculos_disponiveis(cls):
         """Retorna lista de músculos disponíveis no catálogo"""
-        catalogo = cls.get_catalogo()
-        if not catalogo:
+        indice = cls.get_indice()
+        if not indice:
             return []
         
-        mapa_musculos = {
-            'abdominais': 'Abdômen',
-            'abductors': 'Abdutores',
-            'adductors': 'Adutores',
-            'biceps': 'Bíceps',
-            'calves': 'Panturrilhas',
-            'chest': 'Peitoral',
-            'forearms': 'Antebraços',
-            'glutes': 'Glúteos',
-            'hamstrings': 'Posterior de Coxa',
-            'lats': 'Dorsal',
-            'lower back': 'Lombar',
-            'middle back': 'Costas',
-            'neck': 'Pescoço',
-            'quadriceps': 'Quadríceps',
-            'shoulders': 'Ombros',
-            'traps': 'Trapézio',
-            'triceps': 'Tríceps'
-        }
-        
-        musculos_set = set()
-        for ex in catalogo:
-            primary_muscles = ex.get('primaryMuscles', [])
-            if primary_muscles:
-                musculo = mapa_musculos.get(primary_muscles[0].lower(), primary_muscles[0].title())
-                musculos_set.add(musculo)
-        
-        return sorted(list(musculos_set))
+        return list(indice.musculos)
     
     @classmethod
     def get_exercicio_por_nome(cls, nome):
         """Busca um exercício específico pelo nome no catálogo"""
-        catalogo = cls.get_catalogo()
-        if not catalogo:
+        indice = cls.get_indice()
+        if not indice:
             return None
         
-        nome_normalizado = remover_acentos(nome.lower())
+        posicao = indice.por_nome.get(normalizar_nome(nome))
+        if posicao is None:
+            return None
         
-        for ex in catalogo:
-            if remover_acentos(ex.get('name', '').lower()) == nome_normalizado:
-                primary_muscles = ex.get('primaryMuscles', [])
-                musculo_original = primary_muscles[0] if primary_muscles else "Não especificado"
-                
-                mapa_musculos = {
-                    'abdominais': 'Abdômen',
-                    'abductors': 'Abdutores',
-                    'adductors': 'Adutores',
-                    'biceps': 'Bíceps',
-                    'calves': 'Panturrilhas',
-                    'chest': 'Peitoral',
-                    'forearms': 'Antebraços',
-                    'glutes': 'Glúteos',
-                    'hamstrings': 'Posterior de Coxa',
-                    'lats': 'Dorsal',
-                    'lower back': 'Lombar',
-                    'middle back': 'Costas',
-                    'neck': 'Pescoço',
-                    'quadriceps': 'Quadríceps',
-                    'shoulders': 'Ombros',
-                    'traps': 'Trapézio',
-                    'triceps': 'Tríceps'
-                }
-                
-                return {
-                    "nome": ex.get('name', ''),
-                    "musculo": mapa_musculos.get(musculo_original.lower(), musculo_original.title()),
-                    "equipment": ex.get('equipment', ''),
-                    "instructions": ex.get('instructions', [])
-                }
+        ex = indice.materializar(posicao)
+        return {
+            "nome": ex['nome'],
+            "musculo": ex['musculo'],
+            "equipment": ex['equipment'],
+            "instructions": ex['instructions']
+        }
+    
+    @classmethod
+    def buscar_musculo(cls, nome):
+        """
+        Resolve o músculo de exibição de um exercício pelo nome
+        
+        Tenta, nesta ordem: nome idêntico, nome do catálogo contendo o termo
+        e termo contendo o nome do catálogo.
+        
+        Returns:
+            str: Nome do músculo ou None se não encontrar
+        """
+        indice = cls.get_indice()
+        if not indice or not nome:
+            return None
         
-        return None
\ No newline at end of file
+        return indice.resolver_musculo(nome)
\ No newline at end of file
@@ -1,14 +1,144 @@
 """Serviço para cálculos estatísticos"""
 
-from models import db, Musculo, Exercicio, RegistroTreino, HistoricoTreino
+from models import db, Treino, Musculo, Exercicio, RegistroTreino, HistoricoTreino, ResumoSemanal
 from sqlalchemy import func, and_
-from . import BaseService
+from collections import Counter, namedtuple
+import threading
+from utils.periodo import interpretar_periodo
+from . import BaseService, cached, tag_usuario
+from .exercicio_service import ExercicioService
+from .registro_service import RegistroService
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Os resultados só mudam quando os dados do usuário mudam, e a invalidação
+# por tag (cache_invalidacao) é exata; o TTL apenas limita entradas órfãs.
+TTL_ESTATISTICAS = 6 * 60 * 60
+
+ProgressoSemana = namedtuple('ProgressoSemana', 'periodo semana volume_total carga_media')
+
+def chave_ordenacao_periodo(periodo):
+    """
+    Chave cronológica de um período ("Janeiro/2024", "Março 2024", "Abril")
+    
+    Períodos sem ano vêm antes dos anos; períodos não reconhecidos, no fim.
+    """
+    mes_ano = interpretar_periodo(str(periodo))
+    if mes_ano is None:
+        return (1, 0, 0, periodo)
+    return (0, mes_ano.ano or 0, mes_ano.mes, periodo)
+
+def _tags_do_usuario(user_id, *args, **kwargs):
+    return (tag_usuario(user_id),)
+
+@cached(ttl_seconds=TTL_ESTATISTICAS, key_prefix='estatisticas:musculo', tags=_tags_do_usuario)
+def _calcular_por_musculo(user_id):
+    # Lê do resumo semanal em vez de reagregar o histórico de séries
+    resultado = db.session.query(
+        Musculo.nome_exibicao.label('musculo'),
+        db.func.count(db.distinct(Exercicio.id)).label('qtd_exercicios'),
+        db.func.coalesce(db.func.sum(ResumoSemanal.qtd_registros), 0).label('qtd_registros'),
+        db.func.coalesce(db.func.sum(ResumoSemanal.total_series), 0).label('total_series'),
+        db.func.coalesce(db.func.sum(ResumoSemanal.volume_total), 0).label('volume_total')
+    ).select_from(Musculo)\
+     .outerjoin(Exercicio, and_(Exercicio.musculo_id == Musculo.id, Exercicio.user_id == user_id))\
+     .outerjoin(ResumoSemanal, and_(ResumoSemanal.exercicio_id == Exercicio.id, ResumoSemanal.user_id == user_id))\
+     .group_by(Musculo.id, Musculo.nome_exibicao)\
+     .all()
+    
+    stats = {}
+    for r in resultado:
+        stats[r.musculo] = {
+            'qtd_exercicios': r.qtd_exercicios,
+            'qtd_registros': r.qtd_registros,
+            'total_series': r.total_series,
+            'volume_total': float(r.volume_total)
+        }
+    return stats
+
+@cached(ttl_seconds=TTL_ESTATISTICAS, key_prefix='estatisticas:treino', tags=_tags_do_usuario)
+def _calcular_por_treino(user_id):
+    # Exercícios e registros são agregados em subconsultas separadas para
+    # que o join entre eles não multiplique volumes e contagens
+    exercicios = db.session.query(
+        Exercicio.treino_id.label('treino_id'),
+        db.func.count(Exercicio.id).label('qtd_exercicios')
+    ).filter(Exercicio.user_id == user_id)\
+     .group_by(Exercicio.treino_id)\
+     .subquery()
+    
+    registros = db.session.query(
+        RegistroTreino.treino_id.label('treino_id'),
+        db.func.count(db.distinct(RegistroTreino.id)).label('qtd_registros'),
+        db.func.coalesce(db.func.sum(HistoricoTreino.quantidade), 0).label('total_series'),
+        db.func.coalesce(db.func.sum(
+            HistoricoTreino.carga * HistoricoTreino.repeticoes * HistoricoTreino.quantidade
+        ), 0).label('volume_total')
+    ).outerjoin(HistoricoTreino, HistoricoTreino.registro_id == RegistroTreino.id)\
+     .filter(RegistroTreino.user_id == user_id)\
+     .group_by(RegistroTreino.treino_id)\
+     .subquery()
+    
+    resultado = db.session.query(
+        Treino.id,
+        Treino.codigo,
+        Treino.nome,
+        Treino.descricao,
+        db.func.coalesce(exercicios.c.qtd_exercicios, 0).label('qtd_exercicios'),
+        db.func.coalesce(registros.c.qtd_registros, 0).label('qtd_registros'),
+        db.func.coalesce(registros.c.total_series, 0).label('total_series'),
+        db.func.coalesce(registros.c.volume_total, 0).label('volume_total')
+    ).outerjoin(exercicios, exercicios.c.treino_id == Treino.id)\
+     .outerjoin(registros, registros.c.treino_id == Treino.id)\
+     .filter(Treino.user_id == user_id)\
+     .order_by(Treino.codigo)\
+     .all()
+    
+    treino_stats = {}
+    for r in resultado:
+        treino_stats[r.id] = {
+            "codigo": r.codigo,
+            "nome": r.nome,
+            "descricao": r.descricao,
+            "qtd_exercicios": r.qtd_exercicios,
+            "qtd_registros": r.qtd_registros,
+            "volume_total": float(r.volume_total),
+            "total_series": r.total_series
+        }
+    return treino_stats
+
+@cached(ttl_seconds=TTL_ESTATISTICAS, key_prefix='estatisticas:progresso', tags=_tags_do_usuario)
+def _get_progresso_por_semana(user_id, treino_id=None):
+    total_series = db.func.sum(ResumoSemanal.total_series)
+    query = db.session.query(
+        ResumoSemanal.periodo,
+        ResumoSemanal.semana,
+        db.func.sum(ResumoSemanal.volume_total).label('volume_total'),
+        (db.func.sum(ResumoSemanal.soma_cargas) / total_series).label('carga_media')
+    ).filter(ResumoSemanal.user_id == user_id)\
+     .group_by(ResumoSemanal.periodo, ResumoSemanal.semana)\
+     .having(total_series > 0)
+    
+    if treino_id:
+        query = query.filter(ResumoSemanal.treino_id == treino_id)
+    
+    # Ordem cronológica pela data normalizada (períodos não reconhecidos no fim);
+    # pelo agregado, para que data_sessao nula em parte da semana não a divida
+    sessao = db.func.min(ResumoSemanal.data_sessao)
+    query = query.order_by(sessao.is_(None), sessao, ResumoSemanal.periodo, ResumoSemanal.semana)
+    
+    # Tuplas simples: serializáveis em qualquer backend de cache
+    return [
+        ProgressoSemana(r.periodo, r.semana, r.volume_total, r.carga_media)
+        for r in query.all()
+    ]
+
 class EstatisticaService(BaseService):
-    """Gerencia cálculos estatísticos"""
+    """Gerencia cálculos estatísticos (memoizados por usuário)"""
+    
+    _contadores_pagina = {'cache': 0, 'calculada': 0}
+    _contadores_lock = threading.Lock()
     
     @staticmethod
     def calcular_por_musculo(user_id=None):
@@ -18,28 +148,7 @@ class EstatisticaService(BaseService):
             if not user_id:
                 return {}
             
-            resultado = db.session.query(
-                Musculo.nome_exibicao.label('musculo'),
-                db.func.count(db.distinct(Exercicio.id)).label('qtd_exercicios'),
-                db.func.count(db.distinct(RegistroTreino.id)).label('qtd_registros'),
-                db.func.count(HistoricoTreino.id).label('total_series'),
-                db.func.coalesce(db.func.sum(HistoricoTreino.carga * HistoricoTreino.repeticoes), 0).label('volume_total')
-            ).select_from(Musculo)\
-             .outerjoin(Exercicio, and_(Exercicio.musculo_id == Musculo.id, Exercicio.user_id == user_id))\
-             .outerjoin(RegistroTreino, and_(RegistroTreino.exercicio_id == Exercicio.id, RegistroTreino.user_id == user_id))\
-             .outerjoin(HistoricoTreino, HistoricoTreino.registro_id == RegistroTreino.id)\
-             .group_by(Musculo.id, Musculo.nome_exibicao)\
-             .all()
-            
-            stats = {}
-            for r in resultado:
-                stats[r.musculo] = {
-                    'qtd_exercicios': r.qtd_exercicios,
-                    'qtd_registros': r.qtd_registros,
-                    'total_series': r.total_series,
-                    'volume_total': float(r.volume_total)
-                }
-            return stats
+            return _calcular_por_musculo(user_id)
         except Exception as e:
             BaseService.handle_error(e, "Erro ao calcular estatísticas por músculo")
             return {}
@@ -48,37 +157,11 @@ class EstatisticaService(BaseService):
     def calcular_por_treino(user_id=None):
         """Calcula estatísticas por treino"""
         try:
-            from .treino_service import TreinoService
-            from .exercicio_service import ExercicioService
-            from .registro_service import RegistroService
-            
-            treinos = TreinoService.get_all(user_id)
-            exercicios = ExercicioService.get_all(user_id)
-            registros = RegistroService.get_all(user_id=user_id, load_series=True)
-            
-            treino_stats = {}
-            for t in treinos:
-                exercicios_treino = [e for e in exercicios if e.treino_id == t.id]
-                registros_treino = [r for r in registros if r.treino_id == t.id]
-                
-                volume_total = 0
-                total_series = 0
-                for r in registros_treino:
-                    for s in r.series:
-                        volume_total += float(s.carga) * s.repeticoes
-                        total_series += 1
-                
-                treino_stats[t.id] = {
-                    "codigo": t.codigo,
-                    "nome": t.nome,
-                    "descricao": t.descricao,
-                    "qtd_exercicios": len(exercicios_treino),
-                    "qtd_registros": len(registros_treino),
-                    "volume_total": volume_total,
-                    "total_series": total_series
-                }
+            user_id = user_id or BaseService.get_current_user_id()
+            if not user_id:
+                return {}
             
-            return treino_stats
+            return _calcular_por_treino(user_id)
         except Exception as e:
             BaseService.handle_error(e, "Erro ao calcular estatísticas por treino")
             return {}
@@ -91,112 +174,151 @@ class EstatisticaService(BaseService):
             if not user_id:
                 return []
             
-            query = db.session.query(
-                RegistroTreino.periodo,
-                RegistroTreino.semana,
-                db.func.sum(HistoricoTreino.carga * HistoricoTreino.repeticoes).label('volume_total'),
-                db.func.avg(HistoricoTreino.carga).label('carga_media')
-            ).join(HistoricoTreino)\
-             .filter(RegistroTreino.user_id == user_id)\
-             .group_by(RegistroTreino.periodo, RegistroTreino.semana)
-            
-            if treino_id:
-                query = query.filter(RegistroTreino.treino_id == treino_id)
-            
-            return query.order_by(RegistroTreino.periodo, RegistroTreino.semana).all()
+            return _get_progresso_por_semana(user_id, treino_id or None)
         except Exception as e:
             BaseService.handle_error(e, "Erro ao calcular progresso por semana")
             return []
     
-    @staticmethod
-    def preparar_dados_tabela(exercicios, registros, semanas_filtro, request_args):
-        """Prepara dados para a tabela de visualização"""
+    @classmethod
+    def get_dados_pagina(cls, user_id=None):
+        """
+        Estatísticas por músculo e por treino para a página /estatisticas
+        
+        Conta se a página foi servida inteiramente do cache.
+        
+        Returns:
+            tuple: (musculo_stats, treino_stats)
+        """
         try:
-            # Criar dicionário de registros por exercício
-            registros_por_exercicio = {}
-            for ex in exercicios:
-                registros_por_exercicio[ex.id] = {}
-            
-            for r in registros:
-                if r.exercicio_id in registros_por_exercicio:
-                    key = f"{r.periodo}_{r.semana}"
-                    registros_por_exercicio[r.exercicio_id][key] = {
-                        'id': r.id,
-                        'series': [{'carga': float(s.carga), 'repeticoes': s.repeticoes} for s in r.series],
-                        'periodo': r.periodo,
-                        'semana': r.semana,
-                        'treino_id': r.treino_id,
-                        'versao_id': r.versao_id,
-                        'data_registro': r.data_registro.isoformat() if r.data_registro else None
-                    }
-            
-            # Coletar todas as semanas
-            semanas_set = set()
-            for r in registros:
-                semanas_set.add((r.periodo, r.semana, f"{r.periodo}_{r.semana}"))
-            
-            semanas = []
-            for periodo, semana, key in semanas_set:
-                semanas.append({
-                    "periodo": periodo,
-                    "semana": semana,
-                    "key": key
-                })
-            
-            # Ordenar semanas
-            ordem_periodos = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", 
-                              "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
-            
-            semanas.sort(key=lambda x: (ordem_periodos.index(x["periodo"]) if x["periodo"] in ordem_periodos else 999, x["semana"]))
-            
-            # Filtrar semanas conforme parâmetro
-            semanas_filtradas = []
-            semanas_selecionadas_lista = []
+            user_id = user_id or BaseService.get_current_user_id()
+            if not user_id:
+                return {}, {}
             
-            if semanas_filtro == "ultimas3":
-                semanas_filtradas = semanas[-3:]
-            elif semanas_filtro == "ultimas5":
-                semanas_filtradas = semanas[-5:]
-            elif semanas_filtro == "personalizado":
-                for periodo, semana, key in semanas_set:
-                    if request_args.get(f"semana_{periodo}_{semana}"):
-                        semanas_filtradas.append({
-                            "periodo": periodo,
-                            "semana": semana,
-                            "key": key
-                        })
-                        semanas_selecionadas_lista.append(key)
-                if not semanas_filtradas:
-                    semanas_filtradas = semanas
-            else:
+            musculo_stats, musculo_do_cache = _calcular_por_musculo.com_origem(user_id)
+            treino_stats, treino_do_cache = _calcular_por_treino.com_origem(user_id)
+        except Exception as e:
+            BaseService.handle_error(e, "Erro ao calcular estatísticas da página")
+            return {}, {}
+        
+        with cls._contadores_lock:
+            cls._contadores_pagina['cache' if musculo_do_cache and treino_do_cache else 'calculada'] += 1
+        return musculo_stats, treino_stats
+    
+    @classmethod
+    def get_contadores_pagina(cls):
+        """Quantas vezes a página de estatísticas veio do cache (neste processo)"""
+        with cls._contadores_lock:
+            contadores = dict(cls._contadores_pagina)
+        total = contadores['cache'] + contadores['calculada']
+        contadores['hit_ratio'] = contadores['cache'] / total if total else 0.0
+        return contadores
+    
+    @staticmethod
+    def preparar_semanas(contagem_semanas, semanas_filtro, request_args, ordenadas=False):
+        """
+        Ordena as semanas existentes e aplica o filtro da tabela
+        
+        Args:
+            contagem_semanas: {(periodo, semana): quantidade de registros}
+            semanas_filtro: "todas", "ultimas3", "ultimas5" ou "personalizado"
+            request_args: Parâmetros da requisição (semana_<periodo>_<semana>)
+            ordenadas: True se contagem_semanas já está em ordem cronológica
+                (ex.: RegistroService.contar_por_semana, ordenada no banco)
+        
+        Returns:
+            dict: semanas (filtradas), semanas_selecionadas_lista,
+                  periodos_disponiveis e janela ((periodo, semana) a carregar,
+                  ou None quando todas as semanas aparecem)
+        """
+        ordem = list(contagem_semanas)
+        if not ordenadas:
+            # Chave de ordenação calculada uma vez por período distinto
+            chaves_periodo = {periodo: chave_ordenacao_periodo(periodo)
+                              for periodo in {periodo for periodo, _ in ordem}}
+            ordem.sort(key=lambda ps: (chaves_periodo[ps[0]], ps[1]))
+        
+        semanas = [
+            {"periodo": periodo, "semana": semana, "key": f"{periodo}_{semana}"}
+            for periodo, semana in ordem
+        ]
+        
+        # Filtrar semanas conforme parâmetro (a lista já está ordenada)
+        semanas_selecionadas_lista = []
+        
+        if semanas_filtro == "ultimas3":
+            semanas_filtradas = semanas[-3:]
+        elif semanas_filtro == "ultimas5":
+            semanas_filtradas = semanas[-5:]
+        elif semanas_filtro == "personalizado":
+            semanas_filtradas = [s for s in semanas if request_args.get(f"semana_{s['key']}")]
+            semanas_selecionadas_lista = [s['key'] for s in semanas_filtradas]
+            if not semanas_filtradas:
                 semanas_filtradas = semanas
-            
-            semanas_filtradas.sort(key=lambda x: (ordem_periodos.index(x["periodo"]) if x["periodo"] in ordem_periodos else 999, x["semana"]))
-            
-            # Preparar períodos disponíveis para o modal
-            periodos_disponiveis = []
-            periodos_set = set(s[0] for s in semanas_set)
-            for periodo in periodos_set:
-                semanas_periodo = sorted([s[1] for s in semanas_set if s[0] == periodo])
-                registros_por_semana = {}
-                for semana in semanas_periodo:
-                    count = sum(1 for r in registros if r.periodo == periodo and r.semana == semana)
-                    registros_por_semana[semana] = count
-                
-                periodos_disponiveis.append({
-                    "periodo": periodo,
-                    "semanas": semanas_periodo,
-                    "registros_por_semana": registros_por_semana
-                })
-            
-            periodos_disponiveis.sort(key=lambda x: ordem_periodos.index(x["periodo"]) if x["periodo"] in ordem_periodos else 999)
-            
-            return {
-                'semanas': semanas_filtradas,
-                'registros_por_exercicio': registros_por_exercicio,
-                'semanas_selecionadas_lista': semanas_selecionadas_lista,
-                'periodos_disponiveis': periodos_disponiveis
+        else:
+            semanas_filtradas = semanas
+        
+        # Preparar períodos disponíveis para o modal (semanas já em ordem)
+        periodos = {}
+        for s in semanas:
+            periodo = periodos.setdefault(s["periodo"], {
+                "periodo": s["periodo"],
+                "semanas": [],
+                "registros_por_semana": {}
+            })
+            periodo["semanas"].append(s["semana"])
+            periodo["registros_por_semana"][s["semana"]] = contagem_semanas[(s["periodo"], s["semana"])]
+        
+        return {
+            'semanas': semanas_filtradas,
+            'semanas_selecionadas_lista': semanas_selecionadas_lista,
+            'periodos_disponiveis': list(periodos.values()),
+            'janela': None if len(semanas_filtradas) == len(semanas)
+                      else [(s["periodo"], s["semana"]) for s in semanas_filtradas]
+        }
+    
+    @staticmethod
+    def agrupar_registros_por_exercicio(exercicios, registros, series_por_registro=None):
+        """
+        Registros de cada exercício indexados por "<periodo>_<semana>"
+        
+        Args:
+            series_por_registro: {registro_id: [séries]} já carregado; se
+                omitido, as séries são lidas de cada registro
+        """
+        registros_por_exercicio = {ex.id: {} for ex in exercicios}
+        
+        for r in registros:
+            registros_exercicio = registros_por_exercicio.get(r.exercicio_id)
+            if registros_exercicio is None:
+                continue
+            series = series_por_registro.get(r.id, ()) if series_por_registro is not None else r.series
+            registros_exercicio[f"{r.periodo}_{r.semana}"] = {
+                'id': r.id,
+                'series': [{'carga': float(s.carga), 'repeticoes': s.repeticoes} for s in series],
+                'periodo': r.periodo,
+                'semana': r.semana,
+                'treino_id': r.treino_id,
+                'versao_id': r.versao_id,
+                'data_registro': r.data_registro.isoformat() if r.data_registro else None
             }
+        return registros_por_exercicio
+    
+    @staticmethod
+    def preparar_dados_tabela(exercicios, registros, semanas_filtro, request_args):
+        """
+        Prepara dados para a tabela de visualização a partir dos registros
+        
+        Contagens e agrupamentos são passadas lineares sobre os registros; as
+        chaves de ordenação são calculadas uma vez por período.
+        """
+        try:
+            contagem_semanas = Counter((r.periodo, r.semana) for r in registros)
+            dados = EstatisticaService.preparar_semanas(contagem_semanas, semanas_filtro, request_args)
+            del dados['janela']
+            dados['registros_por_exercicio'] = EstatisticaService.agrupar_registros_por_exercicio(
+                exercicios, registros
+            )
+            return dados
         except Exception as e:
             BaseService.handle_error(e, "Erro ao preparar dados da tabela")
             return {
@@ -204,4 +326,53 @@ class EstatisticaService(BaseService):
                 'registros_por_exercicio': {},
                 'semanas_selecionadas_lista': [],
                 'periodos_disponiveis': []
-            }
\ No newline at end of file
+            }
+    
+    @staticmethod
+    def montar_tabela(treino_id, musculo, ordenar, semanas_filtro, request_args,
+                      apos=None, limite=None, user_id=None):
+        """
+        Dados da tabela de progresso carregando só o necessário do banco
+        
+        As semanas vêm de uma contagem agrupada; os registros são buscados
+        apenas para a página de exercícios e para a janela de semanas
+        selecionada, com as séries em uma consulta à parte.
+        
+        Args:
+            apos: Chave da última linha da página anterior (paginação)
+            limite: Exercícios por página; None para todos
+        
+        Returns:
+            dict: dados de preparar_dados_tabela mais exercicios e
+                  proxima_chave (None quando não há mais páginas)
+        """
+        try:
+            dados = EstatisticaService.preparar_semanas(
+                RegistroService.contar_por_semana(user_id), semanas_filtro, request_args,
+                ordenadas=True
+            )
+            janela = dados.pop('janela')
+            
+            exercicios, proxima_chave = ExercicioService.get_pagina_tabela(
+                treino_id, musculo, ordenar, apos=apos, limite=limite, user_id=user_id
+            )
+            registros, series_por_registro = RegistroService.get_registros_janela(
+                [ex.id for ex in exercicios], janela, user_id
+            )
+            
+            dados['exercicios'] = exercicios
+            dados['proxima_chave'] = proxima_chave
+            dados['registros_por_exercicio'] = EstatisticaService.agrupar_registros_por_exercicio(
+                exercicios, registros, series_por_registro
+            )
+            return dados
+        except Exception as e:
+            BaseService.handle_error(e, "Erro ao montar tabela de progresso")
+            return {
+                'semanas': [],
+                'registros_por_exercicio': {},
+                'semanas_selecionadas_lista': [],
+                'periodos_disponiveis': [],
+                'exercicios': [],
+                'proxima_chave': None
+            }
@@ -1,12 +1,47 @@
 """Serviço para operações com exercícios"""
 
 from models import db, Exercicio, Musculo, HistoricoTreino, RegistroTreino
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, aliased
 from . import BaseService
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _ultimos_registros_janela(exercicio_ids, user_id, versao_id):
+    """Ids do registro mais recente de cada exercício (ROW_NUMBER por exercício)"""
+    posicao = db.func.row_number().over(
+        partition_by=RegistroTreino.exercicio_id,
+        order_by=(RegistroTreino.data_registro.desc(), RegistroTreino.id.desc())
+    ).label('posicao')
+    
+    ranking = db.select(RegistroTreino.id, posicao).where(
+        RegistroTreino.exercicio_id.in_(exercicio_ids),
+        RegistroTreino.user_id == user_id
+    )
+    if versao_id:
+        ranking = ranking.where(RegistroTreino.versao_id == versao_id)
+    ranking = ranking.subquery()
+    
+    return db.select(ranking.c.id).where(ranking.c.posicao == 1)
+
+def _ultimos_registros_correlacionados(exercicio_ids, user_id, versao_id):
+    """Ids do registro mais recente de cada exercício (subconsulta correlacionada)"""
+    anterior = aliased(RegistroTreino)
+    ultimo = db.select(anterior.id).where(
+        anterior.exercicio_id == RegistroTreino.exercicio_id,
+        anterior.user_id == user_id
+    )
+    if versao_id:
+        ultimo = ultimo.where(anterior.versao_id == versao_id)
+    ultimo = ultimo.order_by(anterior.data_registro.desc(), anterior.id.desc())\
+        .limit(1).correlate(RegistroTreino).scalar_subquery()
+    
+    return db.select(RegistroTreino.id).where(
+        RegistroTreino.exercicio_id.in_(exercicio_ids),
+        RegistroTreino.user_id == user_id,
+        RegistroTreino.id == ultimo
+    )
+
 class ExercicioService(BaseService):
     """Gerencia operações relacionadas a exercícios"""
     
@@ -57,6 +92,84 @@ class ExercicioService(BaseService):
             BaseService.handle_error(e, f"Erro ao buscar exercícios do treino {treino_id}")
             return []
     
+    @staticmethod
+    def get_pagina_tabela(treino_id=None, musculo=None, ordenar="exercicio", apos=None,
+                          limite=None, user_id=None):
+        """
+        Página de exercícios da tabela de progresso (paginação por cursor)
+        
+        A ordenação é (treino, nome, id) ou (músculo, nome, id); `apos` é a
+        chave da última linha da página anterior e a próxima página começa
+        estritamente depois dela.
+        
+        Returns:
+            tuple: (exercícios, chave da última linha ou None se não há mais)
+        """
+        try:
+            if ordenar == "musculo":
+                primeira = db.func.coalesce(Musculo.nome_exibicao, "")
+            else:
+                primeira = db.func.coalesce(Exercicio.treino_id, 0)
+            chave = (primeira, Exercicio.nome, Exercicio.id)
+            
+            # Filtro do usuário antes do join (filter_by usa a última entidade)
+            query = BaseService.filter_by_user(Exercicio.query, user_id)\
+                .outerjoin(Musculo, Exercicio.musculo_id == Musculo.id)\
+                .options(joinedload(Exercicio.musculo_ref), joinedload(Exercicio.treino_ref))
+            
+            if treino_id:
+                query = query.filter(Exercicio.treino_id == treino_id)
+            if musculo:
+                query = query.filter(Musculo.nome_exibicao == musculo)
+            if apos:
+                query = query.filter(db.tuple_(*chave) > db.tuple_(*apos))
+            
+            query = query.order_by(*chave)
+            if not limite:
+                return query.all(), None
+            
+            exercicios = query.limit(limite + 1).all()
+            if len(exercicios) <= limite:
+                return exercicios, None
+            
+            exercicios = exercicios[:limite]
+            ultimo = exercicios[-1]
+            if ordenar == "musculo":
+                inicio = ultimo.musculo_ref.nome_exibicao if ultimo.musculo_ref else ""
+            else:
+                inicio = ultimo.treino_id or 0
+            return exercicios, [inicio, ultimo.nome, ultimo.id]
+        except Exception as e:
+            BaseService.handle_error(e, "Erro ao buscar página de exercícios")
+            return [], None
+    
+    @staticmethod
+    def get_por_nomes(nomes, user_id=None):
+        """
+        Exercícios do usuário com os nomes dados, em uma única consulta (IN)
+        
+        Returns:
+            dict: {nome: Exercicio} (com musculo_ref carregado); com nomes
+                  repetidos, vale o de menor id
+        """
+        try:
+            user_id = user_id or BaseService.get_current_user_id()
+            nomes = set(nomes)
+            if not user_id or not nomes:
+                return {}
+            
+            exercicios = Exercicio.query.options(joinedload(Exercicio.musculo_ref))\
+                .filter(Exercicio.user_id == user_id, Exercicio.nome.in_(nomes))\
+                .order_by(Exercicio.id).all()
+            
+            resultado = {}
+            for ex in exercicios:
+                resultado.setdefault(ex.nome, ex)
+            return resultado
+        except Exception as e:
+            BaseService.handle_error(e, "Erro ao buscar exercícios por nome")
+            return {}
+    
     @staticmethod
     def get_musculo_id(nome_musculo):
         """Retorna ID do músculo pelo nome"""
@@ -155,6 +268,46 @@ class ExercicioService(BaseService):
             logger.error(f"Erro ao buscar última carga do exercício {exercicio_id}: {e}")
             return None
     
+    @staticmethod
+    def get_ultimas_series_por_exercicio(exercicio_ids, versao_id=None, user_id=None):
+        """
+        Séries da sessão mais recente de cada exercício, em uma única consulta
+        
+        Usa ROW_NUMBER() por exercício; no SQLite, a forma com subconsulta
+        correlacionada (que aproveita idx_registro_exercicio).
+        
+        Returns:
+            dict: {exercicio_id: [{'carga', 'repeticoes'}, ...] na ordem das séries}
+        """
+        try:
+            user_id = user_id or BaseService.get_current_user_id()
+            exercicio_ids = list(exercicio_ids)
+            if not user_id or not exercicio_ids:
+                return {}
+            
+            if db.engine.dialect.name == 'sqlite':
+                ultimos = _ultimos_registros_correlacionados(exercicio_ids, user_id, versao_id)
+            else:
+                ultimos = _ultimos_registros_janela(exercicio_ids, user_id, versao_id)
+            
+            series = db.session.query(
+                RegistroTreino.exercicio_id, HistoricoTreino.carga, HistoricoTreino.repeticoes,
+                HistoricoTreino.quantidade
+            ).join(HistoricoTreino, HistoricoTreino.registro_id == RegistroTreino.id)\
+             .filter(RegistroTreino.id.in_(ultimos))\
+             .order_by(RegistroTreino.exercicio_id, HistoricoTreino.ordem).all()
+            
+            resultado = {}
+            for exercicio_id, carga, repeticoes, quantidade in series:
+                # Linhas compactas valem por `quantidade` séries iguais
+                resultado.setdefault(exercicio_id, []).extend(
+                    {'carga': float(carga), 'repeticoes': repeticoes} for _ in range(quantidade or 1)
+                )
+            return resultado
+        except Exception as e:
+            logger.error(f"Erro ao buscar últimas séries dos exercícios: {e}")
+            return {}
+    
     @staticmethod
     def get_ultimas_series(exercicio_id, versao_id=None, limite=1, user_id=None):
         """Retorna as últimas séries de um exercício"""
@@ -172,13 +325,14 @@ class ExercicioService(BaseService):
                 .limit(limite).all()
             
             resultado = []
-            for serie in series:
-                resultado.append({
-                    'carga': float(serie.carga),
-                    'repeticoes': serie.repeticoes
-                })
+            for linha in series:
+                for serie in linha.expandir():
+                    resultado.append({
+                        'carga': float(serie.carga),
+                        'repeticoes': serie.repeticoes
+                    })
             
-            return resultado
+            return resultado[:limite]
         except Exception as e:
             logger.error(f"Erro ao buscar últimas séries: {e}")
             return []
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Serviço dos contadores da página inicial"""
+
+from collections import namedtuple
+from models import db, RegistroTreino
+from . import BaseService, cached, tag_usuario
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Invalidado por tag a cada alteração dos dados do usuário (cache_invalidacao)
+TTL_PAINEL = 6 * 60 * 60
+
+ResumoPainel = namedtuple('ResumoPainel', 'total_registros semanas_treinadas ultimo_periodo ultima_semana')
+
+_VAZIO = ResumoPainel(0, 0, None, None)
+
+def _tags_do_usuario(user_id):
+    return (tag_usuario(user_id),)
+
+@cached(ttl_seconds=TTL_PAINEL, key_prefix='painel:resumo', tags=_tags_do_usuario)
+def _calcular_resumo(user_id):
+    # Sessão do registro mais recente (idx_registro_user_data), juntada à contagem
+    ultimo = db.session.query(RegistroTreino.periodo, RegistroTreino.semana)\
+        .filter(RegistroTreino.user_id == user_id)\
+        .order_by(RegistroTreino.data_registro.desc(), RegistroTreino.id.desc())\
+        .limit(1).subquery()
+
+    sessao = RegistroTreino.periodo + '|' + db.cast(RegistroTreino.semana, db.String)
+    resultado = db.session.query(
+        db.func.count(RegistroTreino.id),
+        db.func.count(db.distinct(sessao)),
+        ultimo.c.periodo,
+        ultimo.c.semana
+    ).outerjoin(ultimo, db.true())\
+     .filter(RegistroTreino.user_id == user_id)\
+     .group_by(ultimo.c.periodo, ultimo.c.semana)\
+     .first()
+
+    if resultado is None:
+        return _VAZIO
+    return ResumoPainel(*resultado)
+
+class PainelService(BaseService):
+    """Contadores da página inicial, sem carregar os registros"""
+
+    @staticmethod
+    def get_resumo(user_id=None):
+        """
+        Total de registros, semanas treinadas e sessão do registro mais recente
+
+        Uma consulta (COUNT, COUNT DISTINCT e o registro de maior data),
+        memoizada por usuário: o custo não cresce com o histórico.
+
+        Returns:
+            ResumoPainel (zerado sem usuário ou em caso de erro)
+        """
+        try:
+            user_id = user_id or BaseService.get_current_user_id()
+            if not user_id:
+                return _VAZIO
+            return _calcular_resumo(user_id)
+        except Exception as e:
+            BaseService.handle_error(e, "Erro ao calcular resumo do painel")
+            return _VAZIO
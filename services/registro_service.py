@@ -1,13 +1,27 @@
 """Serviço para operações com registros de treino"""
 
-from models import db, RegistroTreino, HistoricoTreino
-from sqlalchemy.orm import joinedload
+from collections import namedtuple
 from datetime import datetime
+from decimal import Decimal
+from models import db, RegistroTreino, HistoricoTreino
+from sqlalchemy.orm import selectinload
+from repositories.registro_repository import RegistroRepository, linhas_de_series
 from . import BaseService
+from .cache_invalidacao import marcar_usuario_alterado
+from .resumo_service import ResumoService
 import logging
 
 logger = logging.getLogger(__name__)
 
+_UM_DECIMAL = Decimal('0.1')
+
+class AlteracoesSessao(namedtuple('AlteracoesSessao', 'inseridas atualizadas removidas')):
+    """Linhas (registros + séries) tocadas ao sincronizar uma sessão"""
+    
+    @property
+    def total(self):
+        return self.inseridas + self.atualizadas + self.removidas
+
 class RegistroService(BaseService):
     """Gerencia operações relacionadas a registros de treino"""
     
@@ -22,7 +36,7 @@ class RegistroService(BaseService):
             query = RegistroTreino.query.filter_by(user_id=user_id)
             
             if load_series:
-                query = query.options(joinedload(RegistroTreino.series))
+                query = query.options(selectinload(RegistroTreino.series_gravadas))
             
             if filtros:
                 if 'treino_id' in filtros and filtros['treino_id']:
@@ -41,6 +55,74 @@ class RegistroService(BaseService):
             BaseService.handle_error(e, "Erro ao buscar registros")
             return []
     
+    @staticmethod
+    def contar_por_semana(user_id=None):
+        """
+        Quantidade de registros por semana, agregada e ordenada no banco
+        
+        Returns:
+            dict: {(periodo, semana): quantidade}, em ordem cronológica
+        """
+        try:
+            user_id = user_id or BaseService.get_current_user_id()
+            if not user_id:
+                return {}
+            
+            # Ordena pelo agregado: linhas da mesma semana ainda sem data_sessao
+            # (gravadas antes da migração 001) não viram um segundo grupo
+            sessao = db.func.min(RegistroTreino.data_sessao)
+            resultado = db.session.query(
+                RegistroTreino.periodo, RegistroTreino.semana, db.func.count(RegistroTreino.id)
+            ).filter(RegistroTreino.user_id == user_id)\
+             .group_by(RegistroTreino.periodo, RegistroTreino.semana)\
+             .order_by(sessao.is_(None), sessao, RegistroTreino.periodo, RegistroTreino.semana).all()
+            
+            return {(periodo, semana): total for periodo, semana, total in resultado}
+        except Exception as e:
+            BaseService.handle_error(e, "Erro ao contar registros por semana")
+            return {}
+    
+    @staticmethod
+    def get_registros_janela(exercicio_ids, semanas=None, user_id=None):
+        """
+        Registros de alguns exercícios restritos a uma janela de semanas
+        
+        Args:
+            exercicio_ids: Exercícios desejados
+            semanas: Lista de (periodo, semana); None para todas
+        
+        Returns:
+            tuple: (registros, {registro_id: [séries em ordem]})
+        """
+        try:
+            user_id = user_id or BaseService.get_current_user_id()
+            if not user_id or not exercicio_ids or semanas == []:
+                return [], {}
+            
+            query = RegistroTreino.query.filter(
+                RegistroTreino.user_id == user_id,
+                RegistroTreino.exercicio_id.in_(exercicio_ids)
+            )
+            if semanas is not None:
+                query = query.filter(
+                    db.tuple_(RegistroTreino.periodo, RegistroTreino.semana).in_(semanas)
+                )
+            registros = query.order_by(RegistroTreino.data_registro.desc()).all()
+            
+            # Séries em uma única consulta, já expandidas da forma compacta
+            series_por_registro = {}
+            if registros:
+                series = HistoricoTreino.query.filter(
+                    HistoricoTreino.registro_id.in_([r.id for r in registros])
+                ).order_by(HistoricoTreino.registro_id, HistoricoTreino.ordem)
+                for s in series:
+                    series_por_registro.setdefault(s.registro_id, []).extend(s.expandir())
+            
+            return registros, series_por_registro
+        except Exception as e:
+            BaseService.handle_error(e, "Erro ao buscar registros da janela")
+            return [], {}
+    
     @staticmethod
     def salvar_registros(treino_id, versao_id, periodo, semana, dados_exercicios, user_id=None):
         """Salva múltiplos registros de uma sessão de treino"""
@@ -51,40 +133,36 @@ class RegistroService(BaseService):
                 logger.warning("Tentativa de salvar registros sem usuário logado")
                 return False
             
-            # Remover registros antigos da mesma sessão
-            RegistroTreino.query.filter_by(
+            # Agregados da sessão que será substituída (para o resumo semanal)
+            removidos = ResumoService.agregar_sessao(treino_id, versao_id, periodo, semana, user_id)
+            
+            # Remover registros antigos da mesma sessão (e suas séries, pois a
+            # remoção em massa não aplica o cascade do ORM)
+            registros_antigos = RegistroTreino.query.filter_by(
                 treino_id=treino_id,
                 periodo=periodo,
                 semana=semana,
                 versao_id=versao_id,
                 user_id=user_id
-            ).delete()
-            
-            # Criar novos registros
-            for ex_id, dados in dados_exercicios.items():
-                if dados['carga'] and dados['repeticoes']:
-                    registro = RegistroTreino(
-                        treino_id=treino_id,
-                        versao_id=versao_id,
-                        periodo=periodo,
-                        semana=semana,
-                        exercicio_id=ex_id,
-                        data_registro=dados.get('data_registro', datetime.now()),
-                        user_id=user_id
-                    )
-                    db.session.add(registro)
-                    db.session.flush()
-                    
-                    # Criar séries
-                    for i in range(dados['num_series']):
-                        serie = HistoricoTreino(
-                            registro_id=registro.id,
-                            carga=dados['carga'],
-                            repeticoes=dados['repeticoes'],
-                            ordem=i+1
-                        )
-                        db.session.add(serie)
+            )
+            HistoricoTreino.query.filter(
+                HistoricoTreino.registro_id.in_(registros_antigos.with_entities(RegistroTreino.id))
+            ).delete(synchronize_session=False)
+            registros_antigos.delete(synchronize_session=False)
+            
+            # Criar novos registros e séries em lote (sem um flush por exercício)
+            RegistroRepository.inserir_em_lote(
+                treino_id, versao_id, periodo, semana, dados_exercicios, user_id
+            )
             
+            ResumoService.aplicar_delta(
+                user_id, treino_id, periodo, semana,
+                removidos, ResumoService.agregar_dados(dados_exercicios)
+            )
+            
+            # A remoção em massa não passa pelo flush: marca o usuário para
+            # que o cache dele seja invalidado (em todos os workers) no commit
+            marcar_usuario_alterado(user_id)
             db.session.commit()
             logger.info(f"Registros salvos para treino {treino_id}, semana {semana}")
             return True
@@ -92,6 +170,129 @@ class RegistroService(BaseService):
             BaseService.handle_error(e, "Erro ao salvar registros")
             return False
     
+    @staticmethod
+    def sincronizar_registros(treino_id, versao_id, periodo, semana, dados_exercicios, user_id=None):
+        """
+        Grava uma sessão alterando apenas o que mudou em relação à já salva
+        
+        Compara os dados enviados com os registros e séries gravados da mesma
+        sessão: insere exercícios novos, remove os que saíram e, nos demais,
+        atualiza/insere/remove só as linhas de série diferentes (na forma
+        definida por SERIES_COMPACTAS). Exercícios sem alteração não são
+        tocados (nem seus ids, nem os índices).
+        
+        Returns:
+            AlteracoesSessao com as linhas tocadas, ou None em caso de erro
+        """
+        try:
+            if user_id is None:
+                user_id = BaseService.get_current_user_id()
+            if not user_id:
+                logger.warning("Tentativa de salvar registros sem usuário logado")
+                return None
+            
+            registros = RegistroTreino.query.filter_by(
+                treino_id=treino_id,
+                periodo=periodo,
+                semana=semana,
+                versao_id=versao_id,
+                user_id=user_id
+            ).order_by(RegistroTreino.id).all()
+            
+            series_por_registro = {}
+            if registros:
+                for serie in HistoricoTreino.query.filter(
+                    HistoricoTreino.registro_id.in_([r.id for r in registros])
+                ).order_by(HistoricoTreino.registro_id, HistoricoTreino.ordem):
+                    series_por_registro.setdefault(serie.registro_id, []).append(serie)
+            
+            # Agregados da sessão gravada, antes de qualquer alteração (autoflush)
+            removidos = ResumoService.agregar_sessao(treino_id, versao_id, periodo, semana, user_id)
+            
+            # Um registro por exercício; duplicados antigos são removidos
+            gravados = {}
+            duplicados = []
+            for registro in registros:
+                if registro.exercicio_id in gravados:
+                    duplicados.append(registro)
+                else:
+                    gravados[registro.exercicio_id] = registro
+            
+            enviados = {
+                int(ex_id): dados for ex_id, dados in dados_exercicios.items()
+                if dados['carga'] and dados['repeticoes']
+            }
+            
+            inseridas = atualizadas = removidas = 0
+            alterados = set()
+            novos = {}
+            
+            for registro in duplicados + [r for ex_id, r in gravados.items() if ex_id not in enviados]:
+                alterados.add(registro.exercicio_id)
+                removidas += 1 + len(series_por_registro.get(registro.id, ()))
+                for serie in series_por_registro.get(registro.id, ()):
+                    db.session.delete(serie)
+                db.session.delete(registro)
+            
+            for ex_id, dados in enviados.items():
+                registro = gravados.get(ex_id)
+                desejadas = linhas_de_series(
+                    Decimal(str(dados['carga'])).quantize(_UM_DECIMAL),
+                    int(dados['repeticoes']), dados['num_series']
+                )
+                if registro is None:
+                    novos[ex_id] = dados
+                    inseridas += 1 + len(desejadas)
+                    continue
+                
+                antigas = series_por_registro.get(registro.id, [])
+                mudou = False
+                
+                for i in range(max(len(antigas), len(desejadas))):
+                    serie = antigas[i] if i < len(antigas) else None
+                    if i >= len(desejadas):
+                        db.session.delete(serie)
+                        removidas += 1
+                    elif serie is None:
+                        db.session.add(HistoricoTreino(registro_id=registro.id, **desejadas[i]))
+                        inseridas += 1
+                    elif any(getattr(serie, campo) != valor for campo, valor in desejadas[i].items()):
+                        for campo, valor in desejadas[i].items():
+                            setattr(serie, campo, valor)
+                        atualizadas += 1
+                    else:
+                        continue
+                    mudou = True
+                
+                if mudou:
+                    alterados.add(ex_id)
+                    registro.data_registro = dados.get('data_registro', datetime.now())
+                    atualizadas += 1
+            
+            alterados.update(novos)
+            if not alterados:
+                return AlteracoesSessao(0, 0, 0)
+            
+            RegistroRepository.inserir_em_lote(treino_id, versao_id, periodo, semana, novos, user_id)
+            
+            # Resumo semanal: troca apenas os agregados dos exercícios alterados
+            adicionados = ResumoService.agregar_dados(enviados)
+            ResumoService.aplicar_delta(
+                user_id, treino_id, periodo, semana,
+                {ex_id: a for ex_id, a in removidos.items() if ex_id in alterados},
+                {ex_id: a for ex_id, a in adicionados.items() if ex_id in alterados}
+            )
+            
+            marcar_usuario_alterado(user_id)
+            db.session.commit()
+            alteracoes = AlteracoesSessao(inseridas, atualizadas, removidas)
+            logger.info(f"Sessão do treino {treino_id}, semana {semana} sincronizada: "
+                        f"{alteracoes.total} linhas alteradas")
+            return alteracoes
+        except Exception as e:
+            BaseService.handle_error(e, "Erro ao sincronizar registros")
+            return None
+    
     @staticmethod
     def get_periodos_existentes(user_id=None):
         """Retorna lista de períodos com registros"""
@@ -0,0 +1,276 @@
+"""
+Serviço do resumo semanal (rollup) de treinos
+
+A tabela resumo_semanal guarda, por (usuário, treino, exercício, período,
+semana), volume, número de séries, carga máxima e a soma das cargas (para a
+carga média). RegistroService.salvar_registros a mantém incrementalmente:
+subtrai os agregados da sessão substituída e soma os da nova.
+
+Reconstrução a partir do histórico (backfill):
+    python -m services.resumo_service [user_id]
+"""
+
+from collections import namedtuple
+from decimal import Decimal
+from models import db, RegistroTreino, HistoricoTreino, ResumoSemanal
+from utils.date_utils import calcular_data_sessao
+from . import BaseService
+import logging
+
+logger = logging.getLogger(__name__)
+
+AgregadoSessao = namedtuple(
+    'AgregadoSessao',
+    'qtd_registros total_series volume_total soma_cargas soma_repeticoes carga_maxima'
+)
+
+_VAZIO = AgregadoSessao(0, 0, Decimal(0), Decimal(0), 0, None)
+
+_UM_DECIMAL = Decimal('0.1')
+
+def _colunas_agregadas():
+    """
+    Agregados de registros/séries na ordem de AgregadoSessao
+    Cada linha de histórico vale por `quantidade` séries (forma compacta)
+    """
+    quantidade = HistoricoTreino.quantidade
+    return (
+        db.func.count(db.distinct(RegistroTreino.id)),
+        db.func.coalesce(db.func.sum(quantidade), 0),
+        db.func.coalesce(db.func.sum(HistoricoTreino.carga * HistoricoTreino.repeticoes * quantidade), 0),
+        db.func.coalesce(db.func.sum(HistoricoTreino.carga * quantidade), 0),
+        db.func.coalesce(db.func.sum(HistoricoTreino.repeticoes * quantidade), 0),
+        db.func.max(HistoricoTreino.carga),
+    )
+
+class ResumoService(BaseService):
+    """Mantém e reconstrói o resumo semanal por exercício"""
+    
+    @staticmethod
+    def agregar_sessao(treino_id, versao_id, periodo, semana, user_id):
+        """
+        Agregados por exercício dos registros já gravados de uma sessão
+        
+        Returns:
+            dict: {exercicio_id: AgregadoSessao}
+        """
+        resultado = db.session.query(RegistroTreino.exercicio_id, *_colunas_agregadas())\
+            .outerjoin(HistoricoTreino, HistoricoTreino.registro_id == RegistroTreino.id)\
+            .filter(
+                RegistroTreino.user_id == user_id,
+                RegistroTreino.treino_id == treino_id,
+                RegistroTreino.versao_id == versao_id,
+                RegistroTreino.periodo == periodo,
+                RegistroTreino.semana == semana
+            ).group_by(RegistroTreino.exercicio_id).all()
+        
+        return {
+            r[0]: AgregadoSessao(r[1], int(r[2]), Decimal(r[3]), Decimal(r[4]), int(r[5]),
+                                 Decimal(r[6]) if r[6] is not None else None)
+            for r in resultado
+        }
+    
+    @staticmethod
+    def agregar_dados(dados_exercicios):
+        """
+        Agregados por exercício dos dados de uma sessão a ser gravada
+        (mesmas regras de RegistroService.salvar_registros)
+        
+        Returns:
+            dict: {exercicio_id: AgregadoSessao}
+        """
+        agregados = {}
+        for ex_id, dados in dados_exercicios.items():
+            if not (dados['carga'] and dados['repeticoes']):
+                continue
+            carga = Decimal(str(dados['carga'])).quantize(_UM_DECIMAL)
+            repeticoes = int(dados['repeticoes'])
+            num_series = dados['num_series']
+            agregados[int(ex_id)] = AgregadoSessao(
+                qtd_registros=1,
+                total_series=num_series,
+                volume_total=carga * repeticoes * num_series,
+                soma_cargas=carga * num_series,
+                soma_repeticoes=repeticoes * num_series,
+                carga_maxima=carga if num_series else None
+            )
+        return agregados
+    
+    @staticmethod
+    def aplicar_delta(user_id, treino_id, periodo, semana, removidos, adicionados):
+        """
+        Atualiza o resumo: subtrai a sessão substituída e soma a nova
+        
+        Não faz commit: roda dentro da transação de quem grava os registros.
+        A carga máxima só é recalculada no histórico quando a sessão removida
+        continha o máximo atual.
+        """
+        exercicio_ids = set(removidos) | set(adicionados)
+        if not exercicio_ids:
+            return
+        
+        treino_id = int(treino_id)
+        linhas = {
+            r.exercicio_id: r for r in ResumoSemanal.query.filter(
+                ResumoSemanal.user_id == user_id,
+                ResumoSemanal.treino_id == treino_id,
+                ResumoSemanal.periodo == periodo,
+                ResumoSemanal.semana == semana,
+                ResumoSemanal.exercicio_id.in_(exercicio_ids)
+            )
+        }
+        
+        recalcular_maximo = []
+        for ex_id in exercicio_ids:
+            rem = removidos.get(ex_id, _VAZIO)
+            add = adicionados.get(ex_id, _VAZIO)
+            
+            linha = linhas.get(ex_id)
+            nova = linha is None
+            if nova:
+                linha = ResumoSemanal(
+                    user_id=user_id, treino_id=treino_id, exercicio_id=ex_id,
+                    periodo=periodo, semana=semana, data_sessao=calcular_data_sessao(periodo, semana),
+                    qtd_registros=0, total_series=0,
+                    volume_total=0, soma_cargas=0, soma_repeticoes=0, carga_maxima=None
+                )
+                db.session.add(linha)
+            
+            linha.qtd_registros += add.qtd_registros - rem.qtd_registros
+            linha.total_series += add.total_series - rem.total_series
+            linha.volume_total = Decimal(linha.volume_total) + add.volume_total - rem.volume_total
+            linha.soma_cargas = Decimal(linha.soma_cargas) + add.soma_cargas - rem.soma_cargas
+            linha.soma_repeticoes += add.soma_repeticoes - rem.soma_repeticoes
+            
+            if linha.qtd_registros <= 0:
+                if nova:
+                    db.session.expunge(linha)
+                else:
+                    db.session.delete(linha)
+                continue
+            
+            if (rem.carga_maxima is not None and linha.carga_maxima is not None
+                    and rem.carga_maxima >= linha.carga_maxima):
+                recalcular_maximo.append(linha)
+            elif add.carga_maxima is not None and (
+                    linha.carga_maxima is None or add.carga_maxima > linha.carga_maxima):
+                linha.carga_maxima = add.carga_maxima
+        
+        if recalcular_maximo:
+            db.session.flush()
+            for linha in recalcular_maximo:
+                linha.carga_maxima = db.session.query(db.func.max(HistoricoTreino.carga))\
+                    .join(RegistroTreino, RegistroTreino.id == HistoricoTreino.registro_id)\
+                    .filter(
+                        RegistroTreino.user_id == user_id,
+                        RegistroTreino.treino_id == treino_id,
+                        RegistroTreino.exercicio_id == linha.exercicio_id,
+                        RegistroTreino.periodo == periodo,
+                        RegistroTreino.semana == semana
+                    ).scalar()
+    
+    @staticmethod
+    def get_evolucao(exercicio_id, user_id=None):
+        """
+        Evolução semanal de um exercício, da semana mais recente à mais antiga
+        
+        Returns:
+            list: dicts com sessao, num_series, volume_total, media_carga,
+                  media_reps e carga_maxima
+        """
+        try:
+            user_id = user_id or BaseService.get_current_user_id()
+            if not user_id:
+                return []
+            
+            total_series = db.func.sum(ResumoSemanal.total_series)
+            sessao = db.func.min(ResumoSemanal.data_sessao)
+            resultado = db.session.query(
+                ResumoSemanal.periodo,
+                ResumoSemanal.semana,
+                total_series.label('num_series'),
+                db.func.sum(ResumoSemanal.volume_total).label('volume_total'),
+                db.func.sum(ResumoSemanal.soma_cargas).label('soma_cargas'),
+                db.func.sum(ResumoSemanal.soma_repeticoes).label('soma_repeticoes'),
+                db.func.max(ResumoSemanal.carga_maxima).label('carga_maxima')
+            ).filter(
+                ResumoSemanal.user_id == user_id,
+                ResumoSemanal.exercicio_id == exercicio_id
+            ).group_by(
+                ResumoSemanal.periodo, ResumoSemanal.semana
+            ).order_by(
+                sessao.is_(None), sessao.desc(),
+                ResumoSemanal.periodo.desc(), ResumoSemanal.semana.desc()
+            ).all()
+            
+            evolucao = []
+            for r in resultado:
+                num_series = int(r.num_series or 0)
+                evolucao.append({
+                    "sessao": f"{r.periodo} - S{r.semana}",
+                    "num_series": num_series,
+                    "volume_total": float(r.volume_total or 0),
+                    "media_carga": round(float(r.soma_cargas) / num_series, 1) if num_series else 0,
+                    "media_reps": round(float(r.soma_repeticoes) / num_series, 1) if num_series else 0,
+                    "carga_maxima": float(r.carga_maxima) if r.carga_maxima is not None else None
+                })
+            return evolucao
+        except Exception as e:
+            BaseService.handle_error(e, f"Erro ao buscar evolução do exercício {exercicio_id}")
+            return []
+    
+    @staticmethod
+    def reconstruir(user_id=None):
+        """
+        Recalcula o resumo a partir do histórico (todos os usuários ou um)
+        
+        Returns:
+            int: Número de linhas gravadas, ou None em caso de erro
+        """
+        try:
+            apagar = ResumoSemanal.query
+            origem = db.session.query(
+                RegistroTreino.user_id,
+                RegistroTreino.treino_id,
+                RegistroTreino.exercicio_id,
+                RegistroTreino.periodo,
+                RegistroTreino.semana,
+                db.func.min(RegistroTreino.data_sessao),
+                *_colunas_agregadas()
+            ).outerjoin(HistoricoTreino, HistoricoTreino.registro_id == RegistroTreino.id)
+            
+            if user_id:
+                apagar = apagar.filter(ResumoSemanal.user_id == user_id)
+                origem = origem.filter(RegistroTreino.user_id == user_id)
+            
+            # Uma linha por chave única do resumo, mesmo com data_sessao nula em parte dela
+            origem = origem.group_by(
+                RegistroTreino.user_id, RegistroTreino.treino_id, RegistroTreino.exercicio_id,
+                RegistroTreino.periodo, RegistroTreino.semana
+            )
+            
+            apagar.delete(synchronize_session=False)
+            resultado = db.session.execute(
+                db.insert(ResumoSemanal).from_select(
+                    ['user_id', 'treino_id', 'exercicio_id', 'periodo', 'semana', 'data_sessao',
+                     'qtd_registros', 'total_series', 'volume_total', 'soma_cargas',
+                     'soma_repeticoes', 'carga_maxima'],
+                    origem
+                )
+            )
+            db.session.commit()
+            logger.info(f"Resumo semanal reconstruído: {resultado.rowcount} linhas")
+            return resultado.rowcount
+        except Exception as e:
+            BaseService.handle_error(e, "Erro ao reconstruir resumo semanal")
+            return None
+
+if __name__ == "__main__":
+    import sys
+    from app import app
+    
+    with app.app_context():
+        total = ResumoService.reconstruir(int(sys.argv[1]) if len(sys.argv) > 1 else None)
+    if total is None:
+        sys.exit("Falha ao reconstruir o resumo semanal (veja logs/fitlog.log)")
+    print(f"{total} linhas gravadas em resumo_semanal")
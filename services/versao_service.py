@@ -6,9 +6,9 @@ from sqlalchemy.orm import joinedload
 from . import BaseService
 from .treino_service import TreinoService
 from .exercicio_service import ExercicioService
-from utils.date_utils import converter_periodo_para_data
+from utils.periodo import periodo_para_data
 import logging
-from datetime import datetime
+from datetime import datetime, date
 
 logger = logging.getLogger(__name__)
 
@@ -59,7 +59,7 @@ class VersaoService(BaseService):
                 return None
             
             if periodo:
-                data_periodo = converter_periodo_para_data(periodo)
+                data_periodo = periodo_para_data(periodo) or date.today()
                 return VersaoGlobal.query.filter(
                     VersaoGlobal.user_id == user_id,
                     VersaoGlobal.data_inicio <= data_periodo,
@@ -413,29 +413,58 @@ class VersaoService(BaseService):
     @staticmethod
     def get_treinos(versao_id, user_id=None):
         """Retorna treinos de uma versão (formato para template) com ordenação"""
+        return VersaoService.get_treinos_por_versao([versao_id], user_id).get(versao_id, {})
+    
+    @staticmethod
+    def get_treinos_por_versao(versao_ids=None, user_id=None):
+        """
+        Treinos de várias versões (formato de get_treinos) em duas consultas
+        
+        Uma para os treinos das versões (com o código do treino) e outra para
+        os ids dos exercícios, em vez de uma por versão e por treino.
+        
+        Args:
+            versao_ids: Versões a carregar (padrão: todas as do usuário)
+        
+        Returns:
+            dict: {versao_id: {codigo: {id, codigo, nome, descricao, exercicios, ordem}}}
+        """
         try:
-            versao = VersaoService.get_by_id(versao_id, user_id, load_relations=True)
-            if not versao:
+            user_id = user_id or BaseService.get_current_user_id()
+            if not user_id or versao_ids == []:
                 return {}
             
-            resultado = {}
-            for tv in versao.treinos:
-                treino = TreinoService.get_by_id(tv.treino_id, user_id)
-                if treino:
-                    resultado[treino.codigo] = {
-                        "id": tv.treino_id,
-                        "codigo": treino.codigo,
-                        "nome": tv.nome_treino,
-                        "descricao": tv.descricao_treino,
-                        "exercicios": [ve.exercicio_id for ve in tv.exercicios],
-                        "ordem": tv.ordem if hasattr(tv, 'ordem') else 0
-                    }
-            
-            # Ordenar por ordem
-            resultado = dict(sorted(resultado.items(), key=lambda item: item[1].get('ordem', 0)))
+            query = db.session.query(TreinoVersao, Treino.codigo)\
+                .join(VersaoGlobal, VersaoGlobal.id == TreinoVersao.versao_id)\
+                .join(Treino, Treino.id == TreinoVersao.treino_id)\
+                .filter(VersaoGlobal.user_id == user_id, Treino.user_id == user_id)
+            if versao_ids is not None:
+                query = query.filter(TreinoVersao.versao_id.in_(versao_ids))
+            treinos_versao = query.order_by(TreinoVersao.versao_id, TreinoVersao.ordem, TreinoVersao.id).all()
+            
+            exercicios = {}
+            if treinos_versao:
+                for treino_versao_id, exercicio_id in db.session.query(
+                    VersaoExercicio.treino_versao_id, VersaoExercicio.exercicio_id
+                ).filter(
+                    VersaoExercicio.treino_versao_id.in_([tv.id for tv, _ in treinos_versao])
+                ).order_by(VersaoExercicio.treino_versao_id, VersaoExercicio.ordem, VersaoExercicio.id):
+                    exercicios.setdefault(treino_versao_id, []).append(exercicio_id)
+            
+            # Já ordenados por ordem dentro de cada versão
+            resultado = {versao_id: {} for versao_id in (versao_ids or ())}
+            for tv, codigo in treinos_versao:
+                resultado.setdefault(tv.versao_id, {})[codigo] = {
+                    "id": tv.treino_id,
+                    "codigo": codigo,
+                    "nome": tv.nome_treino,
+                    "descricao": tv.descricao_treino,
+                    "exercicios": exercicios.get(tv.id, []),
+                    "ordem": tv.ordem or 0
+                }
             return resultado
         except Exception as e:
-            BaseService.handle_error(e, f"Erro ao buscar treinos da versão {versao_id}")
+            BaseService.handle_error(e, "Erro ao carregar treinos das versões")
             return {}
 
     
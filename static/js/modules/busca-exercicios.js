@@ -40,7 +40,7 @@ const BuscaExercicios = (function() {
             if (resultsDiv) resultsDiv.style.display = 'block';
             
             buscaTimeout = setTimeout(() => {
-                fetch(`/api/buscar-exercicios?termo=${encodeURIComponent(termo)}`)
+                fetch(`/api/catalogo/typeahead?q=${encodeURIComponent(termo)}&limite=200`)
                     .then(response => {
                         if (!response.ok) throw new Error('Erro na requisição');
                         return response.json();
@@ -1,7 +1,11 @@
 import pytest
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date
 from app import create_app
 from models import db as _db
 from config import Config
+from sqlalchemy import event
 
 class TestConfig(Config):
     TESTING = True
@@ -41,4 +45,62 @@ def auth_client(client):
             'password': '123456'
         })
     
-    return client
\ No newline at end of file
+    return client
+
+
+TreinoDeTeste = namedtuple('TreinoDeTeste', 'user treino versao exercicios')
+
+@pytest.fixture
+def treino_de_teste(db):
+    """
+    Fábrica de um usuário com o treino A, a versão V1 e exercícios de peito
+    
+    `exercicios` é a quantidade (nomes "Exercício i") ou a lista de nomes.
+    """
+    from models import User, Treino, Musculo, Exercicio, VersaoGlobal
+    
+    def criar(exercicios=1, username='treino'):
+        user = User(username=username, email=f'{username}@teste.com')
+        user.set_password('123456')
+        musculo = Musculo.query.filter_by(nome='peito').first() or Musculo(nome='peito', nome_exibicao='Peito')
+        db.session.add_all([user, musculo])
+        db.session.commit()
+        
+        treino = Treino(codigo='A', nome='Treino A', descricao='Teste', user_id=user.id)
+        versao = VersaoGlobal(numero_versao=1, descricao='V1', data_inicio=date(2024, 1, 1), user_id=user.id)
+        db.session.add_all([treino, versao])
+        db.session.commit()
+        
+        nomes = [f'Exercício {i}' for i in range(exercicios)] if isinstance(exercicios, int) else exercicios
+        lista = [Exercicio(nome=nome, musculo_id=musculo.id, treino_id=treino.id, user_id=user.id)
+                 for nome in nomes]
+        db.session.add_all(lista)
+        db.session.commit()
+        return TreinoDeTeste(user, treino, versao, lista)
+    
+    return criar
+
+
+@pytest.fixture
+def contar_consultas(db):
+    """
+    Context manager com a lista dos SQL executados no bloco
+    
+        with contar_consultas() as consultas:
+            ...
+        assert len(consultas) == 1
+    """
+    @contextmanager
+    def contar():
+        consultas = []
+        
+        def registrar(conn, cursor, statement, *args):
+            consultas.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            yield consultas
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+    
+    return contar
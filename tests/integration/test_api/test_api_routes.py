@@ -0,0 +1,148 @@
+"""Testes para rotas da API"""
+
+def test_buscar_exercicios_por_termo(auth_client):
+    """Testa busca no catálogo pela API"""
+    response = auth_client.get('/api/buscar-exercicios?termo=rosca')
+    assert response.status_code == 200
+    nomes = [ex['nome'] for ex in response.get_json()]
+    assert nomes
+    assert all('rosca' in nome.lower() for nome in nomes)
+
+def test_buscar_exercicios_sem_termo_limita_resultados(auth_client):
+    """Testa que a busca sem termo retorna no máximo 200 exercícios"""
+    response = auth_client.get('/api/buscar-exercicios')
+    assert len(response.get_json()) == 200
+
+def test_buscar_musculo(auth_client):
+    """Testa resolução de músculo pelo nome do exercício"""
+    response = auth_client.get('/api/buscar-musculo?nome=Abdominal 3/4')
+    dados = response.get_json()
+    assert dados['encontrado'] is True
+    assert dados['musculo'] == 'Abdômen'
+
+def test_catalogo_buscar_fuzzy(auth_client):
+    """Testa busca aproximada com erro de digitação"""
+    response = auth_client.get('/api/catalogo/buscar?termo=supno reto&fuzzy=1&limite=3')
+    resultados = response.get_json()
+    assert 0 < len(resultados) <= 3
+    assert resultados[0]['nome'].lower().startswith('supino reto')
+    assert resultados[0]['score'] >= resultados[-1]['score']
+
+def test_catalogo_typeahead(auth_client):
+    """Testa sugestões por prefixo de palavra"""
+    response = auth_client.get('/api/catalogo/typeahead?q=dire&limite=5')
+    resultados = response.get_json()
+    assert 0 < len(resultados) <= 5
+    assert all('direta' in r['nome'].lower() for r in resultados)
+
+def test_cache_stats_conta_pagina_de_estatisticas(auth_client):
+    """Testa o contador de acertos da página de estatísticas"""
+    assert auth_client.get('/estatisticas/estatisticas').status_code == 200
+    assert auth_client.get('/estatisticas/estatisticas').status_code == 200
+    dados = auth_client.get('/api/cache/stats').get_json()
+    assert dados['pagina_estatisticas']['cache'] >= 1
+    assert dados['cache']['hits'] >= 2
+
+def test_tabela_exercicios_pagina_por_cursor(auth_client, db):
+    """Testa a carga sob demanda das linhas da tabela de progresso"""
+    from models import User, Exercicio, Musculo
+    user = User.query.filter_by(username='teste').first()
+    musculo = Musculo(nome='peito', nome_exibicao='Peito')
+    db.session.add(musculo)
+    db.session.commit()
+    for nome in ('Crucifixo', 'Supino', 'Voador'):
+        db.session.add(Exercicio(nome=nome, musculo_id=musculo.id, user_id=user.id))
+    db.session.commit()
+
+    assert auth_client.get('/estatisticas/visualizar/tabela').status_code == 200
+
+    pagina = auth_client.get('/api/tabela/exercicios?limite=2').get_json()
+    assert [e['nome'] for e in pagina['exercicios']] == ['Crucifixo', 'Supino']
+    resto = auth_client.get(f"/api/tabela/exercicios?limite=2&cursor={pagina['proximo_cursor']}").get_json()
+    assert [e['nome'] for e in resto['exercicios']] == ['Voador']
+    assert resto['proximo_cursor'] is None
+
+    assert auth_client.get('/api/tabela/exercicios?cursor=invalido').status_code == 400
+
+def test_server_timing_conta_consultas_sql(auth_client, caplog):
+    """Testa o cabeçalho Server-Timing e o aviso de consultas em excesso"""
+    import re
+    response = auth_client.get('/api/cache/stats')
+    timing = response.headers['Server-Timing']
+    consultas = int(re.search(r'sql;desc="(\d+) consultas"', timing).group(1))
+    assert consultas >= 1
+    assert 'sql-max;' in timing and 'app;dur=' in timing
+
+    auth_client.application.config['SQL_CONSULTAS_ALERTA'] = 1
+    with caplog.at_level('WARNING', logger='middleware.instrumentacao_sql'):
+        auth_client.get('/estatisticas/estatisticas')
+    assert re.search(r'stats\.\w+: \d+ consultas \(limite 1\)', caplog.text)
+
+def test_metrics_exporta_requisicoes_somente_para_admin(auth_client):
+    """Testa o /metrics: contadores por endpoint, acesso de admin e por token"""
+    auth_client.get('/api/cache/stats')
+    response = auth_client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    texto = response.get_data(as_text=True)
+    assert 'fitlog_http_requisicoes_total{endpoint="api.api_cache_stats",metodo="GET",status="2xx"}' in texto
+    assert 'fitlog_http_duracao_segundos_bucket{endpoint="api.api_cache_stats",status="2xx",le="+Inf"}' in texto
+    assert 'fitlog_sql_consultas_total{endpoint="api.api_cache_stats"}' in texto
+    assert '# TYPE fitlog_cache_hit_ratio gauge' in texto
+
+    auth_client.get('/auth/logout')
+    assert auth_client.get('/metrics').status_code == 302
+
+    auth_client.application.config['METRICAS_TOKEN'] = 'segredo'
+    assert auth_client.get('/metrics', headers={'Authorization': 'Bearer segredo'}).status_code == 200
+    assert auth_client.get('/metrics', headers={'Authorization': 'Bearer outro'}).status_code == 302
+
+def test_requisicao_lenta_grava_consultas_e_planos(auth_client, tmp_path):
+    """Testa o JSONL de requisições lentas: consultas, EXPLAIN e contagem de índices"""
+    import json
+    import re
+    from app import create_app
+    from middleware import requisicoes_lentas
+    from models import User, db
+    from tests.conftest import TestConfig
+    # Desabilitado (padrão do TestConfig), os hooks nem são registrados
+    assert requisicoes_lentas._iniciar not in auth_client.application.before_request_funcs.get(None, [])
+
+    arquivo = tmp_path / 'lentas.jsonl'
+    class LentasConfig(TestConfig):
+        REQUISICOES_LENTAS_LIMITE = 1e-9
+        REQUISICOES_LENTAS_ARQUIVO = str(arquivo)
+    
+    app = create_app(LentasConfig)
+    try:
+        with app.app_context():
+            db.create_all()
+            user = User(username='lento', email='lento@teste.com')
+            user.set_password('123456')
+            db.session.add(user)
+            db.session.commit()
+            client = app.test_client()
+            client.post('/auth/login', data={'username': 'lento', 'password': '123456'})
+            response = client.get('/estatisticas/estatisticas?periodo=todos')
+            db.session.remove()
+            db.drop_all()
+    finally:
+        for handler in list(requisicoes_lentas.registro.handlers):
+            requisicoes_lentas.registro.removeHandler(handler)
+            handler.close()
+        requisicoes_lentas._config['limite'] = 0.0
+
+    registro = json.loads(arquivo.read_text(encoding='utf-8').splitlines()[-1])
+    assert re.fullmatch(r'stats\.\w+', registro['endpoint'])
+    assert registro['args'] == {'periodo': ['todos']}
+    assert registro['user_id'] is not None and registro['status'] == 200
+
+    # Os EXPLAIN não contam como consultas da requisição
+    quantidade = int(re.search(r'sql;desc="(\d+) consultas"', response.headers['Server-Timing']).group(1))
+    assert registro['sql']['quantidade'] == quantidade == len(registro['sql']['consultas'])
+    assert registro['planos'] and all(p['sql'].lstrip().upper().startswith('SELECT') for p in registro['planos'])
+    assert any(re.search(r'SCAN|SEARCH', linha) for p in registro['planos'] for linha in p['plano'])
+
+    from utils.relatorio_indices import contar_indices
+    contagem = contar_indices(str(arquivo), ['idx_historico_carga', 'idx_registro_user_data'])
+    assert set(contagem) == {'idx_historico_carga', 'idx_registro_user_data'}
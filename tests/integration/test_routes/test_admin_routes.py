@@ -0,0 +1,80 @@
+"""Testes das rotas de administração"""
+
+import os
+import pstats
+import pytest
+from app import create_app
+from middleware import perfilador
+from models import db as _db
+from tests.conftest import TestConfig
+
+@pytest.fixture
+def perfis_dir(tmp_path):
+    return tmp_path / 'perfis'
+
+@pytest.fixture
+def app(perfis_dir):
+    """Aplicação com o perfilador habilitado, gravando em um diretório temporário"""
+    class PerfiladorConfig(TestConfig):
+        PERFILADOR_HABILITADO = True
+        PERFILADOR_DIR = str(perfis_dir)
+        PERFILADOR_MAX_ARQUIVOS = 3
+    
+    app = create_app(PerfiladorConfig)
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+    # As demais aplicações dos testes são criadas com o perfilador desabilitado
+    perfilador._config['habilitado'] = False
+
+def test_perfilador_grava_perfil_do_admin(auth_client, perfis_dir):
+    """Testa que ?__profile=1 grava um perfil pstats e o lista em /admin/perfis"""
+    response = auth_client.get('/estatisticas/estatisticas')
+    assert 'X-Fitlog-Profile' not in response.headers
+    assert not os.path.isdir(perfis_dir)
+
+    response = auth_client.get('/estatisticas/estatisticas?__profile=1')
+    assert response.status_code == 200
+    nome = response.headers['X-Fitlog-Profile']
+    assert pstats.Stats(str(perfis_dir / nome)).total_calls > 0
+
+    perfis = perfilador.listar_perfis()
+    assert perfis[0]['arquivo'] == nome
+    assert perfis[0]['caminho'] == '/estatisticas/estatisticas?__profile=1'
+
+    assert nome.encode() in auth_client.get('/admin/perfis').data
+    download = auth_client.get(f'/admin/perfis/{nome}')
+    assert download.status_code == 200 and download.data == (perfis_dir / nome).read_bytes()
+    assert b'function calls' in auth_client.get(f'/admin/perfis/{nome}/resumo').data
+    assert auth_client.get('/admin/perfis/..%2Fconfig.py').status_code == 404
+
+def test_perfilador_mantem_apenas_os_mais_recentes(auth_client, perfis_dir):
+    """Testa o limite de perfis em disco"""
+    nomes = [auth_client.get('/', headers={'X-Fitlog-Profile': '1'}).headers['X-Fitlog-Profile']
+             for _ in range(5)]
+    restantes = sorted(p for p in os.listdir(perfis_dir) if p.endswith('.prof'))
+    assert restantes == sorted(nomes[-3:])
+    assert len(os.listdir(perfis_dir)) == 6
+
+def test_perfilador_ignora_usuario_comum(auth_client, db, perfis_dir):
+    """Testa que só administradores são perfilados"""
+    from models import User
+    user = User.query.filter_by(username='teste').first()
+    user.is_admin = False
+    db.session.commit()
+
+    response = auth_client.get('/?__profile=1')
+    assert 'X-Fitlog-Profile' not in response.headers
+    assert not os.path.isdir(perfis_dir)
+    assert auth_client.get('/admin/perfis').status_code == 302
+
+def test_perfilador_desabilitado_nao_registra_hooks():
+    """Testa que, desabilitado, o perfilador não acrescenta hooks à requisição"""
+    desabilitado = create_app(TestConfig)
+    hooks = [f for funcoes in desabilitado.before_request_funcs.values() for f in funcoes]
+    hooks += [f for funcoes in desabilitado.after_request_funcs.values() for f in funcoes]
+    hooks += [f for funcoes in desabilitado.teardown_request_funcs.values() for f in funcoes]
+    assert not {perfilador._iniciar, perfilador._finalizar, perfilador._descartar} & set(hooks)
+    assert not perfilador.perfilador_habilitado()
@@ -0,0 +1,89 @@
+"""Testes das rotas de versões"""
+
+from datetime import date
+
+def _criar_versoes(db, user, quantidade, inicio=1):
+    """Versões com três treinos de dois exercícios cada"""
+    from models import Treino, Exercicio, Musculo, VersaoGlobal, TreinoVersao, VersaoExercicio
+    musculo = Musculo.query.first()
+    if musculo is None:
+        musculo = Musculo(nome='peito', nome_exibicao='Peito')
+        db.session.add(musculo)
+        db.session.commit()
+
+    treinos = {t.codigo: t for t in Treino.query.filter_by(user_id=user.id)}
+    for codigo in 'ABC':
+        if codigo not in treinos:
+            treinos[codigo] = Treino(codigo=codigo, nome=f'Treino {codigo}', descricao='Teste', user_id=user.id)
+            db.session.add(treinos[codigo])
+    db.session.commit()
+
+    for numero in range(inicio, inicio + quantidade):
+        versao = VersaoGlobal(numero_versao=numero, descricao=f'V{numero}',
+                              data_inicio=date(2024, numero, 1), user_id=user.id)
+        db.session.add(versao)
+        for ordem, codigo in enumerate('ABC'):
+            tv = TreinoVersao(versao_ref=versao, treino_id=treinos[codigo].id,
+                              nome_treino=f'{codigo}{numero}', ordem=ordem)
+            db.session.add(tv)
+            for i in range(2):
+                exercicio = Exercicio(nome=f'{codigo}{numero}-{i}', musculo_id=musculo.id,
+                                      treino_id=treinos[codigo].id, user_id=user.id)
+                db.session.add(exercicio)
+                db.session.add(VersaoExercicio(treino_versao_ref=tv, exercicio_ref=exercicio, ordem=i))
+    db.session.commit()
+
+def _consultas_da_pagina(client, contar_consultas, url='/version/gerenciar-versoes'):
+    with contar_consultas() as consultas:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(consultas), response
+
+def test_gerenciar_versoes_com_consultas_constantes(auth_client, db, contar_consultas):
+    """Testa que a página de versões não faz uma consulta por versão ou treino"""
+    from models import User
+    from services.versao_service import VersaoService
+    user = User.query.filter_by(username='teste').first()
+
+    _criar_versoes(db, user, 1)
+    uma_versao, _ = _consultas_da_pagina(auth_client, contar_consultas)
+
+    _criar_versoes(db, user, 4, inicio=2)
+    assert _consultas_da_pagina(auth_client, contar_consultas)[0] == uma_versao
+
+    treinos = VersaoService.get_treinos_por_versao(user_id=user.id)
+    assert len(treinos) == 5
+    versao_1 = treinos[min(treinos)]
+    assert list(versao_1) == ['A', 'B', 'C']
+    assert versao_1['A']['nome'] == 'A1'
+    assert len(versao_1['A']['exercicios']) == 2
+    assert VersaoService.get_treinos(min(treinos), user_id=user.id) == versao_1
+
+def test_editar_treino_na_versao_com_consultas_constantes(auth_client, db, contar_consultas):
+    """Testa que o editor resolve os exercícios do catálogo sem uma consulta por entrada"""
+    from models import User, Exercicio, Musculo, VersaoGlobal
+    from services.catalogo_service import CatalogoService
+    user = User.query.filter_by(username='teste').first()
+    _criar_versoes(db, user, 1)
+    versao_id = VersaoGlobal.query.filter_by(user_id=user.id).first().id
+    url = f'/version/versao/{versao_id}/treino/A/editar'
+    catalogo = CatalogoService.get_todos_exercicios(limite=500)
+
+    def consultas():
+        # O usuário logado é recarregado em ambos os casos
+        db.session.expire_all()
+        return _consultas_da_pagina(auth_client, contar_consultas, url)
+
+    sem_cadastro, _ = consultas()
+    assert len(catalogo) == 500 and sem_cadastro < 10
+
+    # Exercícios do usuário com nomes do catálogo passam a vir do banco
+    musculo = Musculo.query.first()
+    cadastrados = [Exercicio(nome=ex['nome'], musculo_id=musculo.id, user_id=user.id) for ex in catalogo[:20]]
+    db.session.add_all(cadastrados)
+    db.session.commit()
+
+    total, response = consultas()
+    assert total == sem_cadastro
+    assert f'value="{cadastrados[0].id}"'.encode() in response.data
+    assert f'value="{catalogo[-1]["id"]}"'.encode() in response.data
@@ -0,0 +1 @@
+"""Testes unitários para middlewares"""
\ No newline at end of file
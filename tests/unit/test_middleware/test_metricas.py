@@ -0,0 +1,46 @@
+"""Testes para o registro e a exportação de métricas"""
+
+import os
+from middleware.metricas import ArmazemMetricas, RegistroMetricas, exportar_texto
+
+def _pid_inexistente():
+    pid = 4_000_000
+    while True:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return pid
+        except OSError:
+            pass
+        pid += 1
+
+def test_histograma_acumula_buckets():
+    """Testa buckets cumulativos, soma e total no formato do Prometheus"""
+    registro = RegistroMetricas(buckets=(0.1, 1.0))
+    for duracao in (0.05, 0.5, 0.7, 3.0):
+        registro.observar('fitlog_http_duracao_segundos', duracao, endpoint='main.index', status='2xx')
+    registro.incrementar('fitlog_http_requisicoes_total', endpoint='main.index', metodo='GET', status='2xx')
+
+    texto = exportar_texto(registro.snapshot())
+    rotulos = 'endpoint="main.index",status="2xx"'
+    assert '# TYPE fitlog_http_duracao_segundos histogram' in texto
+    assert f'fitlog_http_duracao_segundos_bucket{{{rotulos},le="0.1"}} 1' in texto
+    assert f'fitlog_http_duracao_segundos_bucket{{{rotulos},le="1.0"}} 3' in texto
+    assert f'fitlog_http_duracao_segundos_bucket{{{rotulos},le="+Inf"}} 4' in texto
+    assert f'fitlog_http_duracao_segundos_count{{{rotulos}}} 4' in texto
+    assert 'fitlog_http_requisicoes_total{endpoint="main.index",metodo="GET",status="2xx"} 1' in texto
+
+def test_armazem_soma_workers(tmp_path):
+    """Testa a soma entre workers: contadores de todos, gauges só dos vivos"""
+    armazem = ArmazemMetricas(tmp_path / 'metricas.sqlite3')
+    for pid, requisicoes, em_andamento in ((os.getpid(), 2, 1), (_pid_inexistente(), 3, 5)):
+        registro = RegistroMetricas(buckets=(1.0,))
+        registro.incrementar('fitlog_http_requisicoes_total', requisicoes, endpoint='main.index')
+        registro.observar('fitlog_http_duracao_segundos', 0.5, endpoint='main.index')
+        registro.somar_gauge('fitlog_http_requisicoes_em_andamento', em_andamento)
+        armazem.gravar(registro.snapshot(), pid=pid)
+
+    texto = exportar_texto(armazem.carregar())
+    assert 'fitlog_http_requisicoes_total{endpoint="main.index"} 5' in texto
+    assert 'fitlog_http_duracao_segundos_count{endpoint="main.index"} 2' in texto
+    assert 'fitlog_http_requisicoes_em_andamento 1' in texto
@@ -0,0 +1,118 @@
+"""Testes para o cache da aplicação"""
+
+from services import CacheService, cached, make_cache_key
+from services.cache_backend import MemoryCacheBackend, SQLiteCacheBackend, criar_backend
+
+class Relogio:
+    """Relógio manual para testar expiração"""
+    def __init__(self):
+        self.agora = 0.0
+    def __call__(self):
+        return self.agora
+
+def test_lru_remove_menos_usado():
+    """Testa remoção LRU ao exceder o número de entradas"""
+    cache = MemoryCacheBackend(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+def test_limite_de_bytes():
+    """Testa remoção ao exceder o total de bytes"""
+    cache = MemoryCacheBackend(max_bytes=200)
+    cache.set('a', 'x' * 100)
+    cache.set('b', 'y' * 100)
+    assert len(cache) == 1
+    assert cache.get('b') is not None
+    assert cache.set('grande', 'z' * 1000) is False
+
+def test_expiracao_proativa():
+    """Testa que entradas vencidas saem sem precisar ser consultadas"""
+    relogio = Relogio()
+    cache = MemoryCacheBackend(relogio=relogio)
+    cache.set('curta', 1, ttl_seconds=10)
+    cache.set('longa', 2, ttl_seconds=100)
+    relogio.agora = 11
+    assert cache.expirar_vencidos() == 1
+    assert len(cache) == 1
+    assert cache.stats()['expirations'] == 1
+
+def test_invalidacao_por_tag():
+    """Testa invalidação de todas as chaves de um usuário"""
+    cache = MemoryCacheBackend()
+    cache.set('stats:1', 'a', tags=['user:1'])
+    cache.set('home:1', 'b', tags=['user:1'])
+    cache.set('stats:2', 'c', tags=['user:2'])
+    assert cache.invalidate_tag('user:1') == 2
+    assert cache.get('stats:1') is None
+    assert cache.get('stats:2') == 'c'
+
+def test_decorator_cached(app):
+    """Testa o decorator com chave estável e resultados None"""
+    chamadas = []
+
+    @cached(ttl_seconds=60, tags=lambda user_id: [f"user:{user_id}"])
+    def calcular(user_id):
+        chamadas.append(user_id)
+        return None
+
+    calcular(7)
+    calcular(7)
+    assert chamadas == [7]
+    assert calcular.cache_key(7) == calcular.cache_key(7)
+    assert make_cache_key('p', (1, [2, 3])) == make_cache_key('p', (1, (2, 3)))
+
+    CacheService.invalidate_tag('user:7')
+    calcular(7)
+    assert chamadas == [7, 7]
+
+def test_sqlite_compartilhado_entre_workers(tmp_path):
+    """Testa que dois backends no mesmo arquivo enxergam escrita e invalidação"""
+    caminho = tmp_path / 'cache.sqlite3'
+    worker_a = SQLiteCacheBackend(caminho)
+    worker_b = SQLiteCacheBackend(caminho)
+    worker_a.set('stats:1', {'volume': 10}, tags=('user:1',))
+    worker_a.set('stats:2', {'volume': 20}, tags=('user:2',))
+    assert worker_b.get('stats:1') == {'volume': 10}
+    assert worker_b.invalidate_tag('user:1') == 1
+    assert worker_a.get('stats:1') is None
+    assert worker_a.get('stats:2') == {'volume': 20}
+
+def test_sqlite_lru_e_expiracao(tmp_path):
+    """Testa remoção LRU e TTL no backend SQLite"""
+    relogio = Relogio()
+    cache = SQLiteCacheBackend(tmp_path / 'cache.sqlite3', max_entries=2, relogio=relogio)
+    cache.set('a', 1, ttl_seconds=100)
+    relogio.agora = 1
+    cache.set('b', 2, ttl_seconds=1000)
+
+    # Acerto recente (menos de 1/10 do TTL): leitura pura, sem UPDATE
+    relogio.agora = 5
+    escritas = cache._conexao().total_changes
+    assert cache.get('a') == 1
+    assert cache._conexao().total_changes == escritas
+
+    relogio.agora = 20
+    assert cache.get('a') == 1
+    assert cache._conexao().total_changes == escritas + 1
+    relogio.agora = 21
+    cache.set('c', 3, ttl_seconds=100)
+    assert cache.get('b') is None
+    assert cache.stats()['evictions'] == 1
+    relogio.agora = 200
+    assert cache.expirar_vencidos() == 2
+    assert cache.stats()['entries'] == 0
+
+def test_criar_backend_pela_configuracao(tmp_path):
+    """Testa a escolha do backend via CACHE_BACKEND"""
+    assert isinstance(criar_backend({}), MemoryCacheBackend)
+    backend = criar_backend({
+        'CACHE_BACKEND': 'sqlite',
+        'CACHE_SQLITE_PATH': str(tmp_path / 'cache.sqlite3'),
+    })
+    assert isinstance(backend, SQLiteCacheBackend)
+    assert backend.stats()['backend'] == 'sqlite'
@@ -0,0 +1,124 @@
+"""Testes para o índice do catálogo"""
+
+import pytest
+from services.catalogo_index import CatalogoIndex, gerar_id_hash
+
+CATALOGO = [
+    {"name": "Supino Reto", "primaryMuscles": ["chest"], "equipment": "barra", "level": "iniciante"},
+    {"name": "Rosca Direta", "primaryMuscles": ["biceps"], "equipment": "barra", "level": "iniciante"},
+    {"name": "Rosca Martelo", "primaryMuscles": ["biceps"], "equipment": "halteres", "level": "intermediario"},
+    {"name": "Prancha", "primaryMuscles": [], "equipment": "peso-do-corpo", "level": "iniciante"},
+]
+
+def test_indice_pre_calcula_campos():
+    """Testa músculo de exibição e ID hash calculados na construção"""
+    indice = CatalogoIndex(CATALOGO)
+    supino = indice.get_por_nome("supino reto")
+    assert supino['musculo'] == 'Peitoral'
+    assert supino['id'] == gerar_id_hash("Supino Reto")
+    assert indice.get_por_id(supino['id']) is supino
+    assert indice.entradas[3]['musculo_original'] == 'Não especificado'
+    assert indice.musculos == ['Bíceps', 'Peitoral']
+
+def test_filtrar_por_termo_e_categorias():
+    """Testa busca por substring combinada com listas de postagem"""
+    indice = CatalogoIndex(CATALOGO)
+    assert indice.filtrar(termo="rosca") == [1, 2]
+    assert indice.filtrar(termo="ROSCÁ", equipamento="halteres") == [2]
+    assert indice.filtrar(musculo="Bíceps", nivel="iniciante") == [1]
+    assert indice.filtrar(termo="o", limite=2) == [0, 1]
+    assert indice.filtrar(termo="inexistente") == []
+
+def test_resolver_musculo():
+    """Testa as três estratégias de resolução de músculo"""
+    indice = CatalogoIndex(CATALOGO)
+    assert indice.resolver_musculo("Rosca Martelo") == 'Bíceps'
+    assert indice.resolver_musculo("supino") == 'Peitoral'
+    assert indice.resolver_musculo("supino reto com pausa") == 'Peitoral'
+    assert indice.resolver_musculo("prancha") is None
+    assert indice.resolver_musculo("") is None
+
+def test_catalogo_recarrega_quando_arquivo_muda(tmp_path, monkeypatch):
+    """Testa recarga automática do cache pelo mtime do arquivo"""
+    import json
+    import os
+    from services.catalogo_service import CatalogoService
+
+    arquivo = tmp_path / "catalogo.json"
+    arquivo.write_text(json.dumps(CATALOGO[:1]), encoding='utf-8')
+    monkeypatch.setattr(CatalogoService, '_catalogo_path', arquivo)
+    monkeypatch.setattr(CatalogoService, '_catalogo', None)
+    monkeypatch.setattr(CatalogoService, '_catalogo_mtime', None)
+    monkeypatch.setattr(CatalogoService, '_indice', None)
+
+    assert len(CatalogoService.get_indice()) == 1
+
+    arquivo.write_text(json.dumps(CATALOGO), encoding='utf-8')
+    stat = arquivo.stat()
+    os.utime(arquivo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert len(CatalogoService.get_indice()) == len(CATALOGO)
+
+def test_buscar_fuzzy_tolera_erros_de_digitacao():
+    """Testa ranking por trigramas com heap limitado"""
+    indice = CatalogoIndex(CATALOGO)
+    resultados = indice.buscar_fuzzy("supno reto", limite=5)
+    assert resultados[0][0] == 0
+    assert indice.buscar_fuzzy("rosca", limite=1) == [(1, indice.buscar_fuzzy("rosca")[0][1])]
+    assert [p for p, _ in indice.buscar_fuzzy("rosca marelo")][:1] == [2]
+    assert indice.buscar_fuzzy("zzzz") == []
+
+def test_prefixo_e_refinamento():
+    """Testa busca por prefixo de nome/palavra e refinamento incremental"""
+    indice = CatalogoIndex(CATALOGO)
+    assert indice.buscar_prefixo("ros") == [1, 2]
+    assert indice.buscar_prefixo("mart") == [2]
+    assert indice.refinar_prefixo("rosca d", indice.buscar_prefixo("ros")) == [1]
+    assert indice.buscar_prefixo("reto x") == []
+
+def test_typeahead_reaproveita_prefixo_anterior(monkeypatch):
+    """Testa que um prefixo estendido refina o resultado em cache da sessão"""
+    from services.catalogo_service import CatalogoService
+
+    monkeypatch.setattr(CatalogoService, '_typeahead_sessoes', type(CatalogoService._typeahead_sessoes)())
+    indice = CatalogoService.get_indice()
+    chamadas = []
+    original = indice.buscar_prefixo
+    monkeypatch.setattr(indice, 'buscar_prefixo', lambda busca: chamadas.append(busca) or original(busca))
+
+    CatalogoService.typeahead("ros", sessao_id=1)
+    resultados = CatalogoService.typeahead("rosca dir", sessao_id=1)
+    assert chamadas == ["ros"]
+    assert resultados and all('rosca dir' in r['nome'].lower() for r in resultados)
+
+def test_catalogo_binario_equivale_ao_json(tmp_path):
+    """Testa conversão para o formato binário e leitura via mmap"""
+    import json
+    from services.catalogo_binario import compilar_catalogo, CatalogoBinario
+
+    catalogo = [dict(ex, force=None, instructions=[f"Passo de {ex['name']}"]) for ex in CATALOGO]
+    origem = tmp_path / "catalogo.json"
+    origem.write_text(json.dumps(catalogo), encoding='utf-8')
+    destino = tmp_path / "catalogo.bin"
+
+    assert compilar_catalogo(origem, destino) == len(CATALOGO)
+    binario = CatalogoBinario(destino)
+    indice_json = CatalogoIndex(catalogo)
+    indice_bin = CatalogoIndex(binario, carregar_instrucoes=binario.get_instrucoes)
+
+    assert "instructions" not in indice_bin.entradas[0]
+    for posicao in range(len(CATALOGO)):
+        assert indice_bin.materializar(posicao) == indice_json.materializar(posicao)
+
+def test_seletores_nao_leem_instrucoes(monkeypatch):
+    """Testa que typeahead e buscas resumidas montam a resposta sem materializar"""
+    from services.catalogo_service import CatalogoService
+
+    monkeypatch.setattr(CatalogoService, '_typeahead_sessoes', type(CatalogoService._typeahead_sessoes)())
+    indice = CatalogoService.get_indice()
+    monkeypatch.setattr(indice, 'materializar', lambda posicao: pytest.fail("materializou"))
+
+    for resultados in (CatalogoService.typeahead("ros", sessao_id=1, limite=200),
+                       CatalogoService.buscar_exercicios(termo="rosca", completos=False),
+                       CatalogoService.get_todos_exercicios(limite=50, completos=False)):
+        assert resultados
+        assert all(set(ex) == {"id", "nome", "musculo"} for ex in resultados)
@@ -0,0 +1,140 @@
+"""Testes para EstatisticaService"""
+
+import pytest
+from services.estatistica_service import EstatisticaService, _calcular_por_treino
+from services.exercicio_service import ExercicioService
+from services.registro_service import RegistroService
+from models import User, Treino, Musculo, Exercicio
+
+@pytest.fixture
+def dados(treino_de_teste, db):
+    """Usuário com um treino, um exercício e uma versão"""
+    user, treino, versao, (exercicio,) = treino_de_teste(['Supino'])
+    db.session.add(Musculo(nome='costas', nome_exibicao='Costas'))
+    db.session.commit()
+    return user, treino, versao, exercicio
+
+def _salvar(user, treino, versao, exercicio, carga, semana=1):
+    return RegistroService.salvar_registros(
+        treino.id, versao.id, 'Janeiro/2024', semana,
+        {exercicio.id: {'carga': carga, 'repeticoes': 10, 'num_series': 3}},
+        user_id=user.id
+    )
+
+def test_estatisticas_memoizadas_e_invalidadas_ao_salvar(dados):
+    """Testa que salvar registros invalida as estatísticas do usuário"""
+    user, treino, versao, exercicio = dados
+    assert _salvar(user, treino, versao, exercicio, 50)
+
+    assert EstatisticaService.get_dados_pagina(user.id)[0]['Peito']['volume_total'] == 1500
+    antes = EstatisticaService.get_contadores_pagina()['cache']
+    EstatisticaService.get_dados_pagina(user.id)
+    assert EstatisticaService.get_contadores_pagina()['cache'] == antes + 1
+
+    assert _salvar(user, treino, versao, exercicio, 60, semana=2)
+    assert EstatisticaService.calcular_por_musculo(user.id)['Peito']['volume_total'] == 3300
+    progresso = EstatisticaService.get_progresso_por_semana(user_id=user.id)
+    assert [float(p.volume_total) for p in progresso] == [1500, 1800]
+
+def test_edicao_de_exercicio_invalida_estatisticas(dados):
+    """Testa que mudar o músculo do exercício invalida o cache por músculo"""
+    user, treino, versao, exercicio = dados
+    _salvar(user, treino, versao, exercicio, 50)
+    assert EstatisticaService.calcular_por_musculo(user.id)['Peito']['total_series'] == 3
+
+    ExercicioService.update(exercicio.id, musculo_nome='Costas', user_id=user.id)
+    stats = EstatisticaService.calcular_por_musculo(user.id)
+    assert stats['Peito']['total_series'] == 0
+    assert stats['Costas']['total_series'] == 3
+
+def test_alteracao_de_outro_usuario_preserva_cache(dados, db):
+    """Testa que a invalidação atinge apenas o dono dos dados"""
+    user, treino, versao, exercicio = dados
+    EstatisticaService.calcular_por_treino(user.id)
+
+    outro = User(username='outro', email='outro@teste.com')
+    outro.set_password('123456')
+    db.session.add(outro)
+    db.session.commit()
+    db.session.add(Treino(codigo='A', nome='Outro A', descricao='Teste', user_id=outro.id))
+    db.session.commit()
+
+    _, do_cache = _calcular_por_treino.com_origem(user.id)
+    assert do_cache is True
+
+def test_calcular_por_treino_agrega_sem_duplicar(dados, db):
+    """Testa que exercícios e séries do mesmo treino não se multiplicam no join"""
+    user, treino, versao, exercicio = dados
+    db.session.add(Exercicio(nome='Crucifixo', musculo_id=1, treino_id=treino.id, user_id=user.id))
+    db.session.add(Treino(codigo='B', nome='Treino B', descricao='Vazio', user_id=user.id))
+    db.session.commit()
+    _salvar(user, treino, versao, exercicio, 50)
+
+    stats = EstatisticaService.calcular_por_treino(user.id)
+    assert [s['codigo'] for s in stats.values()] == ['A', 'B']
+    assert stats[treino.id] == {
+        'codigo': 'A', 'nome': 'Treino A', 'descricao': 'Teste',
+        'qtd_exercicios': 2, 'qtd_registros': 1,
+        'volume_total': 1500.0, 'total_series': 3
+    }
+    vazio = next(s for s in stats.values() if s['codigo'] == 'B')
+    assert (vazio['qtd_registros'], vazio['total_series'], vazio['volume_total']) == (0, 0, 0.0)
+
+def test_preparar_dados_tabela_ordena_e_conta_por_semana():
+    """Testa ordenação cronológica entre anos, filtros e contagens da tabela"""
+    from types import SimpleNamespace
+    from datetime import datetime
+
+    def registro(id, exercicio_id, periodo, semana):
+        serie = SimpleNamespace(carga=50, repeticoes=10)
+        return SimpleNamespace(id=id, exercicio_id=exercicio_id, periodo=periodo, semana=semana,
+                               series=[serie], treino_id=1, versao_id=1,
+                               data_registro=datetime(2024, 1, 1))
+
+    exercicios = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+    registros = [
+        registro(1, 1, 'Janeiro/2024', 2), registro(2, 2, 'Janeiro/2024', 2),
+        registro(3, 1, 'Dezembro/2023', 4), registro(4, 1, 'Janeiro/2024', 1),
+        registro(5, 3, 'Fevereiro/2024', 1),
+    ]
+
+    dados = EstatisticaService.preparar_dados_tabela(exercicios, registros, 'todas', {})
+    assert [s['key'] for s in dados['semanas']] == [
+        'Dezembro/2023_4', 'Janeiro/2024_1', 'Janeiro/2024_2', 'Fevereiro/2024_1'
+    ]
+    assert set(dados['registros_por_exercicio'][1]) == {'Dezembro/2023_4', 'Janeiro/2024_1', 'Janeiro/2024_2'}
+    assert [p['periodo'] for p in dados['periodos_disponiveis']] == ['Dezembro/2023', 'Janeiro/2024', 'Fevereiro/2024']
+    assert dados['periodos_disponiveis'][1]['registros_por_semana'] == {1: 1, 2: 2}
+
+    ultimas = EstatisticaService.preparar_dados_tabela(exercicios, registros, 'ultimas3', {})
+    assert [s['key'] for s in ultimas['semanas']] == ['Janeiro/2024_1', 'Janeiro/2024_2', 'Fevereiro/2024_1']
+
+    personalizado = EstatisticaService.preparar_dados_tabela(
+        exercicios, registros, 'personalizado', {'semana_Dezembro/2023_4': 'on'}
+    )
+    assert personalizado['semanas_selecionadas_lista'] == ['Dezembro/2023_4']
+    assert len(personalizado['semanas']) == 1
+
+def test_montar_tabela_pagina_exercicios_e_restringe_janela(dados, db):
+    """Testa a paginação por cursor e a busca só das semanas filtradas"""
+    user, treino, versao, exercicio = dados
+    for nome in ('Crucifixo', 'Voador'):
+        db.session.add(Exercicio(nome=nome, musculo_id=1, treino_id=treino.id, user_id=user.id))
+    db.session.commit()
+    for semana in range(1, 5):
+        _salvar(user, treino, versao, exercicio, 40 + semana, semana=semana)
+
+    primeira = EstatisticaService.montar_tabela(None, '', 'exercicio', 'ultimas3', {},
+                                                limite=2, user_id=user.id)
+    assert [e.nome for e in primeira['exercicios']] == ['Crucifixo', 'Supino']
+    assert [s['key'] for s in primeira['semanas']] == ['Janeiro/2024_2', 'Janeiro/2024_3', 'Janeiro/2024_4']
+    assert sorted(primeira['registros_por_exercicio'][exercicio.id]) == [
+        'Janeiro/2024_2', 'Janeiro/2024_3', 'Janeiro/2024_4'
+    ]
+    assert len(primeira['registros_por_exercicio'][exercicio.id]['Janeiro/2024_4']['series']) == 3
+    assert primeira['periodos_disponiveis'][0]['semanas'] == [1, 2, 3, 4]
+
+    segunda = EstatisticaService.montar_tabela(None, '', 'exercicio', 'ultimas3', {},
+                                               apos=primeira['proxima_chave'], limite=2, user_id=user.id)
+    assert [e.nome for e in segunda['exercicios']] == ['Voador']
+    assert segunda['proxima_chave'] is None
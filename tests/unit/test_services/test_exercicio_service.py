@@ -0,0 +1,54 @@
+"""Testes para ExercicioService"""
+
+from datetime import datetime
+import pytest
+from services.exercicio_service import (ExercicioService, _ultimos_registros_janela,
+                                        _ultimos_registros_correlacionados)
+from services.registro_service import RegistroService
+from models import RegistroTreino
+
+@pytest.fixture
+def dados(treino_de_teste):
+    """Usuário com três exercícios e duas sessões registradas"""
+    user, treino, versao, exercicios = treino_de_teste(['Supino', 'Crucifixo', 'Voador'])
+    supino, crucifixo, _ = exercicios
+    
+    for semana, sessao in ((1, {supino.id: (50, 3), crucifixo.id: (20, 2)}),
+                           (2, {supino.id: (55, 4)})):
+        RegistroService.salvar_registros(
+            treino.id, versao.id, 'Janeiro/2024', semana,
+            {ex_id: {'carga': carga, 'repeticoes': 10, 'num_series': series,
+                     'data_registro': datetime(2024, 1, semana * 7)}
+             for ex_id, (carga, series) in sessao.items()},
+            user_id=user.id
+        )
+    return user, versao, exercicios
+
+def test_ultimas_series_por_exercicio_em_uma_consulta(dados, contar_consultas):
+    """Testa a sessão mais recente de cada exercício com uma única consulta"""
+    user, versao, exercicios = dados
+    supino, crucifixo, voador = ids = [ex.id for ex in exercicios]
+    user_id, versao_id = user.id, versao.id
+    
+    with contar_consultas() as consultas:
+        resultado = ExercicioService.get_ultimas_series_por_exercicio(
+            ids, versao_id=versao_id, user_id=user_id
+        )
+    
+    assert len(consultas) == 1
+    assert resultado == {
+        supino: [{'carga': 55.0, 'repeticoes': 10}] * 4,
+        crucifixo: [{'carga': 20.0, 'repeticoes': 10}] * 2,
+    }
+
+def test_janela_e_subconsulta_correlacionada_coincidem(dados, db):
+    """Testa que as duas formas da consulta escolhem os mesmos registros"""
+    user, versao, exercicios = dados
+    ids = [ex.id for ex in exercicios]
+    for versao_id in (versao.id, None):
+        janela = db.session.execute(_ultimos_registros_janela(ids, user.id, versao_id)).scalars().all()
+        correlacionada = db.session.execute(
+            _ultimos_registros_correlacionados(ids, user.id, versao_id)
+        ).scalars().all()
+        assert sorted(janela) == sorted(correlacionada)
+        assert {db.session.get(RegistroTreino, i).semana for i in janela} == {1, 2}
@@ -0,0 +1,42 @@
+"""Testes para PainelService"""
+
+from datetime import datetime
+import pytest
+from services.painel_service import PainelService, ResumoPainel, _calcular_resumo
+from services.registro_service import RegistroService
+
+@pytest.fixture
+def dados(treino_de_teste):
+    """Usuário com um treino de dois exercícios e uma versão"""
+    user, treino, versao, exercicios = treino_de_teste(2)
+    return user.id, treino.id, versao.id, [ex.id for ex in exercicios]
+
+def _salvar(dados, periodo, semana, data_registro):
+    user_id, treino_id, versao_id, exercicio_ids = dados
+    sessao = {ex_id: {'carga': 50, 'repeticoes': 10, 'num_series': 3, 'data_registro': data_registro}
+              for ex_id in exercicio_ids}
+    assert RegistroService.salvar_registros(treino_id, versao_id, periodo, semana, sessao, user_id=user_id)
+
+def test_resumo_sem_registros(dados):
+    """Testa o resumo de um usuário sem histórico"""
+    assert PainelService.get_resumo(dados[0]) == ResumoPainel(0, 0, None, None)
+
+def test_resumo_conta_e_mostra_sessao_mais_recente(dados):
+    """Testa contagens e que a última semana é a do registro mais recente"""
+    _salvar(dados, 'Fevereiro/2024', 2, datetime(2024, 2, 12))
+    _salvar(dados, 'Janeiro/2024', 1, datetime(2024, 1, 1))
+    _salvar(dados, 'Fevereiro/2024', 1, datetime(2024, 2, 5))
+
+    assert PainelService.get_resumo(dados[0]) == ResumoPainel(6, 3, 'Fevereiro/2024', 2)
+
+def test_resumo_memoizado_e_invalidado_ao_salvar(dados):
+    """Testa o cache por usuário e a invalidação quando os registros mudam"""
+    user_id = dados[0]
+    _salvar(dados, 'Janeiro/2024', 1, datetime(2024, 1, 1))
+    assert PainelService.get_resumo(user_id).total_registros == 2
+    assert _calcular_resumo.com_origem(user_id)[1] is True
+
+    _salvar(dados, 'Janeiro/2024', 2, datetime(2024, 1, 8))
+    resumo, do_cache = _calcular_resumo.com_origem(user_id)
+    assert do_cache is False
+    assert resumo == ResumoPainel(4, 2, 'Janeiro/2024', 2)
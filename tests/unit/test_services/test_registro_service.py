@@ -0,0 +1,154 @@
+"""Testes para RegistroService"""
+
+from datetime import date
+import pytest
+from services.registro_service import RegistroService
+from models import RegistroTreino, HistoricoTreino
+
+@pytest.fixture
+def dados(treino_de_teste):
+    """Usuário com um treino de cinco exercícios e uma versão"""
+    user, treino, versao, exercicios = treino_de_teste(5)
+    return user.id, treino.id, versao.id, [ex.id for ex in exercicios]
+
+def _sessao(exercicio_ids, carga=50):
+    return {ex_id: {'carga': carga + i, 'repeticoes': 10, 'num_series': 3}
+            for i, ex_id in enumerate(exercicio_ids)}
+
+def _gravado():
+    return sorted(
+        (r.exercicio_id, s.ordem, float(s.carga), s.repeticoes, r.data_sessao)
+        for r, s in RegistroTreino.query.join(HistoricoTreino).add_entity(HistoricoTreino)
+    )
+
+def test_salvar_registros_insere_em_lote(dados, contar_consultas):
+    """Testa que registros e séries são gravados com uma instrução cada"""
+    user_id, treino_id, versao_id, exercicio_ids = dados
+    
+    with contar_consultas() as consultas:
+        assert RegistroService.salvar_registros(treino_id, versao_id, 'Janeiro/2024', 1,
+                                                _sessao(exercicio_ids), user_id=user_id)
+    
+    inserts = [sql.split()[2] for sql in consultas
+               if sql.startswith(('INSERT INTO registros_treino', 'INSERT INTO historico_treino'))]
+    assert sorted(inserts) == ['historico_treino', 'registros_treino']
+    gravado = _gravado()
+    assert len(gravado) == 15
+    assert gravado[:3] == [(exercicio_ids[0], ordem, 50.0, 10, date(2024, 1, 1)) for ordem in (1, 2, 3)]
+
+def test_salvar_registros_sem_returning_em_lote(dados, db, monkeypatch):
+    """Testa o caminho sem RETURNING em lote (um INSERT por registro)"""
+    user_id, treino_id, versao_id, exercicio_ids = dados
+    assert RegistroService.salvar_registros(treino_id, versao_id, 'Janeiro/2024', 1,
+                                            _sessao(exercicio_ids), user_id=user_id)
+    esperado = _gravado()
+    
+    monkeypatch.setattr(db.engine.dialect, 'insert_executemany_returning', False)
+    assert RegistroService.salvar_registros(treino_id, versao_id, 'Janeiro/2024', 1,
+                                            _sessao(exercicio_ids), user_id=user_id)
+    assert _gravado() == esperado
+    assert HistoricoTreino.query.count() == 15
+    
+    # Primeira gravação de outra sessão: nenhuma remoção antes dos INSERTs
+    from repositories.registro_repository import RegistroRepository
+    assert RegistroRepository.inserir_em_lote(treino_id, versao_id, 'Janeiro/2024', 2,
+                                              _sessao(exercicio_ids), user_id) == 5
+    db.session.commit()
+    assert RegistroTreino.query.filter_by(semana=2).count() == 5
+    assert HistoricoTreino.query.count() == 30
+
+def _resumo():
+    from models import ResumoSemanal
+    return sorted((r.exercicio_id, r.total_series, float(r.volume_total), float(r.carga_maxima))
+                  for r in ResumoSemanal.query)
+
+def test_sincronizar_altera_apenas_o_que_mudou(dados, db):
+    """Testa o upsert por diferença: linhas tocadas, ids preservados e resumo"""
+    from services.resumo_service import ResumoService
+    user_id, treino_id, versao_id, exercicio_ids = dados
+    
+    def sincronizar(sessao):
+        return RegistroService.sincronizar_registros(treino_id, versao_id, 'Janeiro/2024', 1,
+                                                     sessao, user_id=user_id)
+    
+    sessao = _sessao(exercicio_ids)
+    assert sincronizar(sessao) == (20, 0, 0)
+    ids_series = {s.id for s in HistoricoTreino.query}
+    assert sincronizar(sessao).total == 0
+    
+    # Uma carga alterada: 3 séries + o registro
+    sessao[exercicio_ids[1]]['carga'] = 60
+    assert sincronizar(sessao) == (0, 4, 0)
+    assert {s.id for s in HistoricoTreino.query} == ids_series
+    
+    # Uma série a menos em um exercício, outro exercício removido
+    sessao[exercicio_ids[0]]['num_series'] = 2
+    del sessao[exercicio_ids[4]]
+    assert sincronizar(sessao) == (0, 1, 5)
+    assert HistoricoTreino.query.count() == 11
+    
+    incremental = _resumo()
+    ResumoService.reconstruir(user_id)
+    assert _resumo() == incremental
+
+def _series_expandidas():
+    return sorted((r.exercicio_id, s.ordem, float(s.carga), s.repeticoes)
+                  for r in RegistroTreino.query for s in r.series)
+
+def test_series_compactas(dados, app, db, monkeypatch):
+    """Testa a gravação compacta: uma linha por registro, mesma leitura e mesmo resumo"""
+    from services.resumo_service import ResumoService
+    user_id, treino_id, versao_id, exercicio_ids = dados
+    assert RegistroService.salvar_registros(treino_id, versao_id, 'Janeiro/2024', 1,
+                                            _sessao(exercicio_ids), user_id=user_id)
+    expandidas, resumo = _series_expandidas(), _resumo()
+    
+    monkeypatch.setitem(app.config, 'SERIES_COMPACTAS', True)
+    assert RegistroService.salvar_registros(treino_id, versao_id, 'Janeiro/2024', 1,
+                                            _sessao(exercicio_ids), user_id=user_id)
+    assert HistoricoTreino.query.count() == 5
+    assert _series_expandidas() == expandidas
+    assert _resumo() == resumo
+    ResumoService.reconstruir(user_id)
+    assert _resumo() == resumo
+    
+    # Sincronizar na forma compacta: uma série a mais altera só a linha compacta
+    sessao = _sessao(exercicio_ids)
+    assert RegistroService.sincronizar_registros(treino_id, versao_id, 'Janeiro/2024', 1,
+                                                 sessao, user_id=user_id).total == 0
+    sessao[exercicio_ids[0]]['num_series'] = 4
+    assert RegistroService.sincronizar_registros(treino_id, versao_id, 'Janeiro/2024', 1,
+                                                 sessao, user_id=user_id) == (0, 2, 0)
+    assert HistoricoTreino.query.count() == 5
+    incremental = _resumo()
+    ResumoService.reconstruir(user_id)
+    assert _resumo() == incremental
+
+def test_migracao_compactar_e_expandir(dados, db):
+    """Testa que compactar/expandir o histórico preserva séries e agregados"""
+    from migrations import m002_series_compactas
+    from services.resumo_service import ResumoService
+    user_id, treino_id, versao_id, exercicio_ids = dados
+    sessao = _sessao(exercicio_ids)
+    sessao[exercicio_ids[0]]['num_series'] = 1
+    assert RegistroService.salvar_registros(treino_id, versao_id, 'Janeiro/2024', 1,
+                                            sessao, user_id=user_id)
+    # Séries diferentes no mesmo registro não são compactadas
+    serie = HistoricoTreino.query.join(RegistroTreino)\
+        .filter(RegistroTreino.exercicio_id == exercicio_ids[1], HistoricoTreino.ordem == 3).one()
+    serie.carga = 70
+    db.session.commit()
+    ResumoService.reconstruir(user_id)
+    expandidas, resumo = _series_expandidas(), _resumo()
+    
+    assert m002_series_compactas.compactar() == 3
+    db.session.expire_all()
+    assert HistoricoTreino.query.count() == 1 + 3 + 3
+    assert _series_expandidas() == expandidas
+    ResumoService.reconstruir(user_id)
+    assert _resumo() == resumo
+    
+    assert m002_series_compactas.expandir() == 3
+    db.session.expire_all()
+    assert HistoricoTreino.query.count() == 13
+    assert _series_expandidas() == expandidas
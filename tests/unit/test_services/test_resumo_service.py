@@ -0,0 +1,127 @@
+"""Testes para ResumoService (resumo semanal)"""
+
+from datetime import date
+import pytest
+from services.registro_service import RegistroService
+from services.resumo_service import ResumoService
+from models import RegistroTreino, ResumoSemanal
+
+@pytest.fixture
+def dados(treino_de_teste):
+    """Usuário com um treino, dois exercícios e uma versão"""
+    user, treino, versao, (supino, crucifixo) = treino_de_teste(['Supino', 'Crucifixo'])
+    return user, treino, versao, supino, crucifixo
+
+def _salvar(dados, sessao, semana=1, periodo='Janeiro/2024'):
+    user, treino, versao, _, _ = dados
+    return RegistroService.salvar_registros(
+        str(treino.id), versao.id, periodo, semana,
+        {ex.id: {'carga': carga, 'repeticoes': 10, 'num_series': series} for ex, carga, series in sessao},
+        user_id=user.id
+    )
+
+def _linhas():
+    return {
+        (r.exercicio_id, r.semana): (r.qtd_registros, r.total_series, float(r.volume_total),
+                                     float(r.soma_cargas), r.soma_repeticoes, float(r.carga_maxima))
+        for r in ResumoSemanal.query.all()
+    }
+
+def test_salvar_substitui_sessao_no_resumo(dados):
+    """Testa que regravar a sessão subtrai a anterior e soma a nova"""
+    _, _, _, supino, crucifixo = dados
+    assert _salvar(dados, [(supino, 50, 3), (crucifixo, 20, 2)])
+    assert _linhas() == {
+        (supino.id, 1): (1, 3, 1500.0, 150.0, 30, 50.0),
+        (crucifixo.id, 1): (1, 2, 400.0, 40.0, 20, 20.0),
+    }
+    
+    # Carga menor: a máxima precisa ser recalculada; crucifixo sai da sessão
+    assert _salvar(dados, [(supino, 40, 4)])
+    assert _linhas() == {(supino.id, 1): (1, 4, 1600.0, 160.0, 40, 40.0)}
+
+def test_incremental_igual_a_reconstrucao(dados):
+    """Testa que o resumo incremental coincide com o backfill"""
+    user, _, _, supino, crucifixo = dados
+    _salvar(dados, [(supino, 50, 3), (crucifixo, 20, 2)])
+    _salvar(dados, [(supino, 52.5, 3)], semana=2)
+    _salvar(dados, [(supino, 55, 2), (crucifixo, 22.5, 3)], semana=2)
+    incremental = _linhas()
+    
+    assert ResumoService.reconstruir(user.id) == len(incremental)
+    assert _linhas() == incremental
+
+def test_evolucao_por_semana(dados):
+    """Testa a evolução de um exercício lida do resumo"""
+    user, _, _, supino, _ = dados
+    _salvar(dados, [(supino, 50, 3)])
+    _salvar(dados, [(supino, 55, 2)], semana=2)
+    
+    evolucao = ResumoService.get_evolucao(supino.id, user.id)
+    assert [e['sessao'] for e in evolucao] == ['Janeiro/2024 - S2', 'Janeiro/2024 - S1']
+    assert evolucao[0] == {
+        'sessao': 'Janeiro/2024 - S2', 'num_series': 2, 'volume_total': 1100.0,
+        'media_carga': 55.0, 'media_reps': 10.0, 'carga_maxima': 55.0
+    }
+
+def test_evolucao_em_ordem_cronologica_entre_anos(dados):
+    """Testa a ordenação pela data da sessão (e não pelo texto do período)"""
+    user, _, _, supino, _ = dados
+    _salvar(dados, [(supino, 50, 3)], semana=4, periodo='Dezembro/2023')
+    _salvar(dados, [(supino, 52, 3)], semana=1, periodo='Fevereiro/2024')
+    _salvar(dados, [(supino, 51, 3)], semana=1)
+    
+    assert [e['sessao'] for e in ResumoService.get_evolucao(supino.id, user.id)] == [
+        'Fevereiro/2024 - S1', 'Janeiro/2024 - S1', 'Dezembro/2023 - S4'
+    ]
+    assert {r.periodo: r.data_sessao for r in RegistroTreino.query} == {
+        'Dezembro/2023': date(2023, 12, 22), 'Janeiro/2024': date(2024, 1, 1),
+        'Fevereiro/2024': date(2024, 2, 1)
+    }
+
+def test_migracao_adiciona_e_preenche_data_sessao(dados, db):
+    """Testa a migração sobre uma tabela antiga, ainda sem a coluna"""
+    from migrations import m001_data_sessao
+    _, _, _, supino, _ = dados
+    _salvar(dados, [(supino, 50, 3)], semana=2)
+    db.session.remove()
+    
+    with db.engine.begin() as conexao:
+        for tabela, indice in (('registros_treino', 'idx_registro_user_sessao'),
+                               ('resumo_semanal', 'idx_resumo_user_sessao')):
+            conexao.execute(db.text(f"DROP INDEX {indice}"))
+            conexao.execute(db.text(f"ALTER TABLE {tabela} DROP COLUMN data_sessao"))
+    
+    m001_data_sessao.aplicar()
+    m001_data_sessao.aplicar()  # idempotente
+    
+    assert [r.data_sessao for r in RegistroTreino.query] == [date(2024, 1, 8)]
+    assert [r.data_sessao for r in ResumoSemanal.query] == [date(2024, 1, 8)]
+    indices = {i['name'] for i in db.inspect(db.engine).get_indexes('registros_treino')}
+    assert 'idx_registro_user_sessao' in indices
+
+def test_semana_com_data_sessao_parcialmente_nula(dados, db):
+    """Testa que linhas ainda sem data_sessao (antes da migração) não dividem a semana"""
+    from repositories.registro_repository import RegistroRepository
+    user, _, _, supino, crucifixo = dados
+    _salvar(dados, [(supino, 50, 3), (crucifixo, 20, 2)])
+    _salvar(dados, [(supino, 55, 3)], semana=2)
+    RegistroTreino.query.filter_by(exercicio_id=crucifixo.id).update({'data_sessao': None})
+    db.session.commit()
+    
+    assert list(RegistroService.contar_por_semana(user.id).items()) == [
+        (('Janeiro/2024', 1), 2), (('Janeiro/2024', 2), 1)
+    ]
+    assert [(r.periodo, r.semana) for r in RegistroRepository().get_agregado_por_semana(user_id=user.id)] == [
+        ('Janeiro/2024', 1), ('Janeiro/2024', 2)
+    ]
+    
+    # A reconstrução grava uma linha por exercício e semana (chave única do resumo)
+    assert ResumoService.reconstruir(user.id) == 3
+    ResumoSemanal.query.filter_by(exercicio_id=crucifixo.id).update({'data_sessao': None})
+    db.session.commit()
+    from services.estatistica_service import EstatisticaService
+    progresso = EstatisticaService.get_progresso_por_semana(user_id=user.id)
+    assert [(p.semana, float(p.volume_total)) for p in progresso] == [(1, 1900.0), (2, 1650.0)]
+    evolucao = ResumoService.get_evolucao(crucifixo.id, user.id)
+    assert [e['sessao'] for e in evolucao] == ['Janeiro/2024 - S1']
@@ -0,0 +1,21 @@
+"""Testes para utils.date_utils"""
+
+from datetime import date, datetime
+from utils.date_utils import converter_periodo_para_data, calcular_data_sessao, ordenar_periodos
+
+def test_converter_periodo_para_data_mantem_formato_texto():
+    """Testa o formato YYYY-MM-DD e o uso da data atual para períodos inválidos"""
+    assert converter_periodo_para_data("Março-26") == "2026-03-01"
+    assert converter_periodo_para_data("inválido") == datetime.now().strftime("%Y-%m-%d")
+
+def test_calcular_data_sessao():
+    """Testa a data normalizada da sessão (exige mês e ano)"""
+    assert calcular_data_sessao("Janeiro/2024", 2) == date(2024, 1, 8)
+    assert calcular_data_sessao("Abril", 1) is None
+    assert calcular_data_sessao("xyz/2024", 1) is None
+
+def test_ordenar_periodos_mais_recente_primeiro():
+    """Testa a ordenação entre anos, do mais recente ao mais antigo"""
+    assert ordenar_periodos(["Dezembro/2023", "Fevereiro/2024", "Janeiro/2024"]) == [
+        "Fevereiro/2024", "Janeiro/2024", "Dezembro/2023"
+    ]
@@ -0,0 +1,41 @@
+"""Testes para a interpretação de períodos (utils.periodo)"""
+
+from datetime import date
+import pytest
+from utils.periodo import (MESES, MesAno, interpretar_periodo, periodo_para_data,
+                           periodos_para_datas, ordenar_periodos)
+
+@pytest.mark.parametrize("nome,mes", sorted(MESES.items()))
+def test_todas_as_grafias_de_meses(nome, mes):
+    """Testa cada grafia de MESES com separadores, caixa e ano de 2 ou 4 dígitos"""
+    for periodo in (f"{nome}/2024", f"{nome.capitalize()}-24", f" {nome.upper()} 2024 "):
+        assert periodo_para_data(periodo) == date(2024, mes, 1)
+    assert interpretar_periodo(nome.capitalize()) == MesAno(None, mes)
+
+def test_variacoes_e_periodos_invalidos():
+    """Testa grafia sem acento, abreviação com ponto, século e textos inválidos"""
+    assert periodo_para_data("Marco/2024") == date(2024, 3, 1)
+    assert periodo_para_data("fev. 2024") == date(2024, 2, 1)
+    assert periodo_para_data("Dezembro/99") == date(1999, 12, 1)
+    assert periodo_para_data("Abril", ano_padrao=2023) == date(2023, 4, 1)
+    for invalido in ("", None, "Semana 1", "Janeiro/202", "Foo/2024"):
+        assert periodo_para_data(invalido) is None
+
+def test_interpretacao_memoizada():
+    """Testa que o mesmo texto é interpretado uma única vez"""
+    interpretar_periodo.cache_clear()
+    for _ in range(3):
+        interpretar_periodo("Julho/2024")
+    info = interpretar_periodo.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+def test_lote_e_ordenacao():
+    """Testa a conversão em lote (mantém a ordem) e a ordenação cronológica"""
+    periodos = ["Janeiro/2024", "Dezembro/2023", "xyz", "Janeiro/2024", "Fevereiro/2024"]
+    assert periodos_para_datas(periodos) == [
+        date(2024, 1, 1), date(2023, 12, 1), None, date(2024, 1, 1), date(2024, 2, 1)
+    ]
+    assert ordenar_periodos(periodos) == [
+        "Dezembro/2023", "Janeiro/2024", "Janeiro/2024", "Fevereiro/2024", "xyz"
+    ]
+    assert ordenar_periodos(periodos, reverse=True)[0] == "Fevereiro/2024"
@@ -1,6 +1,7 @@
 """Pacote de utilitários da aplicação"""
 
-from .date_utils import converter_periodo_para_data, MESES
+from .date_utils import converter_periodo_para_data, calcular_data_sessao
+from .periodo import MESES, interpretar_periodo, periodo_para_data, periodos_para_datas
 from .exercise_utils import (
     buscar_musculo_no_catalogo, get_series_from_registro,
     calcular_media_series, calcular_volume_total, remover_acentos
@@ -19,10 +20,12 @@ from .validators import (  # 👈 Nome corrigido (plural)
     validar_senha
 )
 from .decorators import with_app_context, log_execution_time  # 👈 Nome corrigido (plural)
+from .paginacao import codificar_cursor, decodificar_cursor
 
 __all__ = [
     # Date utils
-    'converter_periodo_para_data', 'MESES',
+    'converter_periodo_para_data', 'calcular_data_sessao', 'MESES',
+    'interpretar_periodo', 'periodo_para_data', 'periodos_para_datas',
     
     # Exercise utils
     'buscar_musculo_no_catalogo', 'get_series_from_registro',
@@ -37,5 +40,8 @@ __all__ = [
     'validar_email', 'validar_senha',
     
     # Decorators
-    'with_app_context', 'log_execution_time'
+    'with_app_context', 'log_execution_time',
+    
+    # Paginação
+    'codificar_cursor', 'decodificar_cursor'
 ]
\ No newline at end of file
@@ -1,63 +1,39 @@
-import re
-from datetime import datetime
+import logging
+from datetime import datetime, date, timedelta
+from .periodo import interpretar_periodo, periodo_para_data, ordenar_periodos as _ordenar_periodos
 
-# Mapeamento de meses para números
-MESES = {
-    "janeiro": 1, "fevereiro": 2, "março": 3, "abril": 4,
-    "maio": 5, "junho": 6, "julho": 7, "agosto": 8,
-    "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
-    "jan": 1, "fev": 2, "mar": 3, "abr": 4, "mai": 5, "jun": 6,
-    "jul": 7, "ago": 8, "set": 9, "out": 10, "nov": 11, "dez": 12
-}
+logger = logging.getLogger(__name__)
 
 def converter_periodo_para_data(periodo_str):
     """
     Converte strings de período como "Janeiro/2024", "Março-26" ou "Fevereiro 2024"
     em uma data no formato YYYY-MM-DD (primeiro dia do mês)
+    Períodos sem ano usam o ano atual; não reconhecidos, a data atual.
+    Para obter um date, use utils.periodo.periodo_para_data.
     """
     if not periodo_str:
         return datetime.now().strftime("%Y-%m-%d")
     
-    periodo_limpo = periodo_str.strip().lower()
-    
-    # Padrão 1: "Mês/Ano" ou "Mês-Ano" ou "Mês Ano"
-    padrao1 = re.match(r'([a-zA-Zçãõáéíóú]+)[/\-\s]+(\d{2,4})', periodo_limpo)
-    if padrao1:
-        mes_nome = padrao1.group(1).lower()
-        ano = padrao1.group(2)
-        
-        # Converter ano para 4 dígitos
-        if len(ano) == 2:
-            ano = f"20{ano}" if int(ano) <= 50 else f"19{ano}"
-        
-        # Obter número do mês
-        mes_num = MESES.get(mes_nome)
-        if mes_num:
-            return f"{ano}-{mes_num:02d}-01"
-    
-    # Padrão 2: Apenas o mês (assume ano atual)
-    padrao2 = re.match(r'([a-zA-Zçãõáéíóú]+)', periodo_limpo)
-    if padrao2:
-        mes_nome = padrao2.group(1).lower()
-        mes_num = MESES.get(mes_nome)
-        if mes_num:
-            ano_atual = datetime.now().year
-            return f"{ano_atual}-{mes_num:02d}-01"
+    data = periodo_para_data(periodo_str)
+    if data is None:
+        logger.warning(f"Não foi possível converter período '{periodo_str}'. Usando data atual.")
+        return datetime.now().strftime("%Y-%m-%d")
+    return data.isoformat()
+
+def calcular_data_sessao(periodo_str, semana):
+    """
+    Data normalizada de uma sessão: primeiro dia do mês do período mais
+    (semana - 1) semanas. Ex.: ("Janeiro/2024", 2) -> 2024-01-08
+    Retorna None se o período não tiver mês e ano reconhecíveis
+    """
+    if not semana:
+        return None
     
-    # Fallback
-    print(f"Aviso: Não foi possível converter período '{periodo_str}'. Usando data atual.")
-    return datetime.now().strftime("%Y-%m-%d")
+    mes_ano = interpretar_periodo(periodo_str)
+    if mes_ano is None or mes_ano.ano is None:
+        return None
+    return date(mes_ano.ano, mes_ano.mes, 1) + timedelta(weeks=int(semana) - 1)
 
 def ordenar_periodos(periodos):
-    """Ordena lista de períodos (ex: ['Janeiro/2024', 'Fevereiro/2024'])"""
-    def chave_ordenacao(periodo):
-        partes = periodo.split('/')
-        if len(partes) != 2:
-            return (9999, 0)
-        
-        mes_nome = partes[0].lower()
-        ano = int(partes[1])
-        mes_num = MESES.get(mes_nome, 0)
-        return (ano, mes_num)
-    
-    return sorted(periodos, key=chave_ordenacao, reverse=True)
\ No newline at end of file
+    """Ordena lista de períodos, do mais recente ao mais antigo (ex: ['Fevereiro/2024', 'Janeiro/2024'])"""
+    return _ordenar_periodos(periodos, reverse=True)
\ No newline at end of file
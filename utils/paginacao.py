@@ -0,0 +1,27 @@
+import base64
+import json
+
+# Exercícios carregados por vez na tabela de progresso (página e API)
+EXERCICIOS_POR_PAGINA = 50
+
+def codificar_cursor(valores):
+    """
+    Codifica a chave da última linha de uma página como cursor opaco
+    (JSON em base64 url-safe, sem padding)
+    """
+    bruto = json.dumps(list(valores), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(bruto).decode("ascii").rstrip("=")
+
+def decodificar_cursor(cursor):
+    """
+    Decodifica um cursor gerado por codificar_cursor
+    Retorna a lista de valores ou levanta ValueError se o cursor for inválido
+    """
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(bruto.decode("utf-8"))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor!r}") from e
+    if not isinstance(valores, list):
+        raise ValueError(f"Cursor inválido: {cursor!r}")
+    return valores
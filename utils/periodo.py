@@ -0,0 +1,90 @@
+"""
+Interpretação dos períodos de treino ("Janeiro/2024", "Março-26", "fev 2024", "Abril")
+
+Os padrões são compilados uma vez no import e a interpretação de cada texto
+é memoizada (os mesmos poucos períodos se repetem em todas as páginas).
+"""
+
+import re
+import unicodedata
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+
+# Mapeamento de meses para números
+MESES = {
+    "janeiro": 1, "fevereiro": 2, "março": 3, "abril": 4,
+    "maio": 5, "junho": 6, "julho": 7, "agosto": 8,
+    "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
+    "jan": 1, "fev": 2, "mar": 3, "abr": 4, "mai": 5, "jun": 6,
+    "jul": 7, "ago": 8, "set": 9, "out": 10, "nov": 11, "dez": 12
+}
+
+# Mês (com ou sem acento, abreviado com ponto opcional) e ano opcional de 2 ou 4 dígitos
+_PADRAO_PERIODO = re.compile(r'^([^\W\d_]+)\.?(?:[/\-\s]+(\d{4}|\d{2}))?$')
+
+MesAno = namedtuple('MesAno', 'ano mes')
+
+def _sem_acentos(texto):
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+# Também aceita a grafia sem acento ("marco")
+_MESES_NORMALIZADOS = {**{_sem_acentos(nome): mes for nome, mes in MESES.items()}, **MESES}
+
+@lru_cache(maxsize=4096)
+def interpretar_periodo(periodo_str):
+    """
+    Mês e ano de um período
+    Retorna MesAno(ano, mes), com ano None quando o período não tem ano,
+    ou None se o texto não for reconhecido
+    """
+    if not periodo_str:
+        return None
+
+    padrao = _PADRAO_PERIODO.match(periodo_str.strip().lower())
+    if not padrao:
+        return None
+
+    mes = _MESES_NORMALIZADOS.get(padrao.group(1))
+    if mes is None:
+        return None
+
+    ano = padrao.group(2)
+    if ano is None:
+        return MesAno(None, mes)
+
+    ano = int(ano)
+    if len(padrao.group(2)) == 2:
+        ano += 2000 if ano <= 50 else 1900
+    return MesAno(ano, mes)
+
+def periodo_para_data(periodo_str, ano_padrao=None):
+    """
+    Primeiro dia do mês do período como date
+    Períodos sem ano usam ano_padrao (padrão: ano atual); retorna None se o
+    período não for reconhecido
+    """
+    mes_ano = interpretar_periodo(periodo_str)
+    if mes_ano is None:
+        return None
+    return date(mes_ano.ano or ano_padrao or date.today().year, mes_ano.mes, 1)
+
+def periodos_para_datas(periodos, ano_padrao=None):
+    """
+    Versão em lote de periodo_para_data: interpreta cada texto distinto uma
+    única vez e devolve as datas na ordem da entrada
+    """
+    ano_padrao = ano_padrao or date.today().year
+    datas = {p: periodo_para_data(p, ano_padrao) for p in set(periodos)}
+    return [datas[p] for p in periodos]
+
+def ordenar_periodos(periodos, reverse=False):
+    """
+    Ordena períodos cronologicamente (não reconhecidos sempre no fim)
+    """
+    periodos = list(periodos)
+    chaves = dict(zip(periodos, periodos_para_datas(periodos)))
+    reconhecidos = sorted((p for p in periodos if chaves[p] is not None),
+                          key=chaves.__getitem__, reverse=reverse)
+    return reconhecidos + [p for p in periodos if chaves[p] is None]
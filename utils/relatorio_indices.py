@@ -0,0 +1,37 @@
+"""
+Uso dos índices nos planos do registro de requisições lentas
+
+    python -m utils.relatorio_indices [logs/requisicoes_lentas.jsonl]
+
+Lista cada índice declarado nos modelos com o número de planos gravados
+(middleware/requisicoes_lentas.py) que o citam. Índices que nunca aparecem
+são candidatos a remoção.
+"""
+
+import json
+import re
+
+def contar_indices(caminho, indices):
+    """Quantos planos gravados em `caminho` citam cada um dos `indices`"""
+    contagem = dict.fromkeys(indices, 0)
+    if not indices:
+        return contagem
+    padrao = re.compile(r'\b(' + '|'.join(map(re.escape, indices)) + r')\b')
+    with open(caminho, encoding='utf-8') as f:
+        for linha in f:
+            for plano in json.loads(linha).get('planos', []):
+                for indice in set(padrao.findall('\n'.join(plano.get('plano') or []))):
+                    contagem[indice] += 1
+    return contagem
+
+def indices_declarados():
+    """Nomes dos índices declarados nos modelos"""
+    from models import db
+    return sorted(indice.name for tabela in db.metadata.tables.values() for indice in tabela.indexes)
+
+if __name__ == "__main__":
+    import sys
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else 'logs/requisicoes_lentas.jsonl'
+    for indice, total in sorted(contar_indices(caminho, indices_declarados()).items(), key=lambda item: -item[1]):
+        print(f"{total:6d}  {indice}")